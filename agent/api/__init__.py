@@ -1,4 +1,6 @@
 from .public_api import router as public_router
 from .container_api import router as container_router
 from .image_api import router as image_router
-from .command_api import router as command_router
\ No newline at end of file
+from .command_api import router as command_router
+from .job_api import router as job_router
+from .events_api import router as events_router
\ No newline at end of file
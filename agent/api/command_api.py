@@ -4,6 +4,7 @@ from agent.auth import verify_signature
 from agent.docker_client import DOCKER
 from shared.schemas.command_schemas import RunCommandRequestBodySchema
 from agent.unil.asyncall import asyncall
+from agent.unil.singleflight import READS
 
 router = APIRouter(
     prefix="/command",
@@ -19,7 +20,10 @@ router = APIRouter(
 )
 async def run(body: RunCommandRequestBodySchema) -> tuple[str, str]:
     _command = DOCKER.config.docker_cmd + body.command
-    return await asyncall(
-        lambda: docker_run_cmd(_command),
-        asyncall_timeout=600,
-    )
+    # Command may change anything
+    with READS.mutating():
+        return await asyncall(
+            lambda: docker_run_cmd(_command),
+            asyncall_timeout=600,
+            asyncall_pool="long",
+        )
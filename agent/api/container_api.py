@@ -1,15 +1,22 @@
 from typing import Literal
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from python_on_whales.components.container.models import (
     ContainerInspectResult,
 )
 from agent.auth import verify_signature
-from agent.docker_client import DOCKER
+from agent.engine import ENGINE
 from shared.schemas.container_schemas import (
+    CONTAINER_SUMMARY_FIELDS,
     GetContainerListBodySchema,
+    InspectContainersRequestBodySchema,
     CreateContainerRequestBodySchema,
+    RenameContainerRequestBodySchema,
 )
-from agent.unil.asyncall import asyncall
+from shared.schemas.group_update_schemas import GroupUpdatePlanSchema
+from agent.unil.run_group_update import run_group_update
+from agent.unil.singleflight import READS
+from agent.unil.wait_container_state import wait_container_state
 
 router = APIRouter(
     prefix="/container",
@@ -18,10 +25,16 @@ router = APIRouter(
 )
 
 
-async def is_exists(name_or_id: str) -> Literal[True]:
-    exists = await asyncall(
-        lambda: DOCKER.container.exists(name_or_id)
+async def _exists(name_or_id: str) -> bool:
+    return await READS.do(
+        "container",
+        ("exists", name_or_id),
+        lambda: ENGINE.container_exists(name_or_id),
     )
+
+
+async def is_exists(name_or_id: str) -> Literal[True]:
+    exists = await _exists(name_or_id)
     if not exists:
         raise HTTPException(
             status.HTTP_404_NOT_FOUND, "Container not found"
@@ -29,14 +42,45 @@ async def is_exists(name_or_id: str) -> Literal[True]:
     return True
 
 
+@router.post(
+    "/inspect_many",
+    description="Get inspect data of many containers at once. Not existing containers are skipped.",
+    response_model=list[ContainerInspectResult],
+)
+async def inspect_many(body: InspectContainersRequestBodySchema):
+    names_or_ids = sorted(set(body.names_or_ids))
+    return await READS.do(
+        "container",
+        ("inspect_many", *names_or_ids),
+        lambda: ENGINE.container_inspect_many(names_or_ids),
+    )
+
+
 @router.post(
     "/list",
-    description="Get list of all containers",
+    description="Get list of all containers. In summary mode, only the fields needed for listing are returned.",
     response_model=list[ContainerInspectResult],
 )
 async def list(body: GetContainerListBodySchema):
-    args = body.model_dump(exclude_unset=True)
-    return await asyncall(lambda: DOCKER.container.list(**args))
+    all = bool(body.all)
+    containers = await READS.do(
+        "container",
+        ("list", all),
+        lambda: ENGINE.container_list(all=all),
+    )
+    if not body.summary:
+        return containers
+    return JSONResponse(
+        [
+            c.model_dump(
+                mode="json",
+                by_alias=True,
+                include=CONTAINER_SUMMARY_FIELDS,
+                exclude_none=True,
+            )
+            for c in containers
+        ]
+    )
 
 
 @router.get(
@@ -45,7 +89,7 @@ async def list(body: GetContainerListBodySchema):
     response_model=bool,
 )
 async def exists(name_or_id: str) -> bool:
-    return await asyncall(lambda: DOCKER.container.exists(name_or_id))
+    return await _exists(name_or_id)
 
 
 @router.get(
@@ -54,11 +98,26 @@ async def exists(name_or_id: str) -> bool:
     response_model=ContainerInspectResult,
 )
 async def inspect(name_or_id: str, _=Depends(is_exists)):
-    return await asyncall(
-        lambda: DOCKER.container.inspect(name_or_id)
+    return await READS.do(
+        "container",
+        ("inspect", name_or_id),
+        lambda: ENGINE.container_inspect(name_or_id),
     )
 
 
+@router.get(
+    "/wait_healthy/{name_or_id}",
+    description="Wait until container is healthy (or running, if there is no healthcheck), unhealthy or stopped. Returns inspect data as soon as the state is resolved or on timeout.",
+    response_model=ContainerInspectResult,
+)
+async def wait_healthy(
+    name_or_id: str,
+    timeout: int = Query(default=60, ge=1, le=600),
+    _=Depends(is_exists),
+):
+    return await wait_container_state(name_or_id, timeout)
+
+
 @router.post(
     "/create",
     description="Create container",
@@ -66,9 +125,8 @@ async def inspect(name_or_id: str, _=Depends(is_exists)):
 )
 async def create(body: CreateContainerRequestBodySchema):
     args = body.model_dump(exclude_unset=True)
-    return await asyncall(
-        lambda: DOCKER.container.create(**args), asyncall_timeout=600
-    )
+    with READS.mutating("container"):
+        return await ENGINE.container_create(**args)
 
 
 @router.post(
@@ -77,10 +135,8 @@ async def create(body: CreateContainerRequestBodySchema):
     response_model=str,
 )
 async def start(name_or_id: str, _=Depends(is_exists)) -> str:
-    __ = await asyncall(
-        lambda: DOCKER.container.start(name_or_id),
-        asyncall_timeout=600,
-    )
+    with READS.mutating("container"):
+        await ENGINE.container_start(name_or_id)
     return name_or_id
 
 
@@ -90,10 +146,8 @@ async def start(name_or_id: str, _=Depends(is_exists)) -> str:
     response_model=str,
 )
 async def stop(name_or_id: str, _=Depends(is_exists)) -> str:
-    __ = await asyncall(
-        lambda: DOCKER.container.stop(name_or_id),
-        asyncall_timeout=600,
-    )
+    with READS.mutating("container"):
+        await ENGINE.container_stop(name_or_id)
     return name_or_id
 
 
@@ -103,8 +157,35 @@ async def stop(name_or_id: str, _=Depends(is_exists)) -> str:
     response_model=str,
 )
 async def remove(name_or_id: str, _=Depends(is_exists)) -> str:
-    __ = await asyncall(
-        lambda: DOCKER.container.remove(name_or_id),
-        asyncall_timeout=600,
-    )
+    with READS.mutating("container"):
+        await ENGINE.container_remove(name_or_id)
     return name_or_id
+
+
+@router.post(
+    "/rename/{name_or_id}",
+    description="Rename container",
+    response_model=str,
+)
+async def rename(
+    name_or_id: str,
+    body: RenameContainerRequestBodySchema,
+    _=Depends(is_exists),
+) -> str:
+    with READS.mutating("container"):
+        await ENGINE.container_rename(name_or_id, body.new_name)
+    return body.new_name
+
+
+@router.post(
+    "/update_group",
+    description="Run group update plan: stop containers, then recreate/start them in dependency order, wait for health and roll back on failure. Progress events are streamed as NDJSON, the last one is the 'done' step.",
+)
+async def update_group(body: GroupUpdatePlanSchema):
+    async def events():
+        async for event in run_group_update(body):
+            yield event.model_dump_json() + "\n"
+
+    return StreamingResponse(
+        events(), media_type="application/x-ndjson"
+    )
@@ -0,0 +1,47 @@
+import asyncio
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from agent.auth import verify_signature
+from agent.unil.docker_events import EVENTS
+from shared.schemas.event_schemas import (
+    EVENTS_STREAM_HEARTBEAT,
+    EventsStreamMessageSchema,
+)
+
+router = APIRouter(
+    prefix="/events",
+    tags=["events"],
+    dependencies=[Depends(verify_signature)],
+)
+
+
+@router.get(
+    "/stream",
+    description=f"Stream lifecycle events of containers and images as NDJSON. The first message is subscribed, all the events after it are streamed. Heartbeat is sent after {EVENTS_STREAM_HEARTBEAT} seconds without events. The stream ends if the events are lost, the client should resync after reconnecting.",
+)
+async def stream():
+    async def messages():
+        async with EVENTS.subscribe() as queue:
+            yield EventsStreamMessageSchema(
+                kind="subscribed"
+            ).model_dump_json() + "\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), EVENTS_STREAM_HEARTBEAT
+                    )
+                except asyncio.TimeoutError:
+                    message = EventsStreamMessageSchema(
+                        kind="heartbeat"
+                    )
+                else:
+                    if not event:
+                        return
+                    message = EventsStreamMessageSchema(
+                        kind="event", event=event
+                    )
+                yield message.model_dump_json() + "\n"
+
+    return StreamingResponse(
+        messages(), media_type="application/x-ndjson"
+    )
@@ -1,15 +1,19 @@
 from typing import Literal
+import httpx
 from fastapi import APIRouter, Depends, HTTPException, status
 from agent.auth import verify_signature
-from agent.docker_client import DOCKER
+from agent.engine import ENGINE
 from shared.schemas.image_schemas import (
     GetImageListBodySchema,
+    GetImageRemoteDigestRequestBodySchema,
     InspectImageRequestBodySchema,
+    InspectImagesRequestBodySchema,
     PruneImagesRequestBodySchema,
     PullImageRequestBodySchema,
     TagImageRequestBodySchema,
 )
-from agent.unil.asyncall import asyncall
+from agent.unil.registry import get_remote_digest
+from agent.unil.singleflight import READS
 from python_on_whales.components.image.models import (
     ImageInspectResult,
 )
@@ -22,7 +26,11 @@ router = APIRouter(
 
 
 async def is_exists(spec_or_id: str) -> Literal[True]:
-    exists = await asyncall(lambda: DOCKER.image.exists(spec_or_id))
+    exists = await READS.do(
+        "image",
+        ("exists", spec_or_id),
+        lambda: ENGINE.image_exists(spec_or_id),
+    )
     if not exists:
         raise HTTPException(
             status.HTTP_404_NOT_FOUND, "Image not found"
@@ -37,8 +45,24 @@ async def is_exists(spec_or_id: str) -> Literal[True]:
 )
 async def inspect(body: InspectImageRequestBodySchema):
     _ = await is_exists(body.spec_or_id)
-    return await asyncall(
-        lambda: DOCKER.image.inspect(body.spec_or_id)
+    return await READS.do(
+        "image",
+        ("inspect", body.spec_or_id),
+        lambda: ENGINE.image_inspect(body.spec_or_id),
+    )
+
+
+@router.post(
+    "/inspect_many",
+    description="Inspect many images at once. Not existing images are skipped.",
+    response_model=list[ImageInspectResult],
+)
+async def inspect_many(body: InspectImagesRequestBodySchema):
+    specs_or_ids = sorted(set(body.specs_or_ids))
+    return await READS.do(
+        "image",
+        ("inspect_many", *specs_or_ids),
+        lambda: ENGINE.image_inspect_many(specs_or_ids),
     )
 
 
@@ -48,8 +72,15 @@ async def inspect(body: InspectImageRequestBodySchema):
     response_model=list[ImageInspectResult],
 )
 async def list(body: GetImageListBodySchema):
-    args = body.model_dump(exclude_unset=True)
-    return await asyncall(lambda: DOCKER.image.list(**args))
+    return await READS.do(
+        "image",
+        ("list", body.model_dump_json()),
+        lambda: ENGINE.image_list(
+            repository_or_tag=body.repository_or_tag,
+            filters=body.filters,
+            all=bool(body.all),
+        ),
+    )
 
 
 @router.post(
@@ -57,11 +88,10 @@ async def list(body: GetImageListBodySchema):
     description="Prune volumes",
 )
 async def prune(body: PruneImagesRequestBodySchema) -> str:
-    args = body.model_dump(exclude_unset=True)
-    return await asyncall(
-        lambda: DOCKER.image.prune(**args),
-        asyncall_timeout=600,
-    )
+    with READS.mutating("image"):
+        return await ENGINE.image_prune(
+            all=bool(body.all), filters=body.filters
+        )
 
 
 @router.post(
@@ -70,10 +100,25 @@ async def prune(body: PruneImagesRequestBodySchema) -> str:
     response_model=ImageInspectResult,
 )
 async def pull(body: PullImageRequestBodySchema):
-    return await asyncall(
-        lambda: DOCKER.image.pull(body.image),
-        asyncall_timeout=600,
-    )
+    with READS.mutating("image"):
+        return await ENGINE.image_pull(body.image)
+
+
+@router.post(
+    "/remote_digest",
+    description="Get digest of the image in the registry without pulling",
+    response_model=str,
+)
+async def remote_digest(
+    body: GetImageRemoteDigestRequestBodySchema,
+) -> str:
+    try:
+        return await get_remote_digest(body.image)
+    except httpx.HTTPError as e:
+        raise HTTPException(
+            status.HTTP_424_FAILED_DEPENDENCY,
+            f"Failed to get remote digest: {e}",
+        )
 
 
 @router.post(
@@ -82,6 +127,5 @@ async def pull(body: PullImageRequestBodySchema):
 )
 async def tag(body: TagImageRequestBodySchema):
     _ = await is_exists(body.spec_or_id)
-    return await asyncall(
-        lambda: DOCKER.image.tag(body.spec_or_id, body.tag)
-    )
+    with READS.mutating("image"):
+        return await ENGINE.image_tag(body.spec_or_id, body.tag)
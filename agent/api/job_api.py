@@ -0,0 +1,161 @@
+from typing import Any, Awaitable, Callable
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from python_on_whales.components.image.models import (
+    ImageInspectResult,
+)
+from agent.auth import verify_signature
+from agent.config import Config
+from agent.api.command_api import run as command_run
+from agent.api.container_api import create as container_create
+from agent.api.image_api import prune as image_prune
+from agent.unil.jobs import (
+    JOBS,
+    Job,
+    JobKeyConflictError,
+    JobsLimitError,
+)
+from agent.unil.pull_image_progress import pull_image_progress
+from shared.schemas.command_schemas import RunCommandRequestBodySchema
+from shared.schemas.container_schemas import (
+    CreateContainerRequestBodySchema,
+)
+from shared.schemas.image_schemas import (
+    PruneImagesRequestBodySchema,
+    PullImageStreamRequestBodySchema,
+)
+from shared.schemas.job_schemas import (
+    JOB_STREAM_HEARTBEAT,
+    JobSchema,
+    SubmitJobRequestBodySchema,
+)
+
+router = APIRouter(
+    prefix="/job",
+    tags=["job"],
+    dependencies=[Depends(verify_signature)],
+)
+
+# Max time of the long poll in seconds
+MAX_WAIT = 60
+
+
+async def _pull(
+    body: PullImageStreamRequestBodySchema, job: Job
+) -> ImageInspectResult:
+    stall_timeout = body.stall_timeout or Config.PULL_STALL_TIMEOUT
+    async for event in pull_image_progress(body.image, stall_timeout):
+        job.set_progress(
+            event.model_dump(mode="json", exclude={"image"})
+        )
+        if event.done and event.image:
+            return event.image
+        if event.done:
+            raise RuntimeError(event.message)
+    raise RuntimeError("Pull ended without completion")
+
+
+# Body schema and operation of the job kinds
+_KINDS: dict[
+    str,
+    tuple[type[BaseModel], Callable[[Any, Job], Awaitable[Any]]],
+] = {
+    "image_pull": (PullImageStreamRequestBodySchema, _pull),
+    "image_prune": (
+        PruneImagesRequestBodySchema,
+        lambda body, _: image_prune(body),
+    ),
+    "container_create": (
+        CreateContainerRequestBodySchema,
+        lambda body, _: container_create(body),
+    ),
+    "command_run": (
+        RunCommandRequestBodySchema,
+        lambda body, _: command_run(body),
+    ),
+}
+
+
+def _get_job(job_id: str) -> Job:
+    job = JOBS.get(job_id)
+    if not job:
+        raise HTTPException(
+            status.HTTP_404_NOT_FOUND, "Job not found or expired"
+        )
+    return job
+
+
+@router.post(
+    "/submit",
+    description="Start long operation as a job and return it immediately. Job of the same kind and idempotency key is returned instead of a new one, unless it failed.",
+    response_model=JobSchema,
+)
+async def submit(body: SubmitJobRequestBodySchema):
+    schema, func = _KINDS[body.kind]
+    try:
+        operation_body = schema.model_validate(body.body)
+    except ValidationError as e:
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_ENTITY, str(e)
+        )
+    try:
+        job = JOBS.submit(
+            body.kind,
+            body.key,
+            body.body,
+            lambda job: func(operation_body, job),
+        )
+    except JobKeyConflictError as e:
+        raise HTTPException(status.HTTP_409_CONFLICT, str(e))
+    except JobsLimitError as e:
+        raise HTTPException(
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            str(e),
+            headers={"Retry-After": str(MAX_WAIT)},
+        )
+    return job.to_schema()
+
+
+@router.get(
+    "/{job_id}",
+    description=f"Get the job. With wait, the response is delayed until the job is finished, but not more than wait seconds (max {MAX_WAIT}).",
+    response_model=JobSchema,
+)
+async def get(job_id: str, wait: float = 0):
+    job = _get_job(job_id)
+    if wait > 0 and not job.is_finished:
+        await job.wait_finished(min(wait, MAX_WAIT))
+    return job.to_schema()
+
+
+@router.get(
+    "/{job_id}/stream",
+    description=f"Stream states of the job as NDJSON, on every change and at least every {JOB_STREAM_HEARTBEAT} seconds. The last one is the finished job.",
+)
+async def stream(job_id: str):
+    job = _get_job(job_id)
+
+    async def states():
+        while True:
+            version = job.version
+            yield job.to_schema().model_dump_json() + "\n"
+            if job.is_finished:
+                return
+            await job.wait_changed(version, JOB_STREAM_HEARTBEAT)
+
+    return StreamingResponse(
+        states(), media_type="application/x-ndjson"
+    )
+
+
+@router.delete(
+    "/{job_id}",
+    description="Cancel the job",
+    response_model=JobSchema,
+)
+async def cancel(job_id: str):
+    job = _get_job(job_id)
+    JOBS.cancel(job)
+    await job.wait_finished(Config.DOCKER_TIMEOUT)
+    return job.to_schema()
@@ -1,8 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from python_on_whales import DockerException
 from agent.auth import verify_signature
-from agent.unil.asyncall import asyncall
-from agent.docker_client import DOCKER
+from agent.engine import ENGINE
+from agent.unil.admission_middleware import GATES
+from agent.unil.asyncall import POOLS
+from agent.unil.compression_middleware import STATS
+from agent.unil.jobs import JOBS
+from agent.unil.singleflight import READS
+from shared.schemas.metrics_schemas import AgentMetricsSchema
 import logging
 
 router = APIRouter(prefix="/public", tags=["public"])
@@ -11,7 +16,7 @@ router = APIRouter(prefix="/public", tags=["public"])
 @router.get("/health", description="Get health status of the agent")
 async def health():
     try:
-        _ = await asyncall(DOCKER.info)
+        await READS.do("system", ("ping",), ENGINE.ping)
         return "OK"
     except DockerException as e:
         logging.exception(e)
@@ -27,3 +32,18 @@ async def health():
 )
 async def access(_=Depends(verify_signature)):
     return "OK"
+
+
+@router.get(
+    "/metrics",
+    description="Get metrics of the agent",
+    response_model=AgentMetricsSchema,
+)
+async def metrics(_=Depends(verify_signature)):
+    return AgentMetricsSchema(
+        executors=[p.get_metrics() for p in POOLS.values()],
+        reads=READS.get_metrics(),
+        compression=STATS.get_metrics(),
+        jobs=JOBS.get_metrics(),
+        admission=[g.get_metrics() for g in GATES.values()],
+    )
@@ -7,8 +7,18 @@ from agent.api import (
     container_router,
     image_router,
     command_router,
+    job_router,
+    events_router,
 )
 from agent.config import Config
+from agent.unil.admission_middleware import AdmissionMiddleware
+from agent.unil.cancel_on_disconnect import (
+    CancelOnDisconnectMiddleware,
+)
+from agent.unil.compression_middleware import CompressionMiddleware
+from agent.unil.signature_version_middleware import (
+    SignatureVersionMiddleware,
+)
 from shared.util.endpoint_logging_filter import EndpointLoggingFilter
 
 logging.basicConfig(
@@ -22,10 +32,17 @@ uvicorn_logger.setLevel(Config.LOG_LEVEL)
 uvicorn_logger.addFilter(EndpointLoggingFilter(["/public/health"]))
 
 app = FastAPI(root_path="/api")
+# Last added is the outermost
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(SignatureVersionMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(CancelOnDisconnectMiddleware)
 app.include_router(public_router)
 app.include_router(container_router)
 app.include_router(image_router)
 app.include_router(command_router)
+app.include_router(job_router)
+app.include_router(events_router)
 
 
 @app.exception_handler(asyncio.TimeoutError)
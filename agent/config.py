@@ -12,6 +12,21 @@ class Config:
     AGENT_SIGNATURE_TTL: ClassVar[int]
     DOCKER_TIMEOUT: ClassVar[int]
     DOCKER_HOST: ClassVar[str | None]
+    DOCKER_ENGINE: ClassVar[str]
+    FAST_POOL_WORKERS: ClassVar[int]
+    LONG_POOL_WORKERS: ClassVar[int]
+    READ_CACHE_TTL: ClassVar[float]
+    PULL_STALL_TIMEOUT: ClassVar[int]
+    JOBS_MAX_COUNT: ClassVar[int]
+    JOBS_MAX_MEMORY: ClassVar[int]
+    JOBS_TTL: ClassVar[int]
+    ADMISSION_FAST_LIMIT: ClassVar[int]
+    ADMISSION_FAST_QUEUE: ClassVar[int]
+    ADMISSION_LONG_LIMIT: ClassVar[int]
+    ADMISSION_LONG_QUEUE: ClassVar[int]
+    ADMISSION_QUEUE_TIMEOUT: ClassVar[float]
+    DOCKER_CONFIG: ClassVar[str]
+    INSECURE_REGISTRIES: ClassVar[list[str]]
 
     @classmethod
     def load(cls):
@@ -29,6 +44,53 @@ class Config:
                 os.getenv("DOCKER_TIMEOUT") or 15
             )
             cls.DOCKER_HOST = os.getenv("DOCKER_HOST") or None
+            cls.DOCKER_ENGINE = (
+                os.getenv("DOCKER_ENGINE") or "auto"
+            ).lower()
+            cls.FAST_POOL_WORKERS = int(
+                os.getenv("FAST_POOL_WORKERS") or 7
+            )
+            cls.LONG_POOL_WORKERS = int(
+                os.getenv("LONG_POOL_WORKERS") or 4
+            )
+            cls.READ_CACHE_TTL = float(
+                os.getenv("READ_CACHE_TTL") or 0
+            )
+            cls.PULL_STALL_TIMEOUT = int(
+                os.getenv("PULL_STALL_TIMEOUT") or 120
+            )
+            cls.JOBS_MAX_COUNT = int(
+                os.getenv("JOBS_MAX_COUNT") or 100
+            )
+            cls.JOBS_MAX_MEMORY = int(
+                os.getenv("JOBS_MAX_MEMORY") or 32
+            )
+            cls.JOBS_TTL = int(os.getenv("JOBS_TTL") or 3600)
+            cls.ADMISSION_FAST_LIMIT = int(
+                os.getenv("ADMISSION_FAST_LIMIT") or 14
+            )
+            cls.ADMISSION_FAST_QUEUE = int(
+                os.getenv("ADMISSION_FAST_QUEUE") or 50
+            )
+            cls.ADMISSION_LONG_LIMIT = int(
+                os.getenv("ADMISSION_LONG_LIMIT") or 8
+            )
+            cls.ADMISSION_LONG_QUEUE = int(
+                os.getenv("ADMISSION_LONG_QUEUE") or 20
+            )
+            cls.ADMISSION_QUEUE_TIMEOUT = float(
+                os.getenv("ADMISSION_QUEUE_TIMEOUT") or 10
+            )
+            cls.DOCKER_CONFIG = os.getenv(
+                "DOCKER_CONFIG"
+            ) or os.path.expanduser("~/.docker")
+            cls.INSECURE_REGISTRIES = [
+                r.strip()
+                for r in (
+                    os.getenv("INSECURE_REGISTRIES") or ""
+                ).split(",")
+                if r.strip()
+            ]
 
 
 Config.load()
@@ -1,4 +1,8 @@
 from python_on_whales import DockerClient
 from agent.config import Config
+from agent.unil.cancellable_run import install
+
+# Docker cli processes have to be killable on timeout
+install()
 
 DOCKER = DockerClient(host=Config.DOCKER_HOST)
@@ -0,0 +1,24 @@
+import logging
+import os
+from agent.config import Config
+from agent.docker_client import DOCKER
+from .docker_engine import DockerEngine
+from .cli_engine import CliDockerEngine
+from .api_engine import ApiDockerEngine, DockerApiError
+
+
+def _create_engine() -> DockerEngine:
+    """Create docker engine selected by Config.DOCKER_ENGINE"""
+    host = Config.DOCKER_HOST
+    engine = Config.DOCKER_ENGINE
+    if engine == "auto":
+        api_host = not host or host.startswith(("unix://", "tcp://"))
+        tls = bool(os.getenv("DOCKER_TLS_VERIFY"))
+        engine = "api" if api_host and not tls else "cli"
+    logging.info(f"Using docker {engine} engine")
+    if engine == "api":
+        return ApiDockerEngine(DOCKER, host)
+    return CliDockerEngine(DOCKER)
+
+
+ENGINE = _create_engine()
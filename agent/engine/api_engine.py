@@ -0,0 +1,348 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator
+from urllib.parse import quote
+import httpx
+from python_on_whales import DockerClient, DockerException
+from python_on_whales.components.container.models import (
+    ContainerInspectResult,
+)
+from python_on_whales.components.image.models import (
+    ImageInspectResult,
+)
+from agent.config import Config
+from agent.unil.registry import (
+    get_registry_auth,
+    has_credential_helper,
+)
+from .cli_engine import LONG_TIMEOUT, CliDockerEngine
+
+DEFAULT_SOCKET = "/var/run/docker.sock"
+
+
+class DockerApiError(DockerException):
+    """Error response of the docker engine api"""
+
+    def __init__(
+        self, method: str, path: str, status: int, message: str
+    ):
+        super().__init__(
+            [method, path], status, None, message.encode()
+        )
+        self.status = status
+
+
+def _split_tag(tag: str) -> tuple[str, str]:
+    """Split tag to repo and tag e.g. localhost:5000/app:1 -> localhost:5000/app, 1"""
+    slash = tag.rfind("/")
+    colon = tag.rfind(":")
+    if colon > slash:
+        return tag[:colon], tag[colon + 1 :]
+    return tag, "latest"
+
+
+def _get_filters_param(filters: dict[str, Any]) -> str:
+    """Filters in format of the api e.g. {"dangling": ["true"]}"""
+
+    def to_str(v: Any) -> str:
+        return str(v).lower() if isinstance(v, bool) else str(v)
+
+    return json.dumps(
+        {
+            k: (
+                [to_str(i) for i in v]
+                if isinstance(v, list)
+                else [to_str(v)]
+            )
+            for k, v in filters.items()
+        }
+    )
+
+
+class ApiDockerEngine(CliDockerEngine):
+    """
+    Docker engine using docker engine api directly,
+    through the unix socket (or plain tcp) with keep-alive connections.
+    Operations that are complex to map to the api
+    (create, pull, prune) fall back to the cli,
+    but the pull with progress is native.
+    """
+
+    def __init__(self, docker: DockerClient, host: str | None = None):
+        super().__init__(docker)
+        host = host or f"unix://{DEFAULT_SOCKET}"
+        if host.startswith("unix://"):
+            transport = httpx.AsyncHTTPTransport(
+                uds=host.removeprefix("unix://")
+            )
+            base_url = "http://docker"
+        elif host.startswith("tcp://"):
+            transport = httpx.AsyncHTTPTransport()
+            base_url = "http://" + host.removeprefix("tcp://")
+        else:
+            raise ValueError(
+                f"Unsupported docker host for api: {host}"
+            )
+        self._client = httpx.AsyncClient(
+            transport=transport,
+            base_url=base_url,
+            timeout=Config.DOCKER_TIMEOUT,
+        )
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        timeout: int | None = None,
+        allow_statuses: tuple[int, ...] = (),
+    ) -> httpx.Response:
+        """
+        Request to the api.
+        :param timeout: timeout of the request (default is DOCKER_TIMEOUT)
+        :param allow_statuses: error statuses not to be raised
+        """
+        try:
+            resp = await self._client.request(
+                method,
+                path,
+                params=params,
+                timeout=timeout or Config.DOCKER_TIMEOUT,
+            )
+        except httpx.TimeoutException as e:
+            raise asyncio.TimeoutError() from e
+        except httpx.TransportError as e:
+            raise DockerApiError(method, path, 0, str(e)) from e
+        if resp.status_code >= 400 and (
+            resp.status_code not in allow_statuses
+        ):
+            try:
+                message = resp.json().get("message", resp.text)
+            except ValueError:
+                message = resp.text
+            raise DockerApiError(
+                method, path, resp.status_code, message
+            )
+        return resp
+
+    async def ping(self) -> None:
+        _ = await self._request("GET", "/_ping")
+
+    async def container_list(
+        self, all: bool = True
+    ) -> list[ContainerInspectResult]:
+        resp = await self._request(
+            "GET", "/containers/json", params={"all": all}
+        )
+        ids: list[str] = [c["Id"] for c in resp.json()]
+        results = await asyncio.gather(
+            *[self._container_inspect_or_none(id) for id in ids]
+        )
+        # Containers may be removed in the meantime
+        return [c for c in results if c]
+
+    async def _container_inspect_or_none(
+        self, name_or_id: str
+    ) -> ContainerInspectResult | None:
+        resp = await self._request(
+            "GET",
+            f"/containers/{quote(name_or_id)}/json",
+            allow_statuses=(404,),
+        )
+        if resp.status_code == 404:
+            return None
+        return ContainerInspectResult.model_validate(resp.json())
+
+    async def container_inspect_many(
+        self, names_or_ids: list[str]
+    ) -> list[ContainerInspectResult]:
+        # The api has no bulk inspect, but requests are cheap
+        results = await asyncio.gather(
+            *[
+                self._container_inspect_or_none(n)
+                for n in names_or_ids
+            ]
+        )
+        return [c for c in results if c]
+
+    async def container_exists(self, name_or_id: str) -> bool:
+        return bool(await self._container_inspect_or_none(name_or_id))
+
+    async def container_inspect(
+        self, name_or_id: str
+    ) -> ContainerInspectResult:
+        resp = await self._request(
+            "GET", f"/containers/{quote(name_or_id)}/json"
+        )
+        return ContainerInspectResult.model_validate(resp.json())
+
+    async def container_start(self, name_or_id: str) -> None:
+        _ = await self._request(
+            "POST",
+            f"/containers/{quote(name_or_id)}/start",
+            timeout=LONG_TIMEOUT,
+        )
+
+    async def container_stop(self, name_or_id: str) -> None:
+        _ = await self._request(
+            "POST",
+            f"/containers/{quote(name_or_id)}/stop",
+            timeout=LONG_TIMEOUT,
+        )
+
+    async def container_remove(
+        self, name_or_id: str, force: bool = False
+    ) -> None:
+        _ = await self._request(
+            "DELETE",
+            f"/containers/{quote(name_or_id)}",
+            params={"force": force},
+            timeout=LONG_TIMEOUT,
+        )
+
+    async def container_rename(
+        self, name_or_id: str, new_name: str
+    ) -> None:
+        _ = await self._request(
+            "POST",
+            f"/containers/{quote(name_or_id)}/rename",
+            params={"name": new_name},
+        )
+
+    async def image_exists(self, spec_or_id: str) -> bool:
+        resp = await self._request(
+            "GET",
+            f"/images/{quote(spec_or_id)}/json",
+            allow_statuses=(404,),
+        )
+        return resp.status_code != 404
+
+    async def image_inspect(
+        self, spec_or_id: str
+    ) -> ImageInspectResult:
+        resp = await self._request(
+            "GET", f"/images/{quote(spec_or_id)}/json"
+        )
+        return ImageInspectResult.model_validate(resp.json())
+
+    async def image_inspect_many(
+        self, specs_or_ids: list[str]
+    ) -> list[ImageInspectResult]:
+        results = await asyncio.gather(
+            *[self._image_inspect_or_none(s) for s in specs_or_ids]
+        )
+        return [i for i in results if i]
+
+    async def _image_inspect_or_none(
+        self, spec_or_id: str
+    ) -> ImageInspectResult | None:
+        resp = await self._request(
+            "GET",
+            f"/images/{quote(spec_or_id)}/json",
+            allow_statuses=(404,),
+        )
+        if resp.status_code == 404:
+            return None
+        return ImageInspectResult.model_validate(resp.json())
+
+    async def image_list(
+        self,
+        repository_or_tag: str | None = None,
+        filters: dict[str, Any] | None = None,
+        all: bool = True,
+    ) -> list[ImageInspectResult]:
+        filters = dict(filters or {})
+        if repository_or_tag:
+            filters["reference"] = repository_or_tag
+        resp = await self._request(
+            "GET",
+            "/images/json",
+            params={
+                "all": all,
+                "filters": _get_filters_param(filters),
+            },
+        )
+        ids: set[str] = {i["Id"] for i in resp.json()}
+        return await asyncio.gather(
+            *[self.image_inspect(id) for id in ids]
+        )
+
+    async def image_tag(self, spec_or_id: str, tag: str) -> None:
+        repo, tag = _split_tag(tag)
+        _ = await self._request(
+            "POST",
+            f"/images/{quote(spec_or_id)}/tag",
+            params={"repo": repo, "tag": tag},
+        )
+
+    async def image_pull_progress(
+        self, image: str
+    ) -> AsyncIterator[dict[str, Any]]:
+        if has_credential_helper(image):
+            # Such credentials are available only to the cli
+            async for message in super().image_pull_progress(image):
+                yield message
+            return
+        if "@" in image:
+            from_image, tag = image.split("@", 1)
+        else:
+            from_image, tag = _split_tag(image)
+        headers = {}
+        if auth := get_registry_auth(image):
+            headers["X-Registry-Auth"] = auth
+        path = "/images/create"
+        try:
+            async with self._client.stream(
+                "POST",
+                path,
+                params={"fromImage": from_image, "tag": tag},
+                headers=headers,
+                timeout=httpx.Timeout(
+                    Config.DOCKER_TIMEOUT, read=None
+                ),
+            ) as resp:
+                if resp.status_code >= 400:
+                    await resp.aread()
+                    try:
+                        message = resp.json().get(
+                            "message", resp.text
+                        )
+                    except ValueError:
+                        message = resp.text
+                    raise DockerApiError(
+                        "POST", path, resp.status_code, message
+                    )
+                async for line in resp.aiter_lines():
+                    if not line.strip():
+                        continue
+                    message = json.loads(line)
+                    # Errors of the pull come after 200 status
+                    if message.get("error"):
+                        raise DockerApiError(
+                            "POST", path, 500, message["error"]
+                        )
+                    yield message
+        except httpx.TransportError as e:
+            raise DockerApiError("POST", path, 0, str(e)) from e
+
+    async def events(
+        self,
+        since: int,
+        filters: dict[str, list[str]],
+    ) -> AsyncIterator[dict[str, Any]]:
+        async with self._client.stream(
+            "GET",
+            "/events",
+            params={
+                "since": since,
+                "filters": _get_filters_param(dict(filters)),
+            },
+            timeout=httpx.Timeout(Config.DOCKER_TIMEOUT, read=None),
+        ) as resp:
+            if resp.status_code >= 400:
+                raise DockerApiError(
+                    "GET", "/events", resp.status_code, ""
+                )
+            async for line in resp.aiter_lines():
+                if line.strip():
+                    yield json.loads(line)
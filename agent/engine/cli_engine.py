@@ -0,0 +1,287 @@
+import asyncio
+import json
+import re
+from typing import Any, AsyncIterator, Awaitable, TypeVar
+from python_on_whales import DockerClient, DockerException
+from python_on_whales.components.container.models import (
+    ContainerInspectResult,
+)
+from python_on_whales.components.image.models import (
+    ImageInspectResult,
+)
+from agent.unil.asyncall import asyncall
+from .docker_engine import DockerEngine
+
+# Timeout of potentially long operations (seconds)
+LONG_TIMEOUT = 600
+
+# Layer line of the pull output e.g. "a2abf6c4d29d: Pull complete"
+_PULL_LAYER_RE = re.compile(r"^([0-9a-f]{12}): (.+)$")
+
+T = TypeVar("T")
+
+
+def _to_container(c: Any) -> ContainerInspectResult:
+    """
+    Convert python_on_whales container object to its inspect data.
+    Attributes of the object may be reloaded by the cli,
+    so it should be called in the executor.
+    """
+    return ContainerInspectResult.model_validate(
+        c, from_attributes=True
+    )
+
+
+def _to_image(i: Any) -> ImageInspectResult:
+    """The same as _to_container, but for image"""
+    return ImageInspectResult.model_validate(i, from_attributes=True)
+
+
+async def _gather_existing(aws: list[Awaitable[T]]) -> list[T]:
+    """Gather results, skipping objects that do not exist"""
+    results = await asyncio.gather(*aws, return_exceptions=True)
+    for r in results:
+        if isinstance(r, BaseException) and not isinstance(
+            r, DockerException
+        ):
+            raise r
+    return [r for r in results if not isinstance(r, BaseException)]
+
+
+class CliDockerEngine(DockerEngine):
+    """
+    Docker engine using docker cli through python_on_whales.
+    Every operation is a subprocess of the cli.
+    """
+
+    def __init__(self, docker: DockerClient):
+        self._docker = docker
+
+    async def ping(self) -> None:
+        _ = await asyncall(self._docker.info)
+
+    async def container_list(
+        self, all: bool = True
+    ) -> list[ContainerInspectResult]:
+        return await asyncall(
+            lambda: [
+                _to_container(c)
+                for c in self._docker.container.list(all=all)
+            ]
+        )
+
+    async def container_exists(self, name_or_id: str) -> bool:
+        return await asyncall(
+            lambda: self._docker.container.exists(name_or_id)
+        )
+
+    async def container_inspect(
+        self, name_or_id: str
+    ) -> ContainerInspectResult:
+        return await asyncall(
+            lambda: _to_container(
+                self._docker.container.inspect(name_or_id)
+            )
+        )
+
+    async def container_inspect_many(
+        self, names_or_ids: list[str]
+    ) -> list[ContainerInspectResult]:
+        if not names_or_ids:
+            return []
+        try:
+            # One cli call for all of them
+            return await asyncall(
+                lambda: [
+                    _to_container(c)
+                    for c in self._docker.container.inspect(
+                        names_or_ids
+                    )
+                ]
+            )
+        except DockerException:
+            # Some of them do not exist
+            return await _gather_existing(
+                [self.container_inspect(n) for n in names_or_ids]
+            )
+
+    async def container_create(
+        self, **kwargs: Any
+    ) -> ContainerInspectResult:
+        return await asyncall(
+            lambda: _to_container(
+                self._docker.container.create(**kwargs)
+            ),
+            asyncall_timeout=LONG_TIMEOUT,
+            asyncall_pool="long",
+        )
+
+    async def container_start(self, name_or_id: str) -> None:
+        await asyncall(
+            lambda: self._docker.container.start(name_or_id),
+            asyncall_timeout=LONG_TIMEOUT,
+            asyncall_pool="long",
+        )
+
+    async def container_stop(self, name_or_id: str) -> None:
+        await asyncall(
+            lambda: self._docker.container.stop(name_or_id),
+            asyncall_timeout=LONG_TIMEOUT,
+            asyncall_pool="long",
+        )
+
+    async def container_remove(
+        self, name_or_id: str, force: bool = False
+    ) -> None:
+        await asyncall(
+            lambda: self._docker.container.remove(
+                name_or_id, force=force
+            ),
+            asyncall_timeout=LONG_TIMEOUT,
+            asyncall_pool="long",
+        )
+
+    async def container_rename(
+        self, name_or_id: str, new_name: str
+    ) -> None:
+        await asyncall(
+            lambda: self._docker.container.rename(
+                name_or_id, new_name
+            )
+        )
+
+    async def image_exists(self, spec_or_id: str) -> bool:
+        return await asyncall(
+            lambda: self._docker.image.exists(spec_or_id)
+        )
+
+    async def image_inspect(
+        self, spec_or_id: str
+    ) -> ImageInspectResult:
+        return await asyncall(
+            lambda: _to_image(self._docker.image.inspect(spec_or_id))
+        )
+
+    async def image_inspect_many(
+        self, specs_or_ids: list[str]
+    ) -> list[ImageInspectResult]:
+        if not specs_or_ids:
+            return []
+        try:
+            return await asyncall(
+                lambda: [
+                    _to_image(i)
+                    for i in self._docker.image.inspect(specs_or_ids)
+                ]
+            )
+        except DockerException:
+            return await _gather_existing(
+                [self.image_inspect(s) for s in specs_or_ids]
+            )
+
+    async def image_list(
+        self,
+        repository_or_tag: str | None = None,
+        filters: dict[str, Any] | None = None,
+        all: bool = True,
+    ) -> list[ImageInspectResult]:
+        return await asyncall(
+            lambda: [
+                _to_image(i)
+                for i in self._docker.image.list(
+                    repository_or_tag=repository_or_tag,
+                    filters=list((filters or {}).items()),
+                    all=all,
+                )
+            ]
+        )
+
+    async def image_pull(self, image: str) -> ImageInspectResult:
+        return await asyncall(
+            lambda: _to_image(self._docker.image.pull(image)),
+            asyncall_timeout=LONG_TIMEOUT,
+            asyncall_pool="long",
+        )
+
+    async def image_pull_progress(
+        self, image: str
+    ) -> AsyncIterator[dict[str, Any]]:
+        # Without a terminal the cli prints only changes
+        # of the layers status, without bytes
+        command = [
+            *[str(a) for a in self._docker.config.docker_cmd],
+            "image",
+            "pull",
+            image,
+        ]
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            while line := await process.stdout.readline():  # type: ignore
+                text = line.decode(errors="replace").strip()
+                if not text:
+                    continue
+                match = _PULL_LAYER_RE.match(text)
+                if match:
+                    yield {"id": match[1], "status": match[2]}
+                else:
+                    yield {"status": text}
+            stderr = await process.stderr.read()  # type: ignore
+            if await process.wait() != 0:
+                raise DockerException(
+                    command, process.returncode or 1, None, stderr
+                )
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+    async def image_tag(self, spec_or_id: str, tag: str) -> None:
+        await asyncall(
+            lambda: self._docker.image.tag(spec_or_id, tag)
+        )
+
+    async def image_prune(
+        self,
+        all: bool = True,
+        filters: dict[str, Any] | None = None,
+    ) -> str:
+        return await asyncall(
+            lambda: self._docker.image.prune(
+                all=all, filters=list((filters or {}).items())
+            ),
+            asyncall_timeout=LONG_TIMEOUT,
+            asyncall_pool="long",
+        )
+
+    async def events(
+        self,
+        since: int,
+        filters: dict[str, list[str]],
+    ) -> AsyncIterator[dict[str, Any]]:
+        process = await asyncio.create_subprocess_exec(
+            *[str(a) for a in self._docker.config.docker_cmd],
+            "events",
+            "--format",
+            "{{json .}}",
+            "--since",
+            str(since),
+            *[
+                f"--filter={key}={value}"
+                for key, values in filters.items()
+                for value in values
+            ],
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            while line := await process.stdout.readline():  # type: ignore
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
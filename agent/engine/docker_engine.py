@@ -0,0 +1,142 @@
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator
+from python_on_whales.components.container.models import (
+    ContainerInspectResult,
+)
+from python_on_whales.components.image.models import (
+    ImageInspectResult,
+)
+
+
+class DockerEngine(ABC):
+    """
+    Docker engine of the agent.
+    Implementations are interchangeable, see Config.DOCKER_ENGINE.
+    Errors of the docker are raised as DockerException.
+    """
+
+    @abstractmethod
+    async def ping(self) -> None:
+        """Check connection to the docker"""
+
+    # region Containers
+    @abstractmethod
+    async def container_list(
+        self, all: bool = True
+    ) -> list[ContainerInspectResult]:
+        """
+        Get inspect data of the containers
+        :param all: include not running containers
+        """
+
+    @abstractmethod
+    async def container_exists(self, name_or_id: str) -> bool: ...
+
+    @abstractmethod
+    async def container_inspect(
+        self, name_or_id: str
+    ) -> ContainerInspectResult: ...
+
+    @abstractmethod
+    async def container_inspect_many(
+        self, names_or_ids: list[str]
+    ) -> list[ContainerInspectResult]:
+        """
+        Inspect many containers at once.
+        Not existing containers are skipped.
+        """
+
+    @abstractmethod
+    async def container_create(
+        self, **kwargs: Any
+    ) -> ContainerInspectResult:
+        """
+        Create container
+        :param kwargs: kwargs of python_on_whales container.create
+        """
+
+    @abstractmethod
+    async def container_start(self, name_or_id: str) -> None: ...
+
+    @abstractmethod
+    async def container_stop(self, name_or_id: str) -> None: ...
+
+    @abstractmethod
+    async def container_remove(
+        self, name_or_id: str, force: bool = False
+    ) -> None: ...
+
+    @abstractmethod
+    async def container_rename(
+        self, name_or_id: str, new_name: str
+    ) -> None: ...
+
+    # endregion
+
+    # region Images
+    @abstractmethod
+    async def image_exists(self, spec_or_id: str) -> bool: ...
+
+    @abstractmethod
+    async def image_inspect(
+        self, spec_or_id: str
+    ) -> ImageInspectResult: ...
+
+    @abstractmethod
+    async def image_inspect_many(
+        self, specs_or_ids: list[str]
+    ) -> list[ImageInspectResult]:
+        """
+        Inspect many images at once.
+        Not existing images are skipped.
+        """
+
+    @abstractmethod
+    async def image_list(
+        self,
+        repository_or_tag: str | None = None,
+        filters: dict[str, Any] | None = None,
+        all: bool = True,
+    ) -> list[ImageInspectResult]: ...
+
+    @abstractmethod
+    async def image_pull(self, image: str) -> ImageInspectResult: ...
+
+    @abstractmethod
+    def image_pull_progress(
+        self, image: str
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Pull the image, streaming progress messages of the docker
+        e.g. {"id": "a2abf6c4d29d", "status": "Downloading",
+        "progressDetail": {"current": 1024, "total": 4096}}.
+        Closing the stream aborts the pull.
+        """
+
+    @abstractmethod
+    async def image_tag(self, spec_or_id: str, tag: str) -> None: ...
+
+    @abstractmethod
+    async def image_prune(
+        self,
+        all: bool = True,
+        filters: dict[str, Any] | None = None,
+    ) -> str:
+        """
+        Remove unused images
+        :returns: output of the docker cli
+        """
+
+    # endregion
+
+    @abstractmethod
+    def events(
+        self,
+        since: int,
+        filters: dict[str, list[str]],
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Stream of docker events, until closed.
+        :param since: unix timestamp to get events since
+        :param filters: filters of the events e.g. {"event": ["start"]}
+        """
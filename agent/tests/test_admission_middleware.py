@@ -0,0 +1,67 @@
+import asyncio
+import httpx
+import pytest
+from fastapi import FastAPI
+from agent.unil import admission_middleware
+from agent.unil.admission_middleware import (
+    AdmissionGate,
+    AdmissionMiddleware,
+    _get_class,
+)
+from shared.schemas.metrics_schemas import X_ADMISSION_REJECTED
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("/container/list", "fast"),
+        ("/container/inspect/web", "fast"),
+        ("/container/start/web", "long"),
+        ("/image/pull", "long"),
+        ("/job/submit", "fast"),
+        ("/job/1/stream", None),
+        ("/public/health", None),
+        ("/events/stream", None),
+        ("/container/wait_healthy/web", None),
+        ("/container/update_group", None),
+    ],
+)
+def test_get_class(path: str, expected: str | None):
+    assert _get_class(path) == expected
+
+
+@pytest.mark.asyncio
+async def test_rejected_request(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setitem(
+        admission_middleware.GATES,
+        "long",
+        AdmissionGate("long", limit=1, queue=0, queue_timeout=1),
+    )
+    app = FastAPI(root_path="/api")
+    app.add_middleware(AdmissionMiddleware)
+
+    @app.post("/container/start/{name}")
+    async def start(name: str):
+        await asyncio.sleep(0.2)
+        return name
+
+    @app.get("/container/wait_healthy/{name}")
+    async def wait_healthy(name: str):
+        return name
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app, root_path="/api"),
+        base_url="http://agent/api",
+    ) as client:
+        running = asyncio.create_task(
+            client.post("/container/start/a")
+        )
+        await asyncio.sleep(0.05)
+        rejected = await client.post("/container/start/b")
+        # Not limited by the long slots
+        waiting = await client.get("/container/wait_healthy/a")
+        assert (await running).status_code == 200
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"]
+    assert rejected.headers[X_ADMISSION_REJECTED]
+    assert waiting.status_code == 200
@@ -0,0 +1,127 @@
+import json
+import httpx
+import pytest
+from python_on_whales import DockerClient
+from agent.config import Config
+from agent.engine.api_engine import (
+    ApiDockerEngine,
+    DockerApiError,
+    _get_filters_param,
+    _split_tag,
+)
+
+
+@pytest.mark.parametrize(
+    "tag, expected",
+    [
+        ("nginx", ("nginx", "latest")),
+        ("nginx:1.25", ("nginx", "1.25")),
+        ("quenary/tugtainer:v1", ("quenary/tugtainer", "v1")),
+        ("localhost:5000/app", ("localhost:5000/app", "latest")),
+        ("localhost:5000/app:1", ("localhost:5000/app", "1")),
+        (
+            "registry:5000/team/app:1.2",
+            ("registry:5000/team/app", "1.2"),
+        ),
+    ],
+)
+def test_split_tag(tag: str, expected: tuple[str, str]):
+    assert _split_tag(tag) == expected
+
+
+def test_get_filters_param():
+    param = _get_filters_param(
+        {
+            "dangling": True,
+            "reference": "nginx",
+            "label": ["a=1", "b"],
+            "until": 10,
+        }
+    )
+    assert json.loads(param) == {
+        "dangling": ["true"],
+        "reference": ["nginx"],
+        "label": ["a=1", "b"],
+        "until": ["10"],
+    }
+
+
+@pytest.fixture(autouse=True)
+def docker_config(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    """Docker config of the machine is not used for pulls"""
+    monkeypatch.setattr(Config, "DOCKER_CONFIG", str(tmp_path))
+
+
+def _create_engine(
+    pull: httpx.Response, requests: list[httpx.Request]
+) -> ApiDockerEngine:
+    """Engine with the pull of the docker responding with the response"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return pull
+
+    engine = ApiDockerEngine(DockerClient())
+    engine._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler),
+        base_url="http://docker",
+    )
+    return engine
+
+
+def _ndjson(*lines: dict) -> bytes:
+    return b"".join(json.dumps(l).encode() + b"\r\n" for l in lines)
+
+
+@pytest.mark.asyncio
+async def test_image_pull_progress():
+    requests: list[httpx.Request] = []
+    lines = [
+        {"status": "Pulling from library/nginx", "id": "1.25"},
+        {"status": "Download complete", "id": "abc"},
+    ]
+    engine = _create_engine(
+        httpx.Response(200, content=_ndjson(*lines)), requests
+    )
+    assert [
+        m async for m in engine.image_pull_progress("nginx:1.25")
+    ] == lines
+    assert requests[0].url.params["fromImage"] == "nginx"
+    assert requests[0].url.params["tag"] == "1.25"
+
+
+@pytest.mark.asyncio
+async def test_image_pull_progress_error_line():
+    # Errors of the pull come after 200 status
+    engine = _create_engine(
+        httpx.Response(
+            200,
+            content=_ndjson(
+                {"status": "Pulling from library/nginx"},
+                {"error": "manifest for nginx:404 not found"},
+            ),
+        ),
+        [],
+    )
+    messages = []
+    with pytest.raises(DockerApiError) as e:
+        async for message in engine.image_pull_progress("nginx:404"):
+            messages.append(message)
+    assert len(messages) == 1
+    assert e.value.status == 500
+    assert "manifest for nginx:404 not found" in str(e.value)
+
+
+@pytest.mark.asyncio
+async def test_image_pull_progress_error_status():
+    engine = _create_engine(
+        httpx.Response(
+            404, json={"message": "pull access denied for app"}
+        ),
+        [],
+    )
+    with pytest.raises(DockerApiError) as e:
+        async for _ in engine.image_pull_progress("app"):
+            pass
+    assert e.value.status == 404
+    assert "pull access denied for app" in str(e.value)
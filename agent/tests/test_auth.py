@@ -0,0 +1,121 @@
+import json
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from agent.auth import verify_signature
+from agent.config import Config
+from agent.unil.signature_version_middleware import (
+    SignatureVersionMiddleware,
+)
+from shared.util.signature import (
+    RAW_SIGNATURE_VERSION,
+    X_SIGNATURE_VERSION,
+    get_signature_headers,
+)
+
+SECRET = "secret"
+PATH = "/api/job/1"
+CREATE_PATH = "/api/container/create"
+BODY = {"image": "nginx:latest", "name": "web", "envs": {"A": "ä"}}
+
+app = FastAPI()
+app.add_middleware(SignatureVersionMiddleware)
+
+
+@app.get(PATH, dependencies=[Depends(verify_signature)])
+async def get_job(wait: int = 0):
+    return wait
+
+
+@app.post(CREATE_PATH, dependencies=[Depends(verify_signature)])
+async def create(body: dict):
+    return body["name"]
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> TestClient:
+    monkeypatch.setattr(Config, "AGENT_SECRET", SECRET)
+    return TestClient(app)
+
+
+def test_signed_query(client: TestClient):
+    headers = get_signature_headers(
+        SECRET, "GET", PATH, body_bytes=b"", query={"wait": 5}
+    )
+    resp = client.get(PATH, params={"wait": 5}, headers=headers)
+    assert resp.status_code == 200
+    assert resp.json() == 5
+
+
+def test_query_order_does_not_matter(client: TestClient):
+    headers = get_signature_headers(
+        SECRET,
+        "GET",
+        PATH,
+        body_bytes=b"",
+        query={"wait": 5, "a": "b c"},
+    )
+    resp = client.get(f"{PATH}?a=b+c&wait=5", headers=headers)
+    assert resp.status_code == 200
+
+
+def test_tampered_query(client: TestClient):
+    headers = get_signature_headers(
+        SECRET, "GET", PATH, body_bytes=b"", query={"wait": 5}
+    )
+    resp = client.get(PATH, params={"wait": 600}, headers=headers)
+    assert resp.status_code == 401
+    resp = client.get(PATH, headers=headers)
+    assert resp.status_code == 401
+
+
+def test_raw_signature_is_advertised(client: TestClient):
+    resp = client.get(
+        PATH, headers=get_signature_headers(SECRET, "GET", PATH)
+    )
+    assert resp.headers[X_SIGNATURE_VERSION] == RAW_SIGNATURE_VERSION
+
+
+def test_raw_signed_body(client: TestClient):
+    # Not compact json, the exact bytes are signed
+    data = json.dumps(BODY, indent=2).encode()
+    headers = get_signature_headers(
+        SECRET, "POST", CREATE_PATH, body_bytes=data
+    )
+    assert headers[X_SIGNATURE_VERSION] == RAW_SIGNATURE_VERSION
+    resp = client.post(CREATE_PATH, content=data, headers=headers)
+    assert resp.status_code == 200
+    assert resp.json() == "web"
+
+
+def test_tampered_raw_body(client: TestClient):
+    data = json.dumps(BODY).encode()
+    headers = get_signature_headers(
+        SECRET, "POST", CREATE_PATH, body_bytes=data
+    )
+    resp = client.post(
+        CREATE_PATH,
+        content=data.replace(b"web", b"bad"),
+        headers=headers,
+    )
+    assert resp.status_code == 401
+
+
+def test_legacy_signed_body(client: TestClient):
+    headers = get_signature_headers(
+        SECRET, "POST", CREATE_PATH, body=BODY
+    )
+    assert X_SIGNATURE_VERSION not in headers
+    resp = client.post(CREATE_PATH, json=BODY, headers=headers)
+    assert resp.status_code == 200
+    assert resp.json() == "web"
+
+
+def test_tampered_legacy_body(client: TestClient):
+    headers = get_signature_headers(
+        SECRET, "POST", CREATE_PATH, body=BODY
+    )
+    resp = client.post(
+        CREATE_PATH, json={**BODY, "name": "bad"}, headers=headers
+    )
+    assert resp.status_code == 401
@@ -0,0 +1,142 @@
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+import pytest
+from agent.config import Config
+from agent.unil import registry
+from agent.unil.registry import (
+    get_remote_digest,
+    parse_image_reference,
+)
+
+DIGEST = "sha256:" + "a" * 64
+TOKEN = "token"
+MANIFEST = b'{"schemaVersion": 2}'
+
+
+class RegistryHandler(BaseHTTPRequestHandler):
+    """
+    Stand-in registry with a token auth.
+    Repository foo/bar has the digest header,
+    repository foo/nodigest has not.
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def _manifest(self, with_body: bool):
+        port = self.server.server_address[1]
+        if self.headers.get("Authorization") != f"Bearer {TOKEN}":
+            self.send_response(401)
+            self.send_header(
+                "WWW-Authenticate",
+                f'Bearer realm="http://127.0.0.1:{port}/token",service="registry"',
+            )
+            self.end_headers()
+            return
+        if not self.path.startswith(
+            ("/v2/foo/bar/manifests/", "/v2/foo/nodigest/manifests/")
+        ):
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        if self.path.startswith("/v2/foo/bar/"):
+            self.send_header("Docker-Content-Digest", DIGEST)
+        self.send_header("Content-Length", str(len(MANIFEST)))
+        self.end_headers()
+        if with_body:
+            self.wfile.write(MANIFEST)
+
+    def do_HEAD(self):
+        self._manifest(with_body=False)
+
+    def do_GET(self):
+        if self.path.startswith("/token?"):
+            if "scope=repository%3Afoo%2F" not in self.path:
+                self.send_response(400)
+                self.end_headers()
+                return
+            body = b'{"token": "%s"}' % TOKEN.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self._manifest(with_body=True)
+
+
+@pytest.fixture
+def registry_port() -> Iterator[int]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RegistryHandler)
+    thread = threading.Thread(
+        target=server.serve_forever, daemon=True
+    )
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize(
+    "spec, expected",
+    [
+        ("nginx", ("docker.io", "library/nginx", "latest")),
+        ("nginx:1.25", ("docker.io", "library/nginx", "1.25")),
+        (
+            "quenary/tugtainer:latest",
+            ("docker.io", "quenary/tugtainer", "latest"),
+        ),
+        ("ghcr.io/a/b:1", ("ghcr.io", "a/b", "1")),
+        ("localhost:5000/x", ("localhost:5000", "x", "latest")),
+        (
+            "nginx:1.25@sha256:abc",
+            ("docker.io", "library/nginx", "sha256:abc"),
+        ),
+        (
+            "registry:5000/foo/bar",
+            ("registry:5000", "foo/bar", "latest"),
+        ),
+    ],
+)
+def test_parse_image_reference(spec: str, expected: tuple):
+    ref = parse_image_reference(spec)
+    assert (ref.registry, ref.repository, ref.reference) == expected
+
+
+def test_is_insecure(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(
+        Config, "INSECURE_REGISTRIES", ["registry.lan:5000"]
+    )
+    assert registry._is_insecure("localhost:5000")
+    assert registry._is_insecure("127.0.0.1:5000")
+    assert registry._is_insecure("registry.lan:5000")
+    assert not registry._is_insecure("registry.lan")
+    assert not registry._is_insecure("ghcr.io")
+
+
+@pytest.mark.asyncio
+async def test_remote_digest_insecure_localhost(registry_port: int):
+    # Local registries are requested over plain http
+    for host in ("127.0.0.1", "localhost"):
+        digest = await get_remote_digest(
+            f"{host}:{registry_port}/foo/bar:1"
+        )
+        assert digest == DIGEST
+
+
+@pytest.mark.asyncio
+async def test_remote_digest_without_header(registry_port: int):
+    digest = await get_remote_digest(
+        f"127.0.0.1:{registry_port}/foo/nodigest:1"
+    )
+    assert digest == "sha256:" + hashlib.sha256(MANIFEST).hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_remote_digest_of_digest_reference():
+    # Nothing is requested, the registry is not reachable
+    digest = await get_remote_digest(f"127.0.0.1:1/foo/bar@{DIGEST}")
+    assert digest == DIGEST
@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Literal
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from agent.config import Config
+from shared.schemas.metrics_schemas import (
+    X_ADMISSION_REJECTED,
+    AdmissionMetricsSchema,
+)
+
+# Number of the last requests used to estimate Retry-After
+DURATION_WINDOW = 100
+
+AdmissionClass = Literal["fast", "long"]
+
+# Paths of potentially long operations, others are fast.
+# Health, metrics, following of jobs and the events stream
+# are not limited, they do not load the docker.
+# Waiting for health is mostly idle, and group update is a stream
+# of steps of its own, they would only starve the long slots.
+_LONG_PATHS = (
+    "/container/create",
+    "/container/start/",
+    "/container/stop/",
+    "/container/remove/",
+    "/container/rename/",
+    "/image/pull",
+    "/image/prune",
+    "/command/run",
+)
+_EXEMPT_PATHS = (
+    "/public/",
+    "/events/",
+    "/container/wait_healthy/",
+    "/container/update_group",
+)
+
+
+def _get_class(path: str) -> AdmissionClass | None:
+    """Get admission class of the request, None if it is not limited"""
+    if path.startswith(_EXEMPT_PATHS):
+        return None
+    if path.startswith("/job/"):
+        # Submission is fast, the jobs have their own limit
+        return "fast" if path == "/job/submit" else None
+    if path.startswith(_LONG_PATHS):
+        return "long"
+    return "fast"
+
+
+class AdmissionRejectedError(Exception):
+    """
+    Request is not admitted, it was not processed.
+    :param status_code: 429 if the queue is full,
+        503 if the request waited in the queue for too long
+    :param retry_after: suggested delay of the retry in seconds
+    """
+
+    def __init__(self, status_code: int, retry_after: int):
+        self.status_code = status_code
+        self.retry_after = retry_after
+        super().__init__(
+            f"Agent is overloaded, retry in {retry_after}s"
+        )
+
+
+class AdmissionGate:
+    """
+    Limits concurrent requests of the class.
+    Requests above the limit wait in the queue,
+    requests above the queue are rejected immediately.
+    :param name: name of the class
+    :param limit: max number of concurrent requests
+    :param queue: max number of waiting requests
+    :param queue_timeout: max time to wait in the queue in seconds
+    """
+
+    def __init__(
+        self,
+        name: AdmissionClass,
+        limit: int,
+        queue: int,
+        queue_timeout: float,
+    ):
+        self.name: AdmissionClass = name
+        self.limit = limit
+        self.queue = queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(limit)
+        self._active = 0
+        self._queued = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._durations: deque[float] = deque(maxlen=DURATION_WINDOW)
+
+    def _get_retry_after(self) -> int:
+        """Estimate time until the queue is served, in seconds"""
+        durations = self._durations
+        avg = sum(durations) / len(durations) if durations else 1
+        return max(
+            1, math.ceil(avg * (self._queued + 1) / self.limit)
+        )
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """
+        Hold a slot of the class for the request.
+        :raises AdmissionRejectedError: if there is no slot
+        """
+        if self._active + self._queued >= self.limit + self.queue:
+            self._rejected += 1
+            raise AdmissionRejectedError(429, self._get_retry_after())
+        self._queued += 1
+        try:
+            await asyncio.wait_for(
+                self._semaphore.acquire(), self.queue_timeout
+            )
+        except asyncio.TimeoutError:
+            self._timed_out += 1
+            raise AdmissionRejectedError(503, self._get_retry_after())
+        finally:
+            self._queued -= 1
+        self._active += 1
+        self._admitted += 1
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._durations.append(time.monotonic() - start)
+            self._active -= 1
+            self._semaphore.release()
+
+    def get_metrics(self) -> AdmissionMetricsSchema:
+        durations = self._durations
+        return AdmissionMetricsSchema(
+            name=self.name,
+            limit=self.limit,
+            queue=self.queue,
+            active=self._active,
+            queued=self._queued,
+            admitted=self._admitted,
+            rejected=self._rejected,
+            timed_out=self._timed_out,
+            duration_avg=(
+                round(sum(durations) / len(durations), 4)
+                if durations
+                else 0
+            ),
+        )
+
+
+GATES: dict[AdmissionClass, AdmissionGate] = {
+    "fast": AdmissionGate(
+        "fast",
+        Config.ADMISSION_FAST_LIMIT,
+        Config.ADMISSION_FAST_QUEUE,
+        Config.ADMISSION_QUEUE_TIMEOUT,
+    ),
+    "long": AdmissionGate(
+        "long",
+        Config.ADMISSION_LONG_LIMIT,
+        Config.ADMISSION_LONG_QUEUE,
+        Config.ADMISSION_QUEUE_TIMEOUT,
+    ),
+}
+
+
+class AdmissionMiddleware:
+    """
+    Admission control of the requests, so the latency is bounded
+    instead of queueing silently behind the executor pools.
+    Rejected requests get 429 or 503 with Retry-After,
+    the client is expected to slow down.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        path: str = scope["path"]
+        path = path.removeprefix(scope.get("root_path", ""))
+        admission_class = _get_class(path)
+        if not admission_class:
+            return await self.app(scope, receive, send)
+        try:
+            async with GATES[admission_class].admit():
+                await self.app(scope, receive, send)
+        except AdmissionRejectedError as e:
+            logging.warning(
+                f"{scope['method']} {path} is rejected with {e.status_code}, {admission_class} requests are saturated"
+            )
+            response = JSONResponse(
+                {"detail": str(e)},
+                e.status_code,
+                headers={
+                    "Retry-After": str(e.retry_after),
+                    X_ADMISSION_REJECTED: "1",
+                },
+            )
+            await response(scope, receive, send)
@@ -1,10 +1,17 @@
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
-from typing import Callable, ParamSpec, TypeVar, cast
+from typing import Callable, Literal, ParamSpec, TypeVar, cast
 from asyncio import AbstractEventLoop
 from agent.config import Config
+from agent.unil.executor_pool import ExecutorPool
 
-EXECUTOR = ThreadPoolExecutor(7)
+PoolName = Literal["fast", "long"]
+# Fast pool is for typically fast read-only operations e.g. inspect,
+# long pool is for potentially long operations e.g. pull,
+# so the long ones cannot starve the fast ones.
+POOLS: dict[PoolName, ExecutorPool] = {
+    "fast": ExecutorPool("fast", Config.FAST_POOL_WORKERS),
+    "long": ExecutorPool("long", Config.LONG_POOL_WORKERS),
+}
 
 P = ParamSpec("P")
 R = TypeVar("R")
@@ -16,26 +23,24 @@ async def asyncall(
     func: Callable[P, R],
     asyncall_timeout: int | None = cast(None, _timeout_sentinel),
     asyncall_loop: AbstractEventLoop | None = None,
+    asyncall_pool: PoolName = "fast",
     *args: P.args,
     **kwargs: P.kwargs,
 ) -> R:
     """
     Run sync func asynchronously with ThreadPoolExecutor.
+    Docker cli processes of func are killed on timeout or cancel.
     :param asyncall_timeout: timeout to an error (if not explicitly None, then default is Config.DOCKER_TIMEOUT)
     :param asyncall_loop: set loop explicitly (default is asyncio.get_event_loop())
+    :param asyncall_pool: executor pool to run func in (default is fast)
     """
+    pool = POOLS[asyncall_pool]
     if asyncall_timeout is _timeout_sentinel:
         asyncall_timeout = Config.DOCKER_TIMEOUT
     if not asyncall_loop:
         asyncall_loop = asyncio.get_event_loop()
-    if asyncall_timeout:
-        return await asyncio.wait_for(
-            asyncall_loop.run_in_executor(
-                EXECUTOR, lambda: func(*args, **kwargs)
-            ),
-            asyncall_timeout,
-        )
-    else:
-        return await asyncall_loop.run_in_executor(
-            EXECUTOR, lambda: func(*args, **kwargs)
-        )
+    return await pool.call(
+        asyncall_loop,
+        lambda: func(*args, **kwargs),
+        asyncall_timeout or None,
+    )
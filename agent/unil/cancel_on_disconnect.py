@@ -0,0 +1,62 @@
+import asyncio
+import logging
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class CancelOnDisconnectMiddleware:
+    """
+    Cancel request handling if the client disconnects,
+    so docker operations of the request are cancelled as well.
+    The request body is read in advance to listen for the disconnect.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        messages: list[Message] = []
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request" or not message.get(
+                "more_body"
+            ):
+                break
+        if messages[-1]["type"] == "http.disconnect":
+            return
+        disconnected = asyncio.Event()
+
+        async def replay() -> Message:
+            if messages:
+                return messages.pop(0)
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def watch():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected.set()
+
+        app_task = asyncio.create_task(self.app(scope, replay, send))
+        watch_task = asyncio.create_task(watch())
+        try:
+            await asyncio.wait(
+                [app_task, watch_task],
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            watch_task.cancel()
+            if not app_task.done():
+                app_task.cancel()
+        try:
+            await app_task
+        except asyncio.CancelledError:
+            if not disconnected.is_set():
+                raise
+            logging.warning(
+                f"Client disconnected, {scope['method']} {scope['path']} is cancelled"
+            )
@@ -0,0 +1,72 @@
+import subprocess
+import threading
+import types
+from typing import Any
+import python_on_whales.utils
+
+_local = threading.local()
+
+
+class Operation:
+    """
+    Operation running in the executor thread.
+    Docker cli processes started by the operation are killed on cancel,
+    so the thread is released instead of waiting for them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._processes: set[subprocess.Popen] = set()
+        self.cancelled = False
+
+    def __enter__(self):
+        _local.operation = self
+        return self
+
+    def __exit__(self, *args):
+        _local.operation = None
+
+    def attach(self, process: subprocess.Popen):
+        with self._lock:
+            self._processes.add(process)
+            if self.cancelled:
+                process.kill()
+
+    def detach(self, process: subprocess.Popen):
+        with self._lock:
+            self._processes.discard(process)
+
+    def cancel(self):
+        """Kill processes of the operation, including future ones"""
+        with self._lock:
+            self.cancelled = True
+            for process in self._processes:
+                process.kill()
+
+
+def _run(
+    args: Any, input: bytes | None = None, **kwargs: Any
+) -> subprocess.CompletedProcess:
+    """subprocess.run attaching the process to the current operation"""
+    operation: Operation | None = getattr(_local, "operation", None)
+    if input is not None:
+        kwargs["stdin"] = subprocess.PIPE
+    with subprocess.Popen(args, **kwargs) as process:
+        if operation:
+            operation.attach(process)
+        try:
+            stdout, stderr = process.communicate(input)
+        finally:
+            if operation:
+                operation.detach(process)
+    return subprocess.CompletedProcess(
+        args, process.returncode, stdout, stderr
+    )
+
+
+def install():
+    """Make python_on_whales run the docker cli with _run"""
+    module = types.ModuleType("subprocess")
+    module.__dict__.update(vars(subprocess))
+    module.run = _run  # type: ignore
+    python_on_whales.utils.subprocess = module  # type: ignore
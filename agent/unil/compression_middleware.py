@@ -0,0 +1,144 @@
+import gzip
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from shared.schemas.metrics_schemas import CompressionMetricsSchema
+
+# Smaller responses are not compressed
+MIN_SIZE = 1024
+# Json compresses well on low levels, higher ones are cpu waste
+COMPRESS_LEVEL = 5
+
+
+class CompressionStats:
+    """Bytes before and after compression"""
+
+    def __init__(self):
+        self.response_raw = 0
+        self.response_sent = 0
+        self.request_raw = 0
+        self.request_received = 0
+
+    def get_metrics(self) -> CompressionMetricsSchema:
+        return CompressionMetricsSchema(
+            response_raw=self.response_raw,
+            response_sent=self.response_sent,
+            request_raw=self.request_raw,
+            request_received=self.request_received,
+            saved=self.response_raw
+            - self.response_sent
+            + self.request_raw
+            - self.request_received,
+        )
+
+
+STATS = CompressionStats()
+
+
+class _FlushingGZipResponder(GZipResponder):
+    """Flushes every chunk, so streamed events are not delayed"""
+
+    def apply_compression(
+        self, body: bytes, *, more_body: bool
+    ) -> bytes:
+        self.gzip_file.write(body)
+        if more_body:
+            self.gzip_file.flush()
+        else:
+            self.gzip_file.close()
+        body = self.gzip_buffer.getvalue()
+        self.gzip_buffer.seek(0)
+        self.gzip_buffer.truncate()
+        return body
+
+
+class CompressionMiddleware:
+    """
+    Gzip compression of responses, negotiated by Accept-Encoding,
+    and decompression of gzip request bodies.
+    Support of compressed requests is advertised by Accept-Encoding
+    header of responses (RFC 7694).
+    Requests are decompressed before the signature verification,
+    so the signature is of the json body as usual.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = Headers(scope=scope)
+        if headers.get("content-encoding") == "gzip":
+            body = b""
+            while True:
+                message = await receive()
+                body += message.get("body", b"")
+                if not message.get("more_body"):
+                    break
+            try:
+                data = gzip.decompress(body)
+            except (OSError, EOFError, zlib.error):
+                response = PlainTextResponse(
+                    "Invalid gzip body", status_code=400
+                )
+                return await response(scope, receive, send)
+            STATS.request_received += len(body)
+            STATS.request_raw += len(data)
+            scope = {
+                **scope,
+                "headers": [
+                    (k, v)
+                    for k, v in scope["headers"]
+                    if k
+                    not in (b"content-encoding", b"content-length")
+                ]
+                + [(b"content-length", str(len(data)).encode())],
+            }
+            receive = self._get_replay(data, receive)
+
+        async def send_counted(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(raw=message["headers"])[
+                    "Accept-Encoding"
+                ] = "gzip"
+            else:
+                STATS.response_sent += len(message.get("body", b""))
+            await send(message)
+
+        responder: IdentityResponder
+        if "gzip" in headers.get("accept-encoding", ""):
+            responder = _FlushingGZipResponder(
+                self._count_raw, MIN_SIZE, COMPRESS_LEVEL
+            )
+        else:
+            responder = IdentityResponder(self._count_raw, MIN_SIZE)
+        await responder(scope, receive, send_counted)
+
+    @staticmethod
+    def _get_replay(data: bytes, receive: Receive) -> Receive:
+        """Receive of the decompressed body, then of the original"""
+        sent = False
+
+        async def replay() -> Message:
+            nonlocal sent
+            if sent:
+                return await receive()
+            sent = True
+            return {"type": "http.request", "body": data}
+
+        return replay
+
+    async def _count_raw(
+        self, scope: Scope, receive: Receive, send: Send
+    ):
+        async def send_raw(message: Message):
+            if message["type"] == "http.response.body":
+                STATS.response_raw += len(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, receive, send_raw)
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import time
+from contextlib import aclosing, asynccontextmanager
+from typing import Any, AsyncIterator
+from agent.engine import ENGINE
+from agent.unil.singleflight import READS
+from shared.schemas.event_schemas import DockerEventSchema
+
+# Events of a subscriber not read yet. If it is exceeded,
+# the subscriber is dropped and expected to resync after reconnecting.
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+# Events that change the state of containers and images,
+# others e.g. exec_start of healthchecks are noise
+EVENTS_FILTERS = {
+    "type": ["container", "image"],
+    "event": [
+        "create",
+        "start",
+        "restart",
+        "stop",
+        "die",
+        "kill",
+        "oom",
+        "pause",
+        "unpause",
+        "destroy",
+        "rename",
+        "update",
+        "health_status",
+        "pull",
+        "tag",
+        "untag",
+        "delete",
+        "import",
+        "load",
+    ],
+}
+
+# End of the events of a subscriber
+_END = None
+
+
+def _to_event(message: dict[str, Any]) -> DockerEventSchema | None:
+    """Convert event of the docker, None if it is not relevant"""
+    type = message.get("Type")
+    if type not in ("container", "image"):
+        return None
+    actor: dict[str, Any] = message.get("Actor") or {}
+    attributes: dict[str, str] = actor.get("Attributes") or {}
+    time_nano = message.get("timeNano")
+    return DockerEventSchema(
+        type=type,
+        action=message.get("Action") or "",
+        id=actor.get("ID") or "",
+        name=attributes.get("name"),
+        time=(
+            time_nano / 1e9
+            if time_nano
+            else float(message.get("time") or time.time())
+        ),
+    )
+
+
+class DockerEventsHub:
+    """
+    One subscription to the docker events, shared by the subscribers.
+    It is started with the first subscriber and stopped after the last.
+    Events also invalidate the read cache, so changes made
+    bypassing the agent are not served from it.
+    """
+
+    def __init__(self):
+        self._subscribers: set[
+            asyncio.Queue[DockerEventSchema | None]
+        ] = set()
+        self._task: asyncio.Task | None = None
+
+    @asynccontextmanager
+    async def subscribe(
+        self,
+    ) -> AsyncIterator[asyncio.Queue[DockerEventSchema | None]]:
+        """
+        Subscribe to the events.
+        All the events after the subscription are put to the queue,
+        None is put at the end of the events e.g. if docker is lost.
+        """
+        queue: asyncio.Queue[DockerEventSchema | None] = (
+            asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        )
+        self._subscribers.add(queue)
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+            if not self._subscribers and self._task:
+                self._task.cancel()
+                self._task = None
+
+    async def _run(self) -> None:
+        # A second before, so events of the subscription moment
+        # are not missed. Duplicates are harmless.
+        since = int(time.time()) - 1
+        try:
+            events = ENGINE.events(since, EVENTS_FILTERS)
+            async with aclosing(events):
+                async for message in events:
+                    event = _to_event(message)
+                    if event:
+                        READS.invalidate(event.type)
+                        self._publish(event)
+            logging.warning("Docker events stream ended")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.exception(e)
+        for queue in list(self._subscribers):
+            self._drop(queue)
+
+    def _publish(self, event: DockerEventSchema) -> None:
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logging.warning(
+                    "Subscriber of docker events is too slow, dropped"
+                )
+                self._drop(queue)
+
+    def _drop(self, queue: asyncio.Queue[DockerEventSchema | None]):
+        """Replace not read events of the subscriber with the end"""
+        self._subscribers.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(_END)
+
+
+EVENTS = DockerEventsHub()
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, TypeVar
+from agent.unil.cancellable_run import Operation
+from shared.schemas.metrics_schemas import ExecutorPoolMetricsSchema
+
+R = TypeVar("R")
+
+# Number of the last tasks used to calculate wait time metrics
+WAIT_WINDOW = 100
+
+
+class ExecutorPool:
+    """
+    Named thread pool with queue metrics.
+    :param name: name of the pool
+    :param workers: max number of threads
+    """
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(
+            workers, thread_name_prefix=f"{name}-pool"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._zombies = 0
+        self._waits: deque[float] = deque(maxlen=WAIT_WINDOW)
+
+    async def call(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        func: Callable[[], R],
+        timeout: float | None = None,
+    ) -> R:
+        """
+        Run func in the pool.
+        On timeout or cancel, docker cli processes of func are killed.
+        If func is still running after that, it is counted as zombie.
+        :param timeout: timeout in seconds (None is no timeout)
+        """
+        submitted = time.monotonic()
+        operation = Operation()
+        started = finished = zombie = False
+
+        def wrapper() -> R:
+            nonlocal started, finished
+            wait = time.monotonic() - submitted
+            with self._lock:
+                started = True
+                self._queued -= 1
+                self._active += 1
+                self._waits.append(wait)
+            try:
+                with operation:
+                    return func()
+            finally:
+                with self._lock:
+                    finished = True
+                    self._active -= 1
+                    self._completed += 1
+                    if zombie:
+                        self._zombies -= 1
+
+        def on_done(f: Future):
+            # Cancelled before it started
+            if f.cancelled():
+                with self._lock:
+                    self._queued -= 1
+
+        with self._lock:
+            self._queued += 1
+        future = self._executor.submit(wrapper)
+        future.add_done_callback(on_done)
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future, loop=loop), timeout
+            )
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            operation.cancel()
+            with self._lock:
+                if started and not finished:
+                    zombie = True
+                    self._zombies += 1
+            raise
+
+    def get_metrics(self) -> ExecutorPoolMetricsSchema:
+        with self._lock:
+            waits = list(self._waits)
+            return ExecutorPoolMetricsSchema(
+                name=self.name,
+                workers=self.workers,
+                active=self._active,
+                queued=self._queued,
+                completed=self._completed,
+                zombies=self._zombies,
+                wait_avg=(
+                    round(sum(waits) / len(waits), 4) if waits else 0
+                ),
+                wait_max=round(max(waits), 4) if waits else 0,
+            )
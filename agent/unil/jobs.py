@@ -0,0 +1,261 @@
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+from pydantic_core import to_json, to_jsonable_python
+from python_on_whales import DockerException
+from agent.config import Config
+from shared.schemas.job_schemas import JobKind, JobSchema, JobStatus
+from shared.schemas.metrics_schemas import JobsMetricsSchema
+
+
+class JobsLimitError(Exception):
+    """All job slots are taken by running jobs"""
+
+
+class JobKeyConflictError(Exception):
+    """Idempotency key is already used with another body"""
+
+
+def _get_error_message(e: BaseException) -> str:
+    if isinstance(e, DockerException):
+        return (e.stderr or e.stdout or str(e)).strip()
+    return str(e) or e.__class__.__name__
+
+
+class Job:
+    """
+    Long operation of the agent, running regardless of the request
+    that submitted it. Its result is kept until the job expires.
+    """
+
+    def __init__(
+        self, kind: JobKind, key: str | None, body_hash: str
+    ):
+        self.id = uuid.uuid4().hex
+        self.kind: JobKind = kind
+        self.key = key
+        self.body_hash = body_hash
+        self.status: JobStatus = "running"
+        self.created_at = time.time()
+        self.finished_at: float | None = None
+        self.progress: dict[str, Any] | None = None
+        self.result: Any = None
+        self.error: str | None = None
+        # Size of the serialized result in bytes
+        self.size = 0
+        # Incremented on every change of the state
+        self.version = 0
+        self.task: asyncio.Task | None = None
+        self._changed = asyncio.Event()
+        self._finished = asyncio.Event()
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status != "running"
+
+    def set_progress(self, progress: dict[str, Any]) -> None:
+        """Report progress of the operation"""
+        self.progress = progress
+        self._notify()
+
+    def _finish(
+        self,
+        status: JobStatus,
+        result: Any = None,
+        error: str | None = None,
+    ) -> None:
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished_at = time.time()
+        self._finished.set()
+        self._notify()
+
+    def _notify(self) -> None:
+        self.version += 1
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_changed(
+        self, version: int, timeout: float
+    ) -> None:
+        """
+        Wait for a change of the state after the version.
+        :param version: version of the state known to the caller
+        :param timeout: max time to wait in seconds
+        """
+        changed = self._changed
+        if self.version != version:
+            return
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def wait_finished(self, timeout: float) -> None:
+        """Wait for the end of the job, at most timeout seconds"""
+        try:
+            await asyncio.wait_for(self._finished.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def to_schema(self) -> JobSchema:
+        return JobSchema(
+            id=self.id,
+            kind=self.kind,
+            key=self.key,
+            status=self.status,
+            created_at=self.created_at,
+            finished_at=self.finished_at,
+            progress=self.progress,
+            result=self.result,
+            error=self.error,
+        )
+
+
+class JobManager:
+    """
+    Runs jobs and keeps their results.
+    Finished jobs expire after ttl, or earlier, oldest first,
+    when there are more than max_count jobs or their results
+    take more than max_size bytes.
+    :param max_count: max number of kept jobs
+    :param max_size: max total size of kept results in bytes
+    :param ttl: time to keep finished jobs in seconds
+    """
+
+    def __init__(self, max_count: int, max_size: int, ttl: int):
+        self.max_count = max_count
+        self.max_size = max_size
+        self.ttl = ttl
+        # Ordered by submission
+        self._jobs: dict[str, Job] = {}
+        self._keys: dict[tuple[str, str], str] = {}
+        self._submitted = 0
+        self._reused = 0
+        self._rejected = 0
+
+    def get(self, id: str) -> Job | None:
+        return self._jobs.get(id)
+
+    def submit(
+        self,
+        kind: JobKind,
+        key: str | None,
+        body: Any,
+        func: Callable[[Job], Awaitable[Any]],
+    ) -> Job:
+        """
+        Start the job, or get the job of the same kind and key.
+        :param kind: operation of the job
+        :param key: idempotency key
+        :param body: body of the operation, to detect key reuse
+        :param func: operation, it gets the job to report progress
+        :raises JobKeyConflictError: if the key is used with another body
+        :raises JobsLimitError: if there is no room for the job
+        """
+        body_hash = hashlib.sha256(to_json(body)).hexdigest()
+        if key:
+            existing = self._jobs.get(self._keys.get((kind, key), ""))
+            if existing and existing.body_hash != body_hash:
+                raise JobKeyConflictError(
+                    f"Key '{key}' is already used by another {kind} job"
+                )
+            if existing and existing.status not in (
+                "failed",
+                "cancelled",
+            ):
+                self._reused += 1
+                return existing
+        self._expire()
+        if len(self._jobs) >= self.max_count:
+            self._rejected += 1
+            raise JobsLimitError(
+                f"Too many jobs, max is {self.max_count}"
+            )
+        job = Job(kind, key, body_hash)
+        self._jobs[job.id] = job
+        if key:
+            self._keys[(kind, key)] = job.id
+        self._submitted += 1
+        job.task = asyncio.create_task(self._run(job, func))
+        return job
+
+    def cancel(self, job: Job) -> None:
+        if job.task and not job.task.done():
+            job.task.cancel()
+
+    async def _run(
+        self, job: Job, func: Callable[[Job], Awaitable[Any]]
+    ) -> None:
+        logging.info(f"Job {job.id} ({job.kind}) started")
+        try:
+            result = to_jsonable_python(
+                await func(job), by_alias=True
+            )
+        except asyncio.CancelledError:
+            logging.warning(f"Job {job.id} ({job.kind}) is cancelled")
+            job._finish("cancelled", error="Job is cancelled")
+            return
+        except Exception as e:
+            logging.exception(e)
+            job._finish("failed", error=_get_error_message(e))
+            self._expire()
+            return
+        size = len(to_json(result))
+        if size > self.max_size:
+            job._finish(
+                "failed",
+                error=f"Result of {size} bytes exceeds the jobs memory limit",
+            )
+        else:
+            job.size = size
+            job._finish("done", result)
+        logging.info(f"Job {job.id} ({job.kind}) is {job.status}")
+        self._expire()
+
+    def _expire(self) -> None:
+        """Remove expired jobs and the oldest ones above the limits"""
+        now = time.time()
+        finished = [j for j in self._jobs.values() if j.is_finished]
+        count = len(self._jobs)
+        size = sum(j.size for j in finished)
+        for job in finished:
+            expired = now - (job.finished_at or now) > self.ttl
+            if not (
+                expired
+                or count >= self.max_count
+                or size > self.max_size
+            ):
+                continue
+            self._remove(job)
+            count -= 1
+            size -= job.size
+
+    def _remove(self, job: Job) -> None:
+        del self._jobs[job.id]
+        if job.key and self._keys.get((job.kind, job.key)) == job.id:
+            del self._keys[(job.kind, job.key)]
+
+    def get_metrics(self) -> JobsMetricsSchema:
+        return JobsMetricsSchema(
+            max_count=self.max_count,
+            running=sum(
+                not j.is_finished for j in self._jobs.values()
+            ),
+            kept=len(self._jobs),
+            results_size=sum(j.size for j in self._jobs.values()),
+            submitted=self._submitted,
+            reused=self._reused,
+            rejected=self._rejected,
+        )
+
+
+JOBS = JobManager(
+    max_count=Config.JOBS_MAX_COUNT,
+    max_size=Config.JOBS_MAX_MEMORY * 1024 * 1024,
+    ttl=Config.JOBS_TTL,
+)
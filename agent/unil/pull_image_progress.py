@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import re
+import time
+from contextlib import aclosing
+from typing import Any, AsyncIterator
+from agent.engine import ENGINE
+from agent.unil.singleflight import READS
+from shared.schemas.image_schemas import (
+    PullImageProgressEventSchema,
+    PullLayerProgressSchema,
+)
+
+# Docker reports bytes every few kilobytes,
+# so such events are sent not more often than this (seconds).
+# Changes of a layer status are sent immediately.
+PROGRESS_INTERVAL = 0.5
+
+# Id of the layer, other messages have the tag
+# or no id at all e.g. {"id": "latest", "status": "Pulling from ..."}
+_LAYER_ID_RE = re.compile(r"^[0-9a-f]{12}$")
+
+
+def _apply_message(
+    layers: dict[str, PullLayerProgressSchema],
+    message: dict[str, Any],
+) -> tuple[str, bool] | None:
+    """
+    Apply progress message of the docker to the layers.
+    :returns: id of the layer and whether its status changed,
+        None if it is not a message of a layer
+    """
+    id = message.get("id") or ""
+    status = message.get("status") or ""
+    if not status or not _LAYER_ID_RE.match(id):
+        return None
+    layer = layers.get(id)
+    if not layer:
+        layer = layers[id] = PullLayerProgressSchema(
+            id=id, status=status
+        )
+        status_changed = True
+    else:
+        status_changed = layer.status != status
+        layer.status = status
+    detail: dict = message.get("progressDetail") or {}
+    current = detail.get("current")
+    if detail.get("total"):
+        layer.total = detail["total"]
+    if status == "Downloading" and current is not None:
+        layer.downloaded = current
+    elif status == "Extracting" and current is not None:
+        layer.extracted = current
+    elif status in ("Download complete", "Verifying Checksum"):
+        layer.downloaded = layer.total or layer.downloaded
+    elif status == "Pull complete":
+        layer.downloaded = layer.total or layer.downloaded
+        layer.extracted = layer.total or layer.extracted
+    return id, status_changed
+
+
+async def pull_image_progress(
+    image: str, stall_timeout: int
+) -> AsyncIterator[PullImageProgressEventSchema]:
+    """
+    Pull the image, yielding progress events of its layers.
+    Last event is always the done one.
+    :param image: image spec e.g. quenary/tugtainer:latest
+    :param stall_timeout: the pull is aborted
+        if there is no progress for this time in seconds
+    """
+    layers: dict[str, PullLayerProgressSchema] = {}
+    changed: set[str] = set()
+    start = time.monotonic()
+
+    def get_event(**kwargs: Any) -> PullImageProgressEventSchema:
+        event = PullImageProgressEventSchema(
+            layers=[
+                layers[id].model_copy() for id in sorted(changed)
+            ],
+            downloaded=sum(l.downloaded for l in layers.values()),
+            extracted=sum(l.extracted for l in layers.values()),
+            total=sum(l.total or 0 for l in layers.values()),
+            elapsed=round(time.monotonic() - start, 2),
+            **kwargs,
+        )
+        changed.clear()
+        return event
+
+    logging.info(f"Pulling image '{image}'...")
+    try:
+        with READS.mutating("image"):
+            messages = ENGINE.image_pull_progress(image)
+            last_sent = start
+            async with aclosing(messages):
+                while True:
+                    try:
+                        message = await asyncio.wait_for(
+                            anext(messages), stall_timeout
+                        )
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.TimeoutError:
+                        logging.error(
+                            f"Pull of '{image}' has no progress for {stall_timeout}s, aborted"
+                        )
+                        yield get_event(
+                            done=True,
+                            ok=False,
+                            message=f"No progress for {stall_timeout} seconds, the pull is aborted",
+                        )
+                        return
+                    applied = _apply_message(layers, message)
+                    if not applied:
+                        continue
+                    id, status_changed = applied
+                    changed.add(id)
+                    now = time.monotonic()
+                    if (
+                        status_changed
+                        or now - last_sent >= PROGRESS_INTERVAL
+                    ):
+                        last_sent = now
+                        yield get_event()
+            inspect = await ENGINE.image_inspect(image)
+    except Exception as e:
+        logging.exception(e)
+        yield get_event(
+            done=True,
+            ok=False,
+            message=str(e) or e.__class__.__name__,
+        )
+        return
+    yield get_event(done=True, image=inspect)
@@ -0,0 +1,218 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+import httpx
+from agent.config import Config
+
+DOCKER_HUB = "docker.io"
+DOCKER_HUB_API = "registry-1.docker.io"
+
+# Manifest media types, index types first to get the same digest
+# that is stored in local repo digests for multi-platform images.
+MANIFEST_ACCEPT = ", ".join(
+    [
+        "application/vnd.oci.image.index.v1+json",
+        "application/vnd.docker.distribution.manifest.list.v2+json",
+        "application/vnd.oci.image.manifest.v1+json",
+        "application/vnd.docker.distribution.manifest.v2+json",
+        "application/vnd.docker.distribution.manifest.v1+prettyjws",
+    ]
+)
+
+_CHALLENGE_PARAM_RE = re.compile(r'(\w+)="([^"]*)"')
+
+
+@dataclass
+class ImageReference:
+    """
+    Parsed image spec
+    :param registry: registry domain e.g. docker.io or ghcr.io
+    :param repository: repository path e.g. library/nginx
+    :param reference: tag or digest
+    """
+
+    registry: str
+    repository: str
+    reference: str
+
+    @property
+    def is_digest(self) -> bool:
+        return self.reference.startswith("sha256:")
+
+    @property
+    def api_host(self) -> str:
+        if self.registry == DOCKER_HUB:
+            return DOCKER_HUB_API
+        return self.registry
+
+
+def parse_image_reference(image_spec: str) -> ImageReference:
+    """
+    Parse image spec the same way as docker does.
+    E.g. quenary/tugtainer:latest -> docker.io, quenary/tugtainer, latest
+    """
+    name = image_spec
+    reference = "latest"
+    digest = None
+    if "@" in name:
+        name, digest = name.split("@", 1)
+    slash = name.rfind("/")
+    colon = name.rfind(":")
+    if colon > slash:
+        name, reference = name[:colon], name[colon + 1 :]
+    if digest:
+        reference = digest
+    parts = name.split("/", 1)
+    if len(parts) == 2 and (
+        "." in parts[0] or ":" in parts[0] or parts[0] == "localhost"
+    ):
+        registry, repository = parts
+    else:
+        registry, repository = DOCKER_HUB, name
+    if registry in ("index.docker.io", "registry-1.docker.io"):
+        registry = DOCKER_HUB
+    if registry == DOCKER_HUB and "/" not in repository:
+        repository = f"library/{repository}"
+    return ImageReference(
+        registry=registry, repository=repository, reference=reference
+    )
+
+
+def _is_insecure(registry: str) -> bool:
+    host = registry.split(":", 1)[0]
+    return (
+        host == "localhost"
+        or host.startswith("127.")
+        or registry in Config.INSECURE_REGISTRIES
+    )
+
+
+def _read_docker_config() -> dict:
+    """Read docker config.json, empty if there is no valid one"""
+    path = os.path.join(Config.DOCKER_CONFIG, "config.json")
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _get_credentials(registry: str) -> tuple[str, str] | None:
+    """Get registry credentials from docker config.json (if any)"""
+    auths: dict = _read_docker_config().get("auths", {})
+    keys = [registry, f"https://{registry}", f"http://{registry}"]
+    if registry == DOCKER_HUB:
+        keys.append("https://index.docker.io/v1/")
+    for key in keys:
+        auth = auths.get(key, {}).get("auth")
+        if not auth:
+            continue
+        try:
+            username, password = (
+                base64.b64decode(auth).decode().split(":", 1)
+            )
+            return username, password
+        except ValueError:
+            logging.warning(f"Malformed credentials for {registry}")
+    return None
+
+
+def has_credential_helper(image_spec: str) -> bool:
+    """
+    Whether credentials of the image registry are kept
+    by a credential helper, that only docker cli can use.
+    """
+    config = _read_docker_config()
+    registry = parse_image_reference(image_spec).registry
+    return bool(
+        config.get("credsStore")
+        or registry in config.get("credHelpers", {})
+    )
+
+
+def get_registry_auth(image_spec: str) -> str | None:
+    """
+    Get value of X-Registry-Auth header of the docker engine api
+    for the image registry, from docker config.json (if any)
+    """
+    registry = parse_image_reference(image_spec).registry
+    credentials = _get_credentials(registry)
+    if not credentials:
+        return None
+    username, password = credentials
+    auth = {
+        "username": username,
+        "password": password,
+        "serveraddress": registry,
+    }
+    return base64.urlsafe_b64encode(json.dumps(auth).encode()).decode(
+        "ascii"
+    )
+
+
+async def _get_auth_header(
+    client: httpx.AsyncClient,
+    challenge: str,
+    ref: ImageReference,
+) -> str | None:
+    """Get authorization header for WWW-Authenticate challenge"""
+    credentials = _get_credentials(ref.registry)
+    scheme = challenge.split(" ", 1)[0].lower()
+    if scheme == "basic":
+        if not credentials:
+            return None
+        return "Basic " + base64.b64encode(
+            ":".join(credentials).encode()
+        ).decode("ascii")
+    if scheme != "bearer":
+        return None
+    params = dict(_CHALLENGE_PARAM_RE.findall(challenge))
+    realm = params.pop("realm", None)
+    if not realm:
+        return None
+    params.setdefault("scope", f"repository:{ref.repository}:pull")
+    resp = await client.get(realm, params=params, auth=credentials)
+    resp.raise_for_status()
+    data = resp.json()
+    token = data.get("token") or data.get("access_token")
+    return f"Bearer {token}" if token else None
+
+
+async def get_remote_digest(image_spec: str) -> str:
+    """
+    Get digest of the image manifest from the registry without pulling.
+    For multi-platform images it is the digest of the index,
+    the same that docker stores in repo digests on pull.
+    """
+    ref = parse_image_reference(image_spec)
+    if ref.is_digest:
+        return ref.reference
+    scheme = "http" if _is_insecure(ref.registry) else "https"
+    url = f"{scheme}://{ref.api_host}/v2/{ref.repository}/manifests/{ref.reference}"
+    headers = {"Accept": MANIFEST_ACCEPT}
+    async with httpx.AsyncClient(
+        timeout=Config.DOCKER_TIMEOUT, follow_redirects=True
+    ) as client:
+        resp = await client.head(url, headers=headers)
+        if resp.status_code == 401:
+            auth = await _get_auth_header(
+                client, resp.headers.get("www-authenticate", ""), ref
+            )
+            if auth:
+                headers["Authorization"] = auth
+                resp = await client.head(url, headers=headers)
+        resp.raise_for_status()
+        digest = resp.headers.get("docker-content-digest")
+        if digest:
+            return digest
+        # Some registries omit digest header on HEAD
+        resp = await client.get(url, headers=headers)
+        resp.raise_for_status()
+        return resp.headers.get(
+            "docker-content-digest"
+        ) or "sha256:" + (hashlib.sha256(resp.content).hexdigest())
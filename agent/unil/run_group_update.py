@@ -0,0 +1,411 @@
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable
+from python_on_whales.components.container.models import (
+    ContainerInspectResult,
+)
+from python_on_whales.utils import run as docker_run_cmd
+from agent.docker_client import DOCKER
+from agent.engine import ENGINE
+from agent.engine.cli_engine import LONG_TIMEOUT
+from agent.unil.asyncall import asyncall
+from agent.unil.singleflight import READS
+from agent.unil.wait_container_state import wait_container_state
+from shared.schemas.group_update_schemas import (
+    ASIDE_SUFFIX,
+    GroupUpdateEventSchema,
+    GroupUpdateItemSchema,
+    GroupUpdateOutcome,
+    GroupUpdatePlanSchema,
+    GroupUpdateStep,
+)
+
+# Running updates. They are not bound to the events stream,
+# so a disconnected client does not interrupt the update.
+_TASKS: set[asyncio.Task] = set()
+
+Emit = Callable[[GroupUpdateEventSchema], None]
+
+
+async def run_group_update(
+    plan: GroupUpdatePlanSchema,
+) -> AsyncIterator[GroupUpdateEventSchema]:
+    """
+    Run the group update plan, yielding progress events.
+    Last event is always the 'done' step.
+    :param plan: plan of the update
+    """
+    queue: asyncio.Queue[GroupUpdateEventSchema | None] = (
+        asyncio.Queue()
+    )
+    task = asyncio.create_task(_execute_plan(plan, queue.put_nowait))
+    _TASKS.add(task)
+    task.add_done_callback(_TASKS.discard)
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+    while (event := await queue.get()) is not None:
+        yield event
+
+
+def _is_container_healthy(c: ContainerInspectResult) -> bool:
+    """Running and healthy, or just running if there is no healthcheck"""
+    state = c.state
+    if not state or state.status != "running":
+        return False
+    return not state.health or state.health.status == "healthy"
+
+
+def _is_updatable(item: GroupUpdateItemSchema) -> bool:
+    return bool(
+        item.update
+        and item.config
+        and item.new_config
+        and item.old_image_id
+        and item.image_spec
+    )
+
+
+def _get_error_message(e: Exception) -> str:
+    return str(e) or e.__class__.__name__
+
+
+async def _step(
+    emit: Emit,
+    step: GroupUpdateStep,
+    name: str,
+    func: Callable[[], Awaitable[Any]],
+) -> Any:
+    """Run docker operation as a step of the update"""
+    logging.info(f"Group update step '{step}' of '{name}'...")
+    try:
+        with READS.mutating():
+            res = await func()
+    except Exception as e:
+        logging.exception(e)
+        emit(
+            GroupUpdateEventSchema(
+                step=step,
+                container=name,
+                ok=False,
+                message=_get_error_message(e),
+            )
+        )
+        raise
+    emit(GroupUpdateEventSchema(step=step, container=name))
+    return res
+
+
+async def _run_commands(item: GroupUpdateItemSchema, emit: Emit):
+    """Run commands after container started, errors are ignored"""
+    for c in item.commands:
+        command = DOCKER.config.docker_cmd + c
+        try:
+            await _step(
+                emit,
+                "command",
+                item.name,
+                lambda: asyncall(
+                    lambda: docker_run_cmd(command),
+                    asyncall_timeout=LONG_TIMEOUT,
+                    asyncall_pool="long",
+                ),
+            )
+        except Exception:
+            logging.error(f"Error while running command {c}")
+
+
+async def _wait_healthy(
+    item: GroupUpdateItemSchema, emit: Emit
+) -> tuple[ContainerInspectResult, bool, float]:
+    """
+    Wait for container health.
+    :returns: inspect data, is healthy, time spent in seconds
+    """
+    start = time.monotonic()
+    c = await wait_container_state(item.name, item.health_timeout)
+    health_wait = round(time.monotonic() - start, 2)
+    healthy = _is_container_healthy(c)
+    emit(
+        GroupUpdateEventSchema(
+            step="health",
+            container=item.name,
+            ok=healthy,
+            health_wait=health_wait,
+        )
+    )
+    return c, healthy, health_wait
+
+
+def _emit_result(
+    emit: Emit,
+    name: str,
+    outcome: GroupUpdateOutcome,
+    ok: bool = True,
+    c: ContainerInspectResult | None = None,
+    health_wait: float | None = None,
+    message: str | None = None,
+    recover_time: float | None = None,
+):
+    emit(
+        GroupUpdateEventSchema(
+            step="result",
+            container=name,
+            ok=ok,
+            outcome=outcome,
+            inspect=c,
+            health_wait=health_wait,
+            recover_time=recover_time,
+            message=message,
+        )
+    )
+
+
+def _get_aside_name(name: str) -> str:
+    """Name of the old container, kept aside during the update"""
+    return f"{name}{ASIDE_SUFFIX}"
+
+
+async def _update_container(
+    item: GroupUpdateItemSchema, emit: Emit
+) -> GroupUpdateOutcome:
+    """
+    Recreate container with new config.
+    The old container is renamed aside and removed only after
+    the new one is healthy, so roll back is just rename and start.
+    """
+    name = item.name
+    aside = _get_aside_name(name)
+    image_spec = str(item.image_spec)
+    old_image_id = str(item.old_image_id)
+    config = item.config.model_dump(exclude_unset=True)  # type: ignore
+    new_config = item.new_config.model_dump(exclude_unset=True)  # type: ignore
+    # Whether the name is taken by the new container
+    renamed = False
+    try:
+        if await ENGINE.container_exists(aside):
+            logging.warning(
+                f"Removing leftover container '{aside}'..."
+            )
+            await _step(
+                emit,
+                "remove",
+                aside,
+                lambda: ENGINE.container_remove(aside, force=True),
+            )
+        await _step(
+            emit,
+            "rename",
+            name,
+            lambda: ENGINE.container_rename(name, aside),
+        )
+        renamed = True
+        await _step(
+            emit,
+            "create",
+            name,
+            lambda: ENGINE.container_create(**new_config),
+        )
+        await _step(
+            emit, "start", name, lambda: ENGINE.container_start(name)
+        )
+        await _run_commands(item, emit)
+        c, healthy, health_wait = await _wait_healthy(item, emit)
+        if healthy:
+            try:
+                await _step(
+                    emit,
+                    "remove",
+                    aside,
+                    lambda: ENGINE.container_remove(aside),
+                )
+            except Exception:
+                logging.error(
+                    f"Failed to remove old container '{aside}'"
+                )
+            _emit_result(
+                emit, name, "updated", c=c, health_wait=health_wait
+            )
+            return "updated"
+        logging.warning(
+            f"Container '{name}' is unhealthy, rolling back..."
+        )
+    except Exception:
+        logging.error(f"Update of '{name}' failed, rolling back...")
+    failed_at = time.monotonic()
+    # Rolling back
+    try:
+        # Remove possibly existing new container
+        if renamed and await ENGINE.container_exists(name):
+            await _step(
+                emit,
+                "remove",
+                name,
+                lambda: ENGINE.container_remove(name, force=True),
+            )
+        # Old container uses the image by id,
+        # so the tag is restored only for consistency
+        try:
+            await _step(
+                emit,
+                "rollback",
+                name,
+                lambda: ENGINE.image_tag(old_image_id, image_spec),
+            )
+        except Exception:
+            logging.error(f"Failed to tag previous image of '{name}'")
+        if await ENGINE.container_exists(aside):
+            await _step(
+                emit,
+                "rename",
+                aside,
+                lambda: ENGINE.container_rename(aside, name),
+            )
+        elif not await ENGINE.container_exists(name):
+            logging.warning(
+                f"Old container '{name}' is lost, creating it from config..."
+            )
+            await _step(
+                emit,
+                "create",
+                name,
+                lambda: ENGINE.container_create(**config),
+            )
+        await _step(
+            emit, "start", name, lambda: ENGINE.container_start(name)
+        )
+        await _run_commands(item, emit)
+        c, healthy, health_wait = await _wait_healthy(item, emit)
+        recover_time = round(time.monotonic() - failed_at, 2)
+        logging.warning(
+            f"Container '{name}' recovered in {recover_time}s"
+        )
+        _emit_result(
+            emit,
+            name,
+            "rolled_back",
+            ok=healthy,
+            c=c,
+            health_wait=health_wait,
+            recover_time=recover_time,
+        )
+        return "rolled_back"
+    except Exception as e:
+        logging.error(f"Failed to roll back container '{name}'!")
+        _emit_result(
+            emit,
+            name,
+            "failed",
+            ok=False,
+            message=_get_error_message(e),
+        )
+        return "failed"
+
+
+async def _start_container(item: GroupUpdateItemSchema, emit: Emit):
+    """Start not updatable container"""
+    name = item.name
+    try:
+        await _step(
+            emit, "start", name, lambda: ENGINE.container_start(name)
+        )
+        await _run_commands(item, emit)
+        c, healthy, health_wait = await _wait_healthy(item, emit)
+        _emit_result(
+            emit,
+            name,
+            "started",
+            ok=healthy,
+            c=c,
+            health_wait=health_wait,
+        )
+    except Exception as e:
+        logging.warning(
+            f"Failed to start container '{name}'. Continue..."
+        )
+        _emit_result(
+            emit,
+            name,
+            "started",
+            ok=False,
+            message=_get_error_message(e),
+        )
+
+
+async def _stop_layers(
+    plan: GroupUpdatePlanSchema, emit: Emit
+) -> bool:
+    """
+    Stop containers from most dependent layer.
+    On failure, stopped containers are started back.
+    :returns: whether all containers are stopped
+    """
+    for layer in plan.layers[::-1]:
+        results = await asyncio.gather(
+            *[
+                _step(
+                    emit,
+                    "stop",
+                    item.name,
+                    lambda name=item.name: ENGINE.container_stop(
+                        name
+                    ),
+                )
+                for item in layer
+            ],
+            return_exceptions=True,
+        )
+        if any(isinstance(r, Exception) for r in results):
+            logging.error(
+                "Failed to stop container. Starting containers back..."
+            )
+            for layer in plan.layers:
+                for item in layer:
+                    try:
+                        await _step(
+                            emit,
+                            "start",
+                            item.name,
+                            lambda name=item.name: ENGINE.container_start(
+                                name
+                            ),
+                        )
+                    except Exception:
+                        pass
+            return False
+    return True
+
+
+async def _execute_plan(plan: GroupUpdatePlanSchema, emit: Emit):
+    try:
+        if not await _stop_layers(plan, emit):
+            emit(
+                GroupUpdateEventSchema(
+                    step="done",
+                    ok=False,
+                    message="Failed to stop containers",
+                )
+            )
+            return
+        # Indicates was there a failed roll back.
+        # If True, the following updates will not be processed.
+        any_failed: bool = False
+
+        async def process(item: GroupUpdateItemSchema):
+            nonlocal any_failed
+            if _is_updatable(item) and not any_failed:
+                outcome = await _update_container(item, emit)
+                if outcome == "failed":
+                    any_failed = True
+            else:
+                await _start_container(item, emit)
+
+        for layer in plan.layers:
+            await asyncio.gather(*[process(item) for item in layer])
+        emit(GroupUpdateEventSchema(step="done"))
+    except Exception as e:
+        logging.exception(e)
+        emit(
+            GroupUpdateEventSchema(
+                step="done", ok=False, message=_get_error_message(e)
+            )
+        )
@@ -0,0 +1,31 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from shared.util.signature import (
+    RAW_SIGNATURE_VERSION,
+    X_SIGNATURE_VERSION,
+)
+
+
+class SignatureVersionMiddleware:
+    """
+    Advertise the latest signature version supported by the agent
+    in response headers, so the client can switch to it.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        async def send_with_version(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(raw=message["headers"])[
+                    X_SIGNATURE_VERSION
+                ] = RAW_SIGNATURE_VERSION
+            await send(message)
+
+        await self.app(scope, receive, send_with_version)
@@ -0,0 +1,139 @@
+import asyncio
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+from agent.config import Config
+from shared.schemas.metrics_schemas import ReadsMetricsSchema
+
+R = TypeVar("R")
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task, generation: int):
+        self.task = task
+        self.generation = generation
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Merges concurrent identical read calls into one call.
+    Results may be cached for a short time,
+    the cache is invalidated by mutations of the same kind of objects.
+    :param ttl: cache ttl in seconds (0 is no cache)
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        # Keys are (kind, *args)
+        self._flights: dict[tuple, _Flight] = {}
+        self._cache: dict[tuple, tuple[float, Any]] = {}
+        # Incremented on invalidation, so a call started before
+        # the mutation is neither joined nor cached after it.
+        self._generations: defaultdict[str, int] = defaultdict(int)
+        self._calls = 0
+        self._executed = 0
+        self._coalesced = 0
+        self._cache_hits = 0
+
+    async def do(
+        self,
+        kind: str,
+        key: tuple[Hashable, ...],
+        func: Callable[[], Awaitable[R]],
+    ) -> R:
+        """
+        Call func or join the same running call.
+        :param kind: kind of the objects e.g. container
+        :param key: arguments of the call, e.g. ("inspect", name)
+        :param func: read call
+        """
+        full_key = (kind, *key)
+        self._calls += 1
+        cached = self._cache.get(full_key)
+        if cached and cached[0] > time.monotonic():
+            self._cache_hits += 1
+            return cached[1]
+        flight = self._flights.get(full_key)
+        if flight:
+            self._coalesced += 1
+        else:
+            self._executed += 1
+            flight = _Flight(
+                asyncio.create_task(func()), self._generations[kind]
+            )
+            self._flights[full_key] = flight
+            flight.task.add_done_callback(
+                lambda _, flight=flight: self._on_done(
+                    kind, full_key, flight
+                )
+            )
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                # Every caller is gone e.g. clients disconnected
+                flight.task.cancel()
+
+    def _on_done(self, kind: str, key: tuple, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        task = flight.task
+        if (
+            self.ttl <= 0
+            or task.cancelled()
+            or task.exception()
+            or flight.generation != self._generations[kind]
+        ):
+            return
+        now = time.monotonic()
+        self._cache = {
+            k: v for k, v in self._cache.items() if v[0] > now
+        }
+        self._cache[key] = (now + self.ttl, task.result())
+
+    def invalidate(self, *kinds: str):
+        """
+        Invalidate cache and running calls of the kinds of objects.
+        Whole kind is invalidated, as an object may be referred
+        by different keys e.g. container name and id.
+        :param kinds: kinds of the objects (default is all)
+        """
+        # Every called kind has a generation
+        kinds = kinds or tuple(self._generations)
+        for kind in kinds:
+            self._generations[kind] += 1
+        self._cache = {
+            k: v for k, v in self._cache.items() if k[0] not in kinds
+        }
+        self._flights = {
+            k: v
+            for k, v in self._flights.items()
+            if k[0] not in kinds
+        }
+
+    @contextmanager
+    def mutating(self, *kinds: str):
+        """
+        Invalidate the kinds after the mutation, even if it failed.
+        Reads started during the mutation are not cached.
+        """
+        try:
+            yield
+        finally:
+            self.invalidate(*kinds)
+
+    def get_metrics(self) -> ReadsMetricsSchema:
+        return ReadsMetricsSchema(
+            cache_ttl=self.ttl,
+            calls=self._calls,
+            executed=self._executed,
+            coalesced=self._coalesced,
+            cache_hits=self._cache_hits,
+        )
+
+
+READS = SingleFlight(Config.READ_CACHE_TTL)
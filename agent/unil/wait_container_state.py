@@ -0,0 +1,68 @@
+import asyncio
+import logging
+import time
+from contextlib import aclosing
+from python_on_whales.components.container.models import (
+    ContainerInspectResult,
+)
+from agent.engine import ENGINE
+
+# Events that may change the waited state of the container
+WAIT_EVENTS = ["health_status", "start", "die"]
+# Interval of polling if events are not available
+POLL_INTERVAL = 2
+
+
+def is_container_state_resolved(c: ContainerInspectResult) -> bool:
+    """
+    Whether the state of the container is final for waiting:
+    stopped, or running and healthy/unhealthy,
+    or just running if there is no healthcheck.
+    """
+    state = c.state
+    if not state:
+        return True
+    if state.status in ["exited", "dead"]:
+        return True
+    if state.status != "running":
+        return False
+    if state.health:
+        return state.health.status in ["healthy", "unhealthy"]
+    return True
+
+
+async def wait_container_state(
+    name_or_id: str, timeout: int
+) -> ContainerInspectResult:
+    """
+    Wait for resolved state of the container using docker events.
+    Returns as soon as the state is resolved or on timeout.
+    :param name_or_id: container name or id
+    :param timeout: timeout in seconds
+    :returns: last inspect result of the container
+    """
+    # Events since the moment before inspect, to not miss any
+    since = int(time.time()) - 1
+    container = await ENGINE.container_inspect(name_or_id)
+    if is_container_state_resolved(container) or not container.id:
+        return container
+    events = ENGINE.events(
+        since, {"container": [container.id], "event": WAIT_EVENTS}
+    )
+    try:
+        async with asyncio.timeout(timeout), aclosing(events):
+            async for _ in events:
+                container = await ENGINE.container_inspect(name_or_id)
+                if is_container_state_resolved(container):
+                    return container
+            logging.warning(
+                f"Events stream of '{name_or_id}' ended unexpectedly, polling instead"
+            )
+            while True:
+                await asyncio.sleep(POLL_INTERVAL)
+                container = await ENGINE.container_inspect(name_or_id)
+                if is_container_state_resolved(container):
+                    return container
+    except TimeoutError:
+        pass
+    return await ENGINE.container_inspect(name_or_id)
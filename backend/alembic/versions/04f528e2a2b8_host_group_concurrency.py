@@ -0,0 +1,39 @@
+"""host group concurrency
+
+Revision ID: 04f528e2a2b8
+Revises: e9fe57916800
+Create Date: 2026-10-18 19:02:47.108533
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "04f528e2a2b8"
+down_revision: Union[str, Sequence[str], None] = "e9fe57916800"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("hosts", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "group_concurrency",
+                sa.Integer(),
+                nullable=False,
+                default=3,
+                server_default=sa.text("3"),
+            )
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("hosts", schema=None) as batch_op:
+        batch_op.drop_column("group_concurrency")
@@ -0,0 +1,39 @@
+"""host pull concurrency
+
+Revision ID: 512994ff6f88
+Revises: 04f528e2a2b8
+Create Date: 2026-10-18 19:31:05.664120
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "512994ff6f88"
+down_revision: Union[str, Sequence[str], None] = "04f528e2a2b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("hosts", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "pull_concurrency",
+                sa.Integer(),
+                nullable=False,
+                default=2,
+                server_default=sa.text("2"),
+            )
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("hosts", schema=None) as batch_op:
+        batch_op.drop_column("pull_concurrency")
@@ -0,0 +1,39 @@
+"""host partial restart
+
+Revision ID: e44ce95995f3
+Revises: 512994ff6f88
+Create Date: 2026-10-18 18:37:54.396028
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e44ce95995f3"
+down_revision: Union[str, Sequence[str], None] = "512994ff6f88"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("hosts", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "partial_restart",
+                sa.Boolean(),
+                nullable=False,
+                default=False,
+                server_default=sa.text("FALSE"),
+            )
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("hosts", schema=None) as batch_op:
+        batch_op.drop_column("partial_restart")
@@ -0,0 +1,39 @@
+"""host check concurrency
+
+Revision ID: e9fe57916800
+Revises: 74c15c1c767e
+Create Date: 2026-10-18 18:40:12.512306
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e9fe57916800"
+down_revision: Union[str, Sequence[str], None] = "74c15c1c767e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("hosts", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "check_concurrency",
+                sa.Integer(),
+                nullable=False,
+                default=4,
+                server_default=sa.text("4"),
+            )
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("hosts", schema=None) as batch_op:
+        batch_op.drop_column("check_concurrency")
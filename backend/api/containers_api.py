@@ -32,9 +32,6 @@ from backend.core.container.container_group import (
     get_container_group,
 )
 from backend.helpers.self_container import get_self_container
-from shared.schemas.container_schemas import (
-    GetContainerListBodySchema,
-)
 from .util import map_container_schema, get_host, get_host_containers
 
 router = APIRouter(
@@ -56,10 +53,8 @@ async def containers_list(
     host = await get_host(host_id, session)
     if not host.enabled:
         raise HTTPException(409, "Host disabled")
-    client = HostsManager.get_host_client(host)
-    containers = await client.container.list(
-        GetContainerListBodySchema(all=True)
-    )
+    inventory = HostsManager.get_host_inventory(host)
+    containers = await inventory.list_containers(summary=True)
     result = await session.execute(
         select(ContainersModel).where(
             ContainersModel.host_id == host_id
@@ -144,9 +139,8 @@ async def check_container_ep(
     if not await client.container.exists(c_name):
         raise HTTPException(404, "Container not found")
     container = await client.container.inspect(c_name)
-    containers = await client.container.list(
-        GetContainerListBodySchema(all=True)
-    )
+    inventory = HostsManager.get_host_inventory(host)
+    containers = await inventory.list_containers()
     db_containers = await get_host_containers(session, host_id)
     group = get_container_group(
         container, containers, db_containers, update
@@ -12,6 +12,7 @@ from backend.db.session import get_async_session
 from backend.db.models import HostsModel
 from backend.api.util import get_host
 from aiohttp.client_exceptions import ClientResponseError
+from backend.exception import TugAgentUnavailableException
 
 router = APIRouter(
     prefix="/hosts",
@@ -58,7 +59,7 @@ async def create(
     await session.commit()
     await session.refresh(new_host)
     if new_host.enabled:
-        HostsManager.set_client(new_host)
+        await HostsManager.set_client(new_host)
     return new_host
 
 
@@ -90,9 +91,9 @@ async def update(
             setattr(host, key, value)
     await session.commit()
     await session.refresh(host)
-    HostsManager.remove_client(host.id)
+    await HostsManager.remove_client(host.id)
     if host.enabled:
-        HostsManager.set_client(host)
+        await HostsManager.set_client(host)
     return host
 
 
@@ -102,7 +103,7 @@ async def delete(
     session: AsyncSession = Depends(get_async_session),
 ):
     host = await get_host(id, session)
-    HostsManager.remove_client(host)
+    await HostsManager.remove_client(host.id)
     await session.delete(host)
     await session.commit()
     return {"detail": "Host deleted successfully"}
@@ -130,16 +131,25 @@ async def get_status(
     try:
         _ = await client.public.health()
         _ = await client.public.access()
-        return HostStatusResponseBody(id=id, ok=True)
-    except ClientResponseError as e:
+        return HostStatusResponseBody(
+            id=id,
+            ok=True,
+            circuit=client.breaker.get_status(),
+            concurrency=client.limiter.get_status(),
+        )
+    except (ClientResponseError, TugAgentUnavailableException) as e:
         return HostStatusResponseBody(
             id=id,
             ok=False,
             err=str(e),
+            circuit=client.breaker.get_status(),
+            concurrency=client.limiter.get_status(),
         )
     except Exception as e:
         return HostStatusResponseBody(
             id=id,
             ok=False,
             err="Unknown error",
+            circuit=client.breaker.get_status(),
+            concurrency=client.limiter.get_status(),
         )
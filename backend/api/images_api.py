@@ -8,11 +8,7 @@ from backend.schemas import ImageGetResponseBody
 from backend.api.util import map_image_schema, get_host
 from backend.core import HostsManager
 from backend.db.session import get_async_session
-from shared.schemas.container_schemas import (
-    GetContainerListBodySchema,
-)
 from shared.schemas.image_schemas import (
-    GetImageListBodySchema,
     PruneImagesRequestBodySchema,
 )
 
@@ -30,23 +26,14 @@ async def get_list(
     host_id: int, session: AsyncSession = Depends(get_async_session)
 ) -> list[ImageGetResponseBody]:
     host = await get_host(host_id, session)
-    client = HostsManager.get_host_client(host)
+    inventory = HostsManager.get_host_inventory(host)
     containers: list[ContainerInspectResult] = (
-        await client.container.list(
-            GetContainerListBodySchema(all=True)
-        )
+        await inventory.list_containers(summary=True)
     )
     used_images: list[str] = [c.image for c in containers if c.image]
-    dangling_images: list[str] = [
-        str(i.id)
-        for i in await client.image.list(
-            GetImageListBodySchema(filters={"dangling": "true"})
-        )
-    ]
+    images, dangling_images = await inventory.list_images()
     res: list[ImageGetResponseBody] = []
-    for image in await client.image.list(
-        GetImageListBodySchema(all=True)
-    ):
+    for image in images:
         dangling = image.id in dangling_images
         unused = image.id not in used_images
         res.append(map_image_schema(image, dangling, unused))
@@ -3,6 +3,7 @@ from fastapi import FastAPI, HTTPException, Request, status
 from backend.core import (
     schedule_check_on_init,
     load_hosts_on_init,
+    HostsManager,
 )
 from backend.api import (
     auth_router,
@@ -48,6 +49,7 @@ async def lifespan(app: FastAPI):
     await schedule_check_on_init()
     yield  # App
     # Code to run on shutdown
+    await HostsManager.close_all()
 
 
 app = FastAPI(root_path="/api", lifespan=lifespan)
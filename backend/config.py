@@ -17,6 +17,12 @@ class Config:
     PASSWORD_FILE: ClassVar[str]
     HTTPS: ClassVar[bool]
     DOMAIN: ClassVar[str | None]
+    AGENT_CONNECTIONS_LIMIT: ClassVar[int]
+    AGENT_KEEPALIVE_TIMEOUT: ClassVar[int]
+    AGENT_RETRIES: ClassVar[int]
+    AGENT_CIRCUIT_FAILURES: ClassVar[int]
+    AGENT_CIRCUIT_RESET: ClassVar[int]
+    AGENT_INVENTORY_RESYNC: ClassVar[int]
     
     # OIDC Configuration
     OIDC_ENABLED: ClassVar[bool]
@@ -55,6 +61,22 @@ class Config:
             )
             cls.HTTPS = os.getenv("HTTPS", "false").lower() == "true"
             cls.DOMAIN = os.getenv("DOMAIN")
+            cls.AGENT_CONNECTIONS_LIMIT = int(
+                os.getenv("AGENT_CONNECTIONS_LIMIT") or 30
+            )
+            cls.AGENT_KEEPALIVE_TIMEOUT = int(
+                os.getenv("AGENT_KEEPALIVE_TIMEOUT") or 30
+            )
+            cls.AGENT_RETRIES = int(os.getenv("AGENT_RETRIES") or 2)
+            cls.AGENT_CIRCUIT_FAILURES = int(
+                os.getenv("AGENT_CIRCUIT_FAILURES") or 5
+            )
+            cls.AGENT_CIRCUIT_RESET = int(
+                os.getenv("AGENT_CIRCUIT_RESET") or 30
+            )
+            cls.AGENT_INVENTORY_RESYNC = int(
+                os.getenv("AGENT_INVENTORY_RESYNC") or 300
+            )
             
             # OIDC Configuration
             cls.OIDC_ENABLED = os.getenv("OIDC_ENABLED", "false").lower() == "true"
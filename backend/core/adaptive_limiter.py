@@ -0,0 +1,68 @@
+import asyncio
+import logging
+import time
+from backend.schemas.hosts_schema import HostConcurrencyStatus
+
+
+class AdaptiveLimiter:
+    """
+    Adaptive limit of concurrent requests to the host's agent (AIMD).
+    The limit grows by one per limit of successful requests,
+    and is halved when the agent rejects a request as overloaded,
+    so the client finds the agent's capacity instead of overrunning it.
+    :param host_id: id of the host
+    :param max_limit: max number of concurrent requests
+    """
+
+    def __init__(self, host_id: int, max_limit: int):
+        self._host_id = host_id
+        self._max_limit = max_limit
+        self._limit = float(max_limit)
+        self._in_flight = 0
+        # Time of the last decrease, rejections of requests
+        # started before it are the same overload
+        self._decreased_at = 0.0
+        self._released = asyncio.Event()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    async def acquire(self) -> float:
+        """
+        Wait for a free slot.
+        :returns: time the request is started at
+        """
+        while self._in_flight >= self.limit:
+            released = self._released
+            await released.wait()
+        self._in_flight += 1
+        return time.monotonic()
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._released.set()
+        self._released = asyncio.Event()
+
+    def on_success(self) -> None:
+        self._limit = min(
+            self._max_limit, self._limit + 1 / self._limit
+        )
+
+    def on_overload(self, started: float) -> None:
+        """
+        The agent rejected the request as overloaded.
+        :param started: time the request is started at
+        """
+        if started < self._decreased_at:
+            return
+        self._limit = max(1, self._limit / 2)
+        self._decreased_at = time.monotonic()
+        logging.warning(
+            f"Agent of host {self._host_id} is overloaded, concurrency is reduced to {self.limit}"
+        )
+
+    def get_status(self) -> HostConcurrencyStatus:
+        return HostConcurrencyStatus(
+            limit=self.limit, in_flight=self._in_flight
+        )
@@ -1,6 +1,14 @@
+import asyncio
 from inspect import signature
-from typing import Any, Literal
+import json
+import logging
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Iterator, Literal
 from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_json
 from python_on_whales.components.container.models import (
     ContainerInspectResult,
 )
@@ -10,19 +18,150 @@ from python_on_whales.components.image.models import (
 from shared.schemas.command_schemas import RunCommandRequestBodySchema
 from shared.schemas.container_schemas import (
     GetContainerListBodySchema,
+    InspectContainersRequestBodySchema,
     CreateContainerRequestBodySchema,
+    RenameContainerRequestBodySchema,
 )
+from shared.schemas.group_update_schemas import (
+    GroupUpdateEventSchema,
+    GroupUpdatePlanSchema,
+)
+from backend.config import Config
+from backend.core.adaptive_limiter import AdaptiveLimiter
+from backend.core.circuit_breaker import CircuitBreaker
 from backend.db.models import HostsModel
+from backend.exception import (
+    TugAgentJobLostException,
+    TugException,
+)
 from backend.schemas.hosts_schema import HostInfo
+from shared.schemas.event_schemas import (
+    EVENTS_STREAM_HEARTBEAT,
+    EventsStreamMessageSchema,
+)
+from shared.schemas.job_schemas import (
+    JOB_STREAM_HEARTBEAT,
+    JobKind,
+    JobSchema,
+    SubmitJobRequestBodySchema,
+)
+from shared.schemas.metrics_schemas import (
+    X_ADMISSION_REJECTED,
+    AgentMetricsSchema,
+)
 from shared.schemas.image_schemas import (
     GetImageListBodySchema,
+    GetImageRemoteDigestRequestBodySchema,
     InspectImageRequestBodySchema,
+    InspectImagesRequestBodySchema,
     PruneImagesRequestBodySchema,
     PullImageRequestBodySchema,
     TagImageRequestBodySchema,
 )
-from shared.util.signature import get_signature_headers
+from shared.util.signature import (
+    RAW_SIGNATURE_VERSION,
+    X_SIGNATURE_VERSION,
+    get_signature_headers,
+)
 import aiohttp
+import gzip
+
+# Request bodies of this size and more are compressed,
+# if the agent supports it
+COMPRESS_MIN_SIZE = 4096
+COMPRESS_LEVEL = 5
+
+# Attempts to follow a job again after lost connection to the agent
+JOB_FOLLOW_RETRIES = 5
+
+# Base delay of retries in seconds, it is doubled for each retry
+# and randomized, so retries of many calls are spread
+RETRY_BASE_DELAY = 0.5
+
+# Max delay in seconds of the retry of a request
+# rejected by the agent as overloaded
+MAX_RETRY_AFTER = 60
+
+# Statuses of the proxy in front of the agent,
+# meaning the agent is not reachable
+_UNAVAILABLE_STATUSES = (502, 503, 504)
+
+# Detail of 404 of the agent for a path it has no endpoint for
+_MISSING_ENDPOINT_DETAIL = "Not Found"
+
+
+def is_endpoint_missing(e: BaseException) -> bool:
+    """
+    Whether the agent has no endpoint for the request,
+    e.g. it is of an older version, as opposed to 404
+    of a missing object e.g. a container or a job.
+    """
+    return (
+        isinstance(e, aiohttp.ClientResponseError)
+        and e.status == 404
+        and e.message == _MISSING_ENDPOINT_DETAIL
+    )
+
+
+async def _raise_for_status(resp: aiohttp.ClientResponse) -> None:
+    """
+    Raise ClientResponseError if the response is not ok,
+    with the detail of the agent's error as the message.
+    """
+    if resp.ok:
+        return
+    message = resp.reason or ""
+    try:
+        detail = (await resp.json()).get("detail")
+        if isinstance(detail, str):
+            message = detail
+    except (aiohttp.ClientError, ValueError, AttributeError):
+        pass
+    raise aiohttp.ClientResponseError(
+        resp.request_info,
+        resp.history,
+        status=resp.status,
+        message=message,
+        headers=resp.headers,
+    )
+
+
+def _get_retry_after(e: BaseException) -> float | None:
+    """
+    Get Retry-After of the request rejected as overloaded (429 or 503).
+    Such request was not processed, so it can be retried.
+    :returns: delay in seconds, None for other errors
+    """
+    if not isinstance(e, aiohttp.ClientResponseError) or (
+        e.status not in (429, 503)
+    ):
+        return None
+    try:
+        return max(0, float((e.headers or {})["Retry-After"]))
+    except (KeyError, ValueError):
+        return None
+
+
+def _is_admission_rejection(e: BaseException) -> bool:
+    """
+    Whether the request is rejected by the admission control
+    of the agent, as opposed to other limits e.g. of jobs
+    """
+    return isinstance(e, aiohttp.ClientResponseError) and bool(
+        (e.headers or {}).get(X_ADMISSION_REJECTED)
+    )
+
+
+def _is_transient_error(e: BaseException) -> bool:
+    """Whether the error means that the agent is not reachable"""
+    if _get_retry_after(e) is not None:
+        # The agent is alive, but busy
+        return False
+    if isinstance(e, aiohttp.ClientResponseError):
+        return e.status in _UNAVAILABLE_STATUSES
+    return isinstance(
+        e, (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+    )
 
 
 class AgentClient:
@@ -40,10 +179,148 @@ class AgentClient:
         self._long_timeout = (
             600  # timeout for potentially long requests
         )
+        self._session: aiohttp.ClientSession | None = None
+        # Whether the agent accepts gzip request bodies,
+        # it is advertised by Accept-Encoding of responses
+        self._gzip_requests = False
+        # Whether the agent verifies signature of the body bytes
+        self._raw_signature = False
+        # Number of running requests and streams
+        self._in_flight = 0
+        # Retired client closes its session when it is idle
+        self._retired = False
+        self._close_task: asyncio.Task | None = None
+        self.breaker = CircuitBreaker(
+            id,
+            Config.AGENT_CIRCUIT_FAILURES,
+            Config.AGENT_CIRCUIT_RESET,
+        )
+        self.limiter = AdaptiveLimiter(
+            id, Config.AGENT_CONNECTIONS_LIMIT
+        )
         self.public = AgentClientPublic(self)
         self.container = AgentClientContainer(self)
         self.image = AgentClientImage(self)
         self.command = AgentClientCommand(self)
+        self.job = AgentClientJob(self)
+        self.events = AgentClientEvents(self)
+
+    @property
+    def id(self) -> int:
+        """ID of the host"""
+        return self._id
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Get keep-alive session of the client.
+        Session is created lazily, as it requires running event loop.
+        """
+        if not self._session or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=Config.AGENT_CONNECTIONS_LIMIT,
+                    keepalive_timeout=Config.AGENT_KEEPALIVE_TIMEOUT,
+                ),
+            )
+        return self._session
+
+    async def close(self):
+        """Close the session and its connections pool"""
+        session, self._session = self._session, None
+        if session and not session.closed:
+            await session.close()
+
+    def retire(self):
+        """
+        Close the session once there are no running requests,
+        so operations in progress on the client are not broken
+        e.g. when the host is updated or removed.
+        Requests made after that open a new session, closed the same way.
+        """
+        self._retired = True
+        self._close_if_idle()
+
+    def _close_if_idle(self):
+        if self._retired and not self._in_flight:
+            self._close_task = asyncio.create_task(self.close())
+
+    @contextmanager
+    def _tracking(self) -> Iterator[None]:
+        """Count the running request or stream"""
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._close_if_idle()
+
+    def _prepare_request(
+        self,
+        method: str,
+        path: str,
+        body: dict | BaseModel | None,
+        params: dict[str, Any] | None = None,
+    ) -> tuple[bytes | None, dict[str, str]]:
+        """
+        Serialize json body once and sign the exact bytes
+        and the query, if the agent supports it.
+        Large body is compressed if the agent supports it,
+        the signature is verified after decompression.
+        :returns: data to be sent and headers
+        """
+        data: bytes | None = None
+        if isinstance(body, BaseModel):
+            data = body.model_dump_json(exclude_unset=True).encode()
+        elif body is not None:
+            data = to_json(body)
+        if self._raw_signature:
+            headers = get_signature_headers(
+                secret_key=self._secret,
+                method=method,
+                path=path,
+                body_bytes=data or b"",
+                query=params,
+            )
+        else:
+            headers = get_signature_headers(
+                secret_key=self._secret,
+                method=method,
+                path=path,
+                body=(
+                    body.model_dump(exclude_unset=True)
+                    if isinstance(body, BaseModel)
+                    else body
+                ),
+            )
+        if data is not None:
+            headers["Content-Type"] = "application/json"
+            if self._gzip_requests and len(data) >= COMPRESS_MIN_SIZE:
+                data = gzip.compress(data, COMPRESS_LEVEL)
+                headers["Content-Encoding"] = "gzip"
+        return data, headers
+
+    def _on_response(self, resp: aiohttp.ClientResponse):
+        """Remember what the agent supports"""
+        self._gzip_requests = "gzip" in resp.headers.get(
+            "Accept-Encoding", ""
+        )
+        self._raw_signature = (
+            resp.headers.get(X_SIGNATURE_VERSION)
+            == RAW_SIGNATURE_VERSION
+        )
+
+    def _on_error(self, e: BaseException, started: float):
+        """
+        Count the error by the circuit breaker and the limiter.
+        :param started: time the request is started at
+        """
+        if _is_transient_error(e):
+            self.breaker.on_failure()
+        else:
+            # The agent responded
+            self.breaker.on_success()
+        if _is_admission_rejection(e):
+            self.limiter.on_overload(started)
 
     async def _request(
         self,
@@ -51,27 +328,84 @@ class AgentClient:
         path: str,
         body: dict | BaseModel | None = None,
         timeout: int | None = None,
+        params: dict[str, Any] | None = None,
+        idempotent: bool = False,
+        limited: bool = True,
+    ) -> Any | None:
+        """
+        Request to the agent, through the circuit breaker
+        and the adaptive concurrency limit.
+        Requests rejected as overloaded are retried after Retry-After.
+        :param idempotent: whether the request can be retried
+            also if the agent is not reachable
+        :param limited: whether the request holds a slot
+            of the concurrency limit, mostly idle waits should not
+        """
+        retries = Config.AGENT_RETRIES
+        for attempt in range(retries + 1):
+            self.breaker.before_call()
+            if limited:
+                started = await self.limiter.acquire()
+            else:
+                started = time.monotonic()
+            try:
+                result = await self._request_once(
+                    method, path, body, timeout, params
+                )
+            except Exception as e:
+                self._on_error(e, started)
+                retry_after = _get_retry_after(e)
+                if attempt >= retries:
+                    raise
+                if retry_after is not None:
+                    delay = min(
+                        retry_after, MAX_RETRY_AFTER
+                    ) + random.uniform(0, RETRY_BASE_DELAY)
+                elif idempotent and _is_transient_error(e):
+                    delay = random.uniform(
+                        0, RETRY_BASE_DELAY * 2**attempt
+                    )
+                else:
+                    raise
+                logging.warning(
+                    f"Request {method} {path} to host {self._id} failed, retrying in {delay:.2f}s. {e.__class__.__name__}: {e}"
+                )
+                await asyncio.sleep(delay)
+                continue
+            finally:
+                if limited:
+                    self.limiter.release()
+            self.breaker.on_success()
+            if limited:
+                self.limiter.on_success()
+            return result
+
+    async def _request_once(
+        self,
+        method: Literal["GET", "POST", "PUT", "DELETE"],
+        path: str,
+        body: dict | BaseModel | None = None,
+        timeout: int | None = None,
+        params: dict[str, Any] | None = None,
     ) -> Any | None:
         if not timeout:
             timeout = self._timeout
         url = f"{self._url.rstrip('/')}/{path.lstrip('/')}"
-        if isinstance(body, BaseModel):
-            _body = body.model_dump(exclude_unset=True)
-        else:
-            _body = body
-        headers = get_signature_headers(
-            secret_key=self._secret,
-            method=method,
-            path=path,
-            body=_body,
-        )
-        async with aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=timeout)
-        ) as session:
+        data, headers = self._prepare_request(
+            method, path, body, params
+        )
+        with self._tracking():
+            session = self._get_session()
             async with session.request(
-                method, url, headers=headers, json=_body
+                method,
+                url,
+                headers=headers,
+                data=data,
+                params=params,
+                timeout=aiohttp.ClientTimeout(total=timeout),
             ) as resp:
-                resp.raise_for_status()
+                self._on_response(resp)
+                await _raise_for_status(resp)
                 if resp.content_length and resp.content_length > 0:
                     return await resp.json()
                 # Для chunked-ответов без content_length
@@ -80,6 +414,82 @@ class AgentClient:
                     return await resp.json() if text else None
                 return None
 
+    async def _stream(
+        self,
+        method: Literal["GET", "POST", "PUT", "DELETE"],
+        path: str,
+        body: dict | BaseModel | None = None,
+        timeout: int | None = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Request with streamed response of JSON lines (NDJSON).
+        :param timeout: timeout of waiting for each chunk of the stream
+        :returns: parsed lines
+        """
+        if not timeout:
+            timeout = self._timeout
+        url = f"{self._url.rstrip('/')}/{path.lstrip('/')}"
+        data, headers = self._prepare_request(method, path, body)
+        with self._tracking():
+            self.breaker.before_call()
+            # Streams are not limited by the limiter,
+            # they are long and mostly idle
+            started = time.monotonic()
+            try:
+                session = self._get_session()
+                async with session.request(
+                    method,
+                    url,
+                    headers=headers,
+                    data=data,
+                    timeout=aiohttp.ClientTimeout(
+                        total=None, sock_read=timeout
+                    ),
+                ) as resp:
+                    self._on_response(resp)
+                    await _raise_for_status(resp)
+                    self.breaker.on_success()
+                    buffer = b""
+                    async for chunk in resp.content.iter_any():
+                        buffer += chunk
+                        *lines, buffer = buffer.split(b"\n")
+                        for line in lines:
+                            if line.strip():
+                                yield json.loads(line)
+                    if buffer.strip():
+                        yield json.loads(buffer)
+            except Exception as e:
+                self._on_error(e, started)
+                raise
+
+    async def _run_job(
+        self,
+        kind: JobKind,
+        path: str,
+        body: BaseModel,
+        on_progress: Callable[[dict[str, Any]], None] | None = None,
+    ) -> Any:
+        """
+        Run potentially long operation as a job of the agent,
+        so its result is not lost with the connection.
+        Falls back to the plain request if the agent has no jobs,
+        but not if the job is lost, so the operation is not repeated.
+        :param kind: kind of the job
+        :param path: path of the plain request
+        :param body: body of the operation
+        :param on_progress: callback of the job progress
+        """
+        try:
+            return await self.job.run(kind, body, on_progress)
+        except aiohttp.ClientResponseError as e:
+            # 404 after the submission means the job is lost,
+            # it is raised by the run as such
+            if not is_endpoint_missing(e):
+                raise
+        return await self._request(
+            "POST", path, body, timeout=self._long_timeout
+        )
+
 
 class AgentClientPublic:
     def __init__(self, agent_client: AgentClient):
@@ -87,24 +497,48 @@ class AgentClientPublic:
 
     async def health(self):
         return await self._agent_client._request(
-            "GET", "/api/public/health"
+            "GET", "/api/public/health", idempotent=True
         )
 
     async def access(self):
         return await self._agent_client._request(
-            "GET", "/api/public/access"
+            "GET", "/api/public/access", idempotent=True
         )
 
+    async def metrics(self) -> AgentMetricsSchema:
+        data = await self._agent_client._request(
+            "GET", "/api/public/metrics", idempotent=True
+        )
+        return AgentMetricsSchema.model_validate(data)
+
 
 class AgentClientContainer:
     def __init__(self, agent_client: AgentClient):
         self._agent_client = agent_client
 
+    async def inspect_many(
+        self, body: InspectContainersRequestBodySchema
+    ) -> list[ContainerInspectResult]:
+        """Inspect many containers, not existing ones are skipped"""
+        data = await self._agent_client._request(
+            "POST",
+            f"/api/container/inspect_many",
+            body,
+            idempotent=True,
+        )
+        return TypeAdapter(
+            list[ContainerInspectResult]
+        ).validate_python(data or [])
+
     async def list(
         self, body: GetContainerListBodySchema
     ) -> list[ContainerInspectResult]:
+        """
+        Get containers.
+        With body.summary, only CONTAINER_SUMMARY_FIELDS are set.
+        """
         data = await self._agent_client._request(
-            "POST", f"/api/container/list", body
+            "POST", f"/api/container/list", body, idempotent=True
         )
         return TypeAdapter(
             list[ContainerInspectResult]
@@ -112,7 +546,9 @@ class AgentClientContainer:
 
     async def exists(self, name_or_id: str) -> bool:
         data = await self._agent_client._request(
-            "GET", f"/api/container/exists/{name_or_id}"
+            "GET",
+            f"/api/container/exists/{name_or_id}",
+            idempotent=True,
         )
         return bool(data)
 
@@ -120,18 +556,35 @@ class AgentClientContainer:
         self, name_or_id: str
     ) -> ContainerInspectResult:
         data = await self._agent_client._request(
-            "GET", f"/api/container/inspect/{name_or_id}"
+            "GET",
+            f"/api/container/inspect/{name_or_id}",
+            idempotent=True,
+        )
+        return ContainerInspectResult.model_validate(data)
+
+    async def wait_healthy(
+        self, name_or_id: str, timeout: int
+    ) -> ContainerInspectResult:
+        """
+        Wait on the agent side until container is healthy
+        (or running, if there is no healthcheck), unhealthy or stopped.
+        :returns: last inspect data of the container
+        """
+        data = await self._agent_client._request(
+            "GET",
+            f"/api/container/wait_healthy/{name_or_id}",
+            params={"timeout": timeout},
+            timeout=timeout + self._agent_client._timeout,
+            # Waiting does not load the agent
+            limited=False,
         )
         return ContainerInspectResult.model_validate(data)
 
     async def create(
         self, body: CreateContainerRequestBodySchema
     ) -> ContainerInspectResult:
-        data = await self._agent_client._request(
-            "POST",
-            f"/api/container/create",
-            body,
-            timeout=self._agent_client._long_timeout,
+        data = await self._agent_client._run_job(
+            "container_create", f"/api/container/create", body
         )
         return ContainerInspectResult.model_validate(data)
 
@@ -159,6 +612,32 @@ class AgentClientContainer:
         )
         return str(data)
 
+    async def rename(
+        self, name_or_id: str, body: RenameContainerRequestBodySchema
+    ) -> str:
+        data = await self._agent_client._request(
+            "POST",
+            f"/api/container/rename/{name_or_id}",
+            body,
+        )
+        return str(data)
+
+    async def update_group(
+        self, body: GroupUpdatePlanSchema
+    ) -> AsyncIterator[GroupUpdateEventSchema]:
+        """
+        Run group update plan on the agent side.
+        :returns: progress events, the last one is the 'done' step
+        """
+        async for data in self._agent_client._stream(
+            "POST",
+            f"/api/container/update_group",
+            body,
+            timeout=self._agent_client._long_timeout
+            + self._agent_client._timeout,
+        ):
+            yield GroupUpdateEventSchema.model_validate(data)
+
 
 class AgentClientImage:
     def __init__(self, agent_client: AgentClient):
@@ -168,40 +647,60 @@ class AgentClientImage:
         self, body: InspectImageRequestBodySchema
     ) -> ImageInspectResult:
         data = await self._agent_client._request(
-            "GET", f"/api/image/inspect", body
+            "GET", f"/api/image/inspect", body, idempotent=True
         )
         return ImageInspectResult.model_validate(data)
 
+    async def inspect_many(
+        self, body: InspectImagesRequestBodySchema
+    ) -> list[ImageInspectResult]:
+        """Inspect many images, not existing ones are skipped"""
+        data = await self._agent_client._request(
+            "POST", f"/api/image/inspect_many", body, idempotent=True
+        )
+        return TypeAdapter(list[ImageInspectResult]).validate_python(
+            data or []
+        )
+
     async def list(
         self, body: GetImageListBodySchema
     ) -> list[ImageInspectResult]:
         data = await self._agent_client._request(
-            "POST", f"/api/image/list", body
+            "POST", f"/api/image/list", body, idempotent=True
         )
         return TypeAdapter(list[ImageInspectResult]).validate_python(
             data or []
         )
 
     async def prune(self, body: PruneImagesRequestBodySchema) -> str:
-        data = await self._agent_client._request(
-            "POST",
-            f"/api/image/prune",
-            body,
-            timeout=self._agent_client._long_timeout,
+        data = await self._agent_client._run_job(
+            "image_prune", f"/api/image/prune", body
         )
         return str(data)
 
     async def pull(
-        self, body: PullImageRequestBodySchema
+        self,
+        body: PullImageRequestBodySchema,
+        on_progress: Callable[[dict[str, Any]], None] | None = None,
     ) -> ImageInspectResult:
-        data = await self._agent_client._request(
-            "POST",
-            f"/api/image/pull",
-            body,
-            timeout=self._agent_client._long_timeout,
+        """
+        Pull the image.
+        :param on_progress: callback of the pull progress,
+            data of PullImageProgressEventSchema
+        """
+        data = await self._agent_client._run_job(
+            "image_pull", f"/api/image/pull", body, on_progress
         )
         return ImageInspectResult.model_validate(data)
 
+    async def remote_digest(
+        self, body: GetImageRemoteDigestRequestBodySchema
+    ) -> str:
+        data = await self._agent_client._request(
+            "POST", f"/api/image/remote_digest", body, idempotent=True
+        )
+        return str(data)
+
     async def tag(self, body: TagImageRequestBodySchema):
         return await self._agent_client._request(
             "POST", f"/api/image/tag", body
@@ -215,13 +714,148 @@ class AgentClientCommand:
     async def run(
         self, body: RunCommandRequestBodySchema
     ) -> tuple[str, str]:
+        data = await self._agent_client._run_job(
+            "command_run", f"/api/command/run", body
+        )
+        return TypeAdapter(tuple[str, str]).validate_python(data)
+
+
+class AgentClientJob:
+    def __init__(self, agent_client: AgentClient):
+        self._agent_client = agent_client
+
+    async def submit(
+        self, body: SubmitJobRequestBodySchema
+    ) -> JobSchema:
         data = await self._agent_client._request(
             "POST",
-            f"/api/command/run",
+            f"/api/job/submit",
             body,
-            timeout=self._agent_client._long_timeout,
+            # Submission by the same key returns the same job
+            idempotent=bool(body.key),
         )
-        return TypeAdapter(tuple[str, str]).validate_python(data)
+        return JobSchema.model_validate(data)
+
+    async def get(self, job_id: str, wait: int = 0) -> JobSchema:
+        """
+        Get the job.
+        :param wait: wait for the end of the job,
+            but not more than this time in seconds
+        """
+        data = await self._agent_client._request(
+            "GET",
+            f"/api/job/{job_id}",
+            params={"wait": wait} if wait else None,
+            timeout=self._agent_client._timeout + wait,
+            idempotent=True,
+        )
+        return JobSchema.model_validate(data)
+
+    async def stream(self, job_id: str) -> AsyncIterator[JobSchema]:
+        """
+        Follow the job.
+        :returns: states of the job, the last one is finished
+        """
+        async for data in self._agent_client._stream(
+            "GET",
+            f"/api/job/{job_id}/stream",
+            timeout=self._agent_client._timeout
+            + JOB_STREAM_HEARTBEAT,
+        ):
+            yield JobSchema.model_validate(data)
+
+    async def cancel(self, job_id: str) -> JobSchema:
+        data = await self._agent_client._request(
+            "DELETE", f"/api/job/{job_id}"
+        )
+        return JobSchema.model_validate(data)
+
+    async def run(
+        self,
+        kind: JobKind,
+        body: BaseModel,
+        on_progress: Callable[[dict[str, Any]], None] | None = None,
+    ) -> Any:
+        """
+        Submit the job and follow it until the end.
+        If the response to the submission is lost, the job is
+        submitted again with the same idempotency key, so the agent
+        returns the same job. After that the job is only followed,
+        if it is gone e.g. with restart of the agent, it is not
+        submitted again, as the operation may have been performed.
+        :param kind: kind of the job
+        :param body: body of the operation
+        :param on_progress: callback of the job progress
+        :returns: result of the job
+        :raises ClientResponseError: 404 if the agent has no jobs
+        :raises TugAgentJobLostException: if the job is lost
+        :raises TugException: if the job failed
+        """
+        submit_body = SubmitJobRequestBodySchema(
+            kind=kind,
+            body=body.model_dump(mode="json", exclude_unset=True),
+            key=uuid.uuid4().hex,
+        )
+        job: JobSchema | None = None
+        failures = 0
+        while True:
+            try:
+                if not job:
+                    job = await self.submit(submit_body)
+                async for job in self.stream(job.id):
+                    if on_progress and job.progress:
+                        on_progress(job.progress)
+                if job.status != "running":
+                    break
+                message = "Stream ended before the end of the job"
+            except aiohttp.ClientResponseError as e:
+                # Not found on submission, the agent has no jobs
+                if e.status != 404 or not job:
+                    raise
+                raise TugAgentJobLostException(
+                    kind, job.id, "Job not found"
+                ) from e
+            except (
+                aiohttp.ClientConnectionError,
+                aiohttp.ClientPayloadError,
+                asyncio.TimeoutError,
+            ) as e:
+                message = str(e) or e.__class__.__name__
+            failures += 1
+            if failures > JOB_FOLLOW_RETRIES:
+                if not job:
+                    raise TugException(
+                        f"Failed to submit {kind} job: {message}"
+                    )
+                raise TugAgentJobLostException(kind, job.id, message)
+            logging.warning(
+                f"Lost {kind} job, following it again. {message}"
+            )
+            await asyncio.sleep(min(2**failures, 30))
+        if job.status == "done":
+            return job.result
+        raise TugException(job.error or f"Job is {job.status}")
+
+
+class AgentClientEvents:
+    def __init__(self, agent_client: AgentClient):
+        self._agent_client = agent_client
+
+    async def stream(
+        self,
+    ) -> AsyncIterator[EventsStreamMessageSchema]:
+        """
+        Follow lifecycle events of containers and images.
+        The first message is subscribed, the stream is endless
+        unless the events are lost on the agent side.
+        """
+        async for data in self._agent_client._stream(
+            "GET",
+            f"/api/events/stream",
+            timeout=self._agent_client._timeout
+            + EVENTS_STREAM_HEARTBEAT,
+        ):
+            yield EventsStreamMessageSchema.model_validate(data)
 
 
 class AgentClientManager:
@@ -0,0 +1,87 @@
+import logging
+import time
+from backend.exception import TugAgentUnavailableException
+from backend.schemas.hosts_schema import HostCircuitStatus
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of the host's agent.
+    After failure_threshold failed calls in a row the circuit opens,
+    and calls fail fast instead of waiting for the timeout.
+    After reset_timeout one call is let through as a probe (half-open),
+    success closes the circuit, failure opens it again.
+    :param host_id: id of the host
+    :param failure_threshold: failed calls in a row to open the circuit
+    :param reset_timeout: time in seconds before the probe
+    """
+
+    def __init__(
+        self, host_id: int, failure_threshold: int, reset_timeout: int
+    ):
+        self._host_id = host_id
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+
+    def _retry_in(self) -> float:
+        if self._opened_at is None:
+            return 0
+        return max(
+            0,
+            self._opened_at + self._reset_timeout - time.monotonic(),
+        )
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls fail fast, probe is not due yet"""
+        return self._retry_in() > 0
+
+    def before_call(self) -> None:
+        """
+        Check the circuit before the call.
+        :raises TugAgentUnavailableException: if the circuit is open
+        """
+        retry_in = self._retry_in()
+        if retry_in > 0:
+            raise TugAgentUnavailableException(
+                self._host_id, retry_in
+            )
+        if self._opened_at is not None:
+            # The probe. Other calls wait for the next one,
+            # also if this one never ends e.g. cancelled.
+            self._opened_at = time.monotonic()
+
+    def on_success(self) -> None:
+        if self._opened_at is not None:
+            logging.info(f"Agent of host {self._host_id} is back")
+        self._failures = 0
+        self._opened_at = None
+
+    def on_failure(self) -> None:
+        self._failures += 1
+        if self._opened_at is not None or (
+            self._failures >= self._failure_threshold
+        ):
+            if self._opened_at is None:
+                logging.warning(
+                    f"Agent of host {self._host_id} failed {self._failures} times in a row, skipping calls for {self._reset_timeout}s"
+                )
+            self._opened_at = time.monotonic()
+
+    def get_status(self) -> HostCircuitStatus:
+        if self._opened_at is None:
+            return HostCircuitStatus(
+                state="closed", failures=self._failures
+            )
+        retry_in = self._retry_in()
+        if retry_in > 0:
+            return HostCircuitStatus(
+                state="open",
+                failures=self._failures,
+                retry_in=round(retry_in, 1),
+            )
+        return HostCircuitStatus(
+            state="half_open", failures=self._failures
+        )
@@ -12,4 +12,7 @@ from .container_group import (
     ContainerGroupItem,
     get_containers_groups,
     get_container_group,
+    get_affected_containers,
 )
+from .run_memo import RunMemo
+from .pull_progress import PullProgress
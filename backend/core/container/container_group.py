@@ -27,6 +27,10 @@ class ContainerGroupItem:
     :param commands: list of commands to be executed after container starts
     :param old_image: current image of the container
     :param new_image: possible new image for the container
+    :param new_digest: digest of the image in the registry
+    :param health_wait: time spent waiting for health in seconds
+    :param recover_time: time from the failure of the update
+        to the end of rolled back container's health wait in seconds
     """
 
     container: ContainerInspectResult
@@ -37,6 +41,9 @@ class ContainerGroupItem:
     commands: list[list[str]] = field(default_factory=list)
     old_image: ImageInspectResult | None = None
     new_image: ImageInspectResult | None = None
+    new_digest: str | None = None
+    health_wait: float | None = None
+    recover_time: float | None = None
 
     @property
     def name(self) -> str:
@@ -56,11 +63,16 @@ class ContainerGroup:
     :param name: name of the group
     :param is_self: is group with self container
     :param containers: list of associated containers
+    :param layers: the same containers split to dependency layers,
+        containers of a layer depend only on previous layers
     """
 
     name: str
     is_self: bool
     containers: list[ContainerGroupItem]
+    layers: list[list[ContainerGroupItem]] = field(
+        default_factory=list
+    )
 
 
 def _get_group_name(c: ContainerInspectResult) -> str:
@@ -116,9 +128,13 @@ def _get_dependencies(container: ContainerInspectResult) -> list[str]:
 
 def _sort_containers_by_dependencies(
     containers: list[ContainerGroupItem],
-) -> list[ContainerGroupItem]:
+) -> list[list[ContainerGroupItem]]:
     """
-    Sort containers so that those on which others depend come first.
+    Split containers to topological layers,
+    so that those on which others depend come first.
+    Layer of a container is the length of its longest
+    dependency chain, so containers of the same layer
+    do not depend on each other.
     Use the com.docker.compose.depends_on label, if present.
     """
     cont_map: dict[str, ContainerGroupItem] = (
@@ -134,27 +150,82 @@ def _sort_containers_by_dependencies(
         cont_map[service_name] = c
         deps_map[service_name] = _get_dependencies(cont)
 
-    visited: set[str] = set()
-    result: list[ContainerGroupItem] = []
+    depths: dict[str, int] = {}
+    visiting: set[str] = set()
 
-    def visit(service: str) -> None:
-        if service in visited:
-            return
-        visited.add(service)
+    def visit(service: str) -> int:
+        if service in depths:
+            return depths[service]
+        # Dependency cycle, break it here
+        if service in visiting:
+            return -1
+        visiting.add(service)
 
         # Check all dependencies first
+        depth = 0
         for dep in deps_map[service]:
             if dep in cont_map:
-                visit(dep)
+                depth = max(depth, visit(dep) + 1)
 
-        # Then add current service
-        if service in cont_map:
-            result.append(cont_map[service])
+        visiting.discard(service)
+        depths[service] = depth
+        return depth
 
+    layers: list[list[ContainerGroupItem]] = []
     for service in cont_map:
-        visit(service)
+        depth = visit(service)
+        while len(layers) <= depth:
+            layers.append([])
+    for service, item in cont_map.items():
+        layers[depths[service]].append(item)
+
+    return layers
+
+
+def _set_group_order(group: ContainerGroup) -> None:
+    """Sort containers of the group in order of dependency"""
+    group.layers = _sort_containers_by_dependencies(group.containers)
+    group.containers = [
+        item for layer in group.layers for item in layer
+    ]
+
+
+def get_affected_containers(
+    group: ContainerGroup,
+    targets: list[ContainerGroupItem],
+) -> list[ContainerGroupItem]:
+    """
+    Get target containers and all their transitive dependents,
+    i.e. containers that have to be restarted with the targets.
+    Use the com.docker.compose.depends_on label, if present.
+    :param group: group of the targets
+    :param targets: containers to be restarted e.g. updated ones
+    :returns: affected containers in order of the group
+    """
+    # map service name to its dependents
+    dependents_map: dict[str, list[str]] = {}
+    for item in group.containers:
+        service_name = _get_service_name(item.container)
+        for dep in _get_dependencies(item.container):
+            dependents_map.setdefault(dep, []).append(service_name)
 
-    return result
+    affected: set[str] = set()
+
+    def visit(service: str) -> None:
+        if service in affected:
+            return
+        affected.add(service)
+        for dependent in dependents_map.get(service, []):
+            visit(dependent)
+
+    for item in targets:
+        visit(_get_service_name(item.container))
+
+    return [
+        item
+        for item in group.containers
+        if _get_service_name(item.container) in affected
+    ]
 
 
 def _get_action(
@@ -196,6 +267,7 @@ def get_container_group(
             name="self_container",
             containers=[target_item],
             is_self=True,
+            layers=[[target_item]],
         )
     target_c_gn = _get_group_name(target)
     target_db_item = _get_db_item(target, containers_db)
@@ -222,9 +294,7 @@ def get_container_group(
             )
             group.containers.append(item)
 
-    group.containers = _sort_containers_by_dependencies(
-        group.containers
-    )
+    _set_group_order(group)
     return group
 
 
@@ -245,7 +315,10 @@ def get_containers_groups(
         if is_self_container(c):
             item = ContainerGroupItem(container=c, action="check")
             groups["self_container"] = ContainerGroup(
-                name="self_container", containers=[item], is_self=True
+                name="self_container",
+                containers=[item],
+                is_self=True,
+                layers=[[item]],
             )
             continue
 
@@ -263,5 +336,5 @@ def get_containers_groups(
         group.containers.append(item)
 
     for g in groups.values():
-        g.containers = _sort_containers_by_dependencies(g.containers)
+        _set_group_order(g)
     return groups
@@ -26,6 +26,10 @@ class GroupCheckData(TypedDict, total=False):
     """Data of containers group check/update progress"""
 
     status: ECheckStatus  # Status of progress
+    pull_downloaded: int  # Downloaded bytes of new images
+    pull_extracted: int  # Extracted bytes of new images
+    pull_total: int  # Size of new images layers known so far
+    pull_throughput: int  # Average download speed in bytes per second
 
 
 class HostCheckData(GroupCheckData, total=False):
@@ -0,0 +1,38 @@
+import time
+from shared.schemas.image_schemas import PullImageProgressEventSchema
+from .process_cache import GroupCheckData, ProcessCache
+
+
+class PullProgress:
+    """
+    Aggregate progress of concurrent image pulls of one run,
+    reported to the check/update progress cache.
+    """
+
+    def __init__(self, cache: ProcessCache) -> None:
+        self._cache = cache
+        self._pulls: dict[str, PullImageProgressEventSchema] = {}
+        self._start = time.monotonic()
+
+    def update(
+        self, image_spec: str, event: PullImageProgressEventSchema
+    ) -> None:
+        """
+        Update progress of the image pull.
+        :param image_spec: pulled image
+        :param event: last progress event of the pull
+        """
+        self._pulls[image_spec] = event
+        downloaded = sum(e.downloaded for e in self._pulls.values())
+        elapsed = time.monotonic() - self._start
+        data: GroupCheckData = {
+            "pull_downloaded": downloaded,
+            "pull_extracted": sum(
+                e.extracted for e in self._pulls.values()
+            ),
+            "pull_total": sum(e.total for e in self._pulls.values()),
+            "pull_throughput": (
+                int(downloaded / elapsed) if elapsed > 0 else 0
+            ),
+        }
+        self._cache.update(data)
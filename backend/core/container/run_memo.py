@@ -0,0 +1,49 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class RunMemo:
+    """
+    Memo of async results, scoped to one check/update run.
+    Concurrent callers with the same key share one in-flight future,
+    so each distinct operation is performed once per run.
+    Failed operations are forgotten and can be retried by next callers.
+    """
+
+    def __init__(self) -> None:
+        self._futures: dict[Hashable, asyncio.Future[Any]] = {}
+
+    async def get_or_run(
+        self,
+        key: Hashable,
+        func: Callable[[], Awaitable[T]],
+    ) -> T:
+        """
+        Get result of the key, or run func to get it.
+        :param key: key of the operation
+        :param func: factory of the operation
+        """
+        fut = self._futures.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(func())
+            self._futures[key] = fut
+        try:
+            # Shield, so cancelled waiter does not cancel others
+            return await asyncio.shield(fut)
+        except Exception:
+            if self._futures.get(key) is fut:
+                del self._futures[key]
+            raise
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Set result of the key, e.g. fetched in bulk.
+        Existing result or in-flight operation is kept.
+        """
+        if key in self._futures:
+            return
+        fut = asyncio.get_running_loop().create_future()
+        fut.set_result(value)
+        self._futures[key] = fut
@@ -13,23 +13,38 @@ class CheckContainerUpdateAvailableResult:
     image_spec: str | None = None
     old_image: ImageInspectResult | None = None
     new_image: ImageInspectResult | None = None
+    new_digest: str | None = None
 
 
 @dataclass
 class ShrinkedContainer:
-    """This class contains only necessary data of container"""
+    """
+    This class contains only necessary data of container
+    :param health_wait: time spent waiting for health in seconds
+    :param recover_time: time to recover after failed update in seconds
+    """
 
     name: str
     image_spec: str
+    health_wait: float | None = None
+    recover_time: float | None = None
 
     @classmethod
-    def from_c(cls, c: ContainerInspectResult) -> "ShrinkedContainer":
+    def from_c(
+        cls,
+        c: ContainerInspectResult,
+        health_wait: float | None = None,
+        recover_time: float | None = None,
+    ) -> "ShrinkedContainer":
         if not c.name or not c.config or not c.config.image:
             raise Exception(
                 "Cannot create ShrinkedContainer, no data."
             )
         return ShrinkedContainer(
-            name=c.name, image_spec=c.config.image
+            name=c.name,
+            image_spec=c.config.image,
+            health_wait=health_wait,
+            recover_time=recover_time,
         )
 
 
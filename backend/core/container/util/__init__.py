@@ -15,6 +15,9 @@ from .get_container_restart_policy_str import (
 from .normalize_path import normalize_path
 from .map_tmpfs_dict_to_list import map_tmpfs_dict_to_list
 from .wait_for_container_healthy import wait_for_container_healthy
+from .get_container_health_wait_timing import (
+    get_container_health_wait_timing,
+)
 from .filter_valid_docker_labels import filter_valid_docker_labels
 from .container_config import (
     get_container_config,
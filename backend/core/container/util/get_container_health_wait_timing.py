@@ -0,0 +1,62 @@
+from dataclasses import dataclass
+from python_on_whales.components.container.models import (
+    ContainerInspectResult,
+)
+from .map_healthcheck_to_kwargs import map_healthcheck_to_kwargs
+
+# Docker defaults for healthcheck options (seconds)
+_DEFAULT_INTERVAL = 30
+_DEFAULT_TIMEOUT = 30
+_DEFAULT_RETRIES = 3
+# Bounds of the wait deadline (seconds)
+_MIN_DEADLINE = 10
+_MAX_DEADLINE = 600
+# Deadline for containers without healthcheck (only running state)
+_NO_HEALTHCHECK_DEADLINE = 30
+# Max polling interval for containers without healthcheck
+_NO_HEALTHCHECK_MAX_POLL = 2
+
+
+@dataclass
+class HealthWaitTiming:
+    """
+    Timing of waiting for container health
+    :param deadline: total wait timeout in seconds
+    :param first_poll: first polling interval in seconds
+    :param max_poll: max polling interval in seconds (after backoff)
+    """
+
+    deadline: int
+    first_poll: float
+    max_poll: float
+
+
+def get_container_health_wait_timing(
+    c: ContainerInspectResult,
+) -> HealthWaitTiming:
+    """
+    Get timing of waiting for container health
+    from its healthcheck config.
+    Deadline is the time docker needs to mark the container unhealthy:
+    start period, then retries of failed checks (interval + timeout).
+    """
+    cfg = c.config.healthcheck if c.config else None
+    if not cfg or (cfg.test and cfg.test[0] == "NONE"):
+        return HealthWaitTiming(
+            deadline=_NO_HEALTHCHECK_DEADLINE,
+            first_poll=0.5,
+            max_poll=_NO_HEALTHCHECK_MAX_POLL,
+        )
+    kwargs = map_healthcheck_to_kwargs(cfg)
+    interval = kwargs["health_interval"] or _DEFAULT_INTERVAL
+    timeout = kwargs["health_timeout"] or _DEFAULT_TIMEOUT
+    retries = kwargs["health_retries"] or _DEFAULT_RETRIES
+    start_period = kwargs["health_start_period"] or 0
+    deadline = (
+        start_period + interval + (interval + timeout) * retries
+    )
+    return HealthWaitTiming(
+        deadline=min(max(deadline, _MIN_DEADLINE), _MAX_DEADLINE),
+        first_poll=min(1, interval),
+        max_poll=interval,
+    )
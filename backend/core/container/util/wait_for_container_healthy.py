@@ -1,42 +1,88 @@
+import logging
 import time
+from aiohttp import ClientResponseError
 from python_on_whales.components.container.models import (
     ContainerInspectResult,
 )
-from backend.core.agent_client import AgentClient
+from backend.core.agent_client import (
+    AgentClient,
+    is_endpoint_missing,
+)
 from .get_container_health_status_str import (
     get_container_health_status_str,
 )
+from .get_container_health_wait_timing import (
+    HealthWaitTiming,
+    get_container_health_wait_timing,
+)
 import asyncio
 
 
 async def wait_for_container_healthy(
     client: AgentClient,
     container: ContainerInspectResult,
-    timeout: int = 60,
+    timeout: int | None = None,
 ) -> bool:
     """
     Wait for container healthy status or timeout.
     If the healthcheck property is missing,
     wait only for running state.
+    If timeout is not set, it is derived from the healthcheck config.
+    Waiting is done by the agent using docker events,
+    polling with backoff is used for agents that do not support it.
     """
-    has_healthcheck = bool(container.state and container.state.health)
     id = container.id
     if not id:
         return False
+    timing = get_container_health_wait_timing(container)
+    if timeout:
+        timing.deadline = timeout
+    try:
+        container = await client.container.wait_healthy(
+            id, timing.deadline
+        )
+    except ClientResponseError as e:
+        # 404 of a missing container is not the same
+        if not is_endpoint_missing(e):
+            raise
+        logging.info("Agent does not support waiting, polling...")
+        container = await _poll_container_healthy(
+            client, container, timing
+        )
+    return _is_container_healthy(container)
+
+
+def _is_container_healthy(container: ContainerInspectResult) -> bool:
+    health = get_container_health_status_str(container)
+    status = container.state.status if container.state else ""
+    # Assume unknown is also healthy (no healthcheck)
+    return status == "running" and health in ["healthy", "unknown"]
+
+
+async def _poll_container_healthy(
+    client: AgentClient,
+    container: ContainerInspectResult,
+    timing: HealthWaitTiming,
+) -> ContainerInspectResult:
+    """
+    Poll container inspect until healthy/running or deadline.
+    Stops early if the container is unhealthy or stopped,
+    it will not become healthy.
+    """
+    id = str(container.id)
+    delay = timing.first_poll
     start = time.time()
-    while time.time() - start < timeout:
+    while time.time() - start < timing.deadline:
         container = await client.container.inspect(id)
-        if has_healthcheck:
+        status = container.state.status if container.state else ""
+        if status in ["exited", "dead"]:
+            return container
+        if container.state and container.state.health:
             health = get_container_health_status_str(container)
-            if health == "healthy":
-                return True
-        elif container.state and container.state.status == "running":
-            return True
-        await asyncio.sleep(5)
-    container = await client.container.inspect(id)
-    health = get_container_health_status_str(container)
-    status = container.state.status if container.state else ""
-    # On last attempt assume unknown is also healthy
-    if status == "running" and health in ["healthy", "unknown"]:
-        return True
-    return False
+            if health in ["healthy", "unhealthy"]:
+                return container
+        elif status == "running":
+            return container
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, timing.max_poll)
+    return await client.container.inspect(id)
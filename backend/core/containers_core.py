@@ -5,8 +5,10 @@ from python_on_whales.components.image.models import (
     ImageInspectResult,
 )
 import logging
-from typing import cast
+import time
+from typing import Awaitable, Callable, Hashable, TypeVar, cast
 from sqlalchemy import select
+from aiohttp import ClientResponseError
 import asyncio
 from backend.db.session import async_session_maker
 from backend.db.models import ContainersModel, HostsModel
@@ -20,11 +22,15 @@ from backend.core import HostsManager
 from backend.core.notifications_core import send_notification
 from backend.enums.check_status_enum import ECheckStatus
 from backend.config import Config
+from backend.helpers.gather_with_concurrency import (
+    gather_with_concurrency,
+)
 from backend.core.container.util import (
     get_container_image_spec,
     get_container_image_id,
     wait_for_container_healthy,
     get_container_config,
+    get_container_health_wait_timing,
     merge_container_config_with_image,
     update_containers_data_after_check,
 )
@@ -37,20 +43,36 @@ from backend.core.container import (
     get_host_cache_key,
     get_group_cache_key,
 )
+from backend.core.container.run_memo import RunMemo
+from backend.core.container.pull_progress import PullProgress
 from backend.core.container.container_group import (
     ContainerGroupItem,
     get_containers_groups,
+    get_affected_containers,
     ContainerGroup,
 )
-from backend.core.agent_client import AgentClient
+from backend.core.agent_client import (
+    AgentClient,
+    is_endpoint_missing,
+)
 from shared.schemas.command_schemas import RunCommandRequestBodySchema
 from shared.schemas.container_schemas import (
     CreateContainerRequestBodySchema,
     GetContainerListBodySchema,
+    RenameContainerRequestBodySchema,
+)
+from shared.schemas.group_update_schemas import (
+    ASIDE_SUFFIX,
+    GroupUpdateEventSchema,
+    GroupUpdateItemSchema,
+    GroupUpdatePlanSchema,
 )
 from shared.schemas.image_schemas import (
+    GetImageRemoteDigestRequestBodySchema,
     InspectImageRequestBodySchema,
+    InspectImagesRequestBodySchema,
     PruneImagesRequestBodySchema,
+    PullImageProgressEventSchema,
     PullImageRequestBodySchema,
     TagImageRequestBodySchema,
 )
@@ -58,6 +80,17 @@ from shared.schemas.image_schemas import (
 # Allowed cache statuses for further processing
 _ALLOW_STATUSES = [ECheckStatus.DONE, ECheckStatus.ERROR]
 
+T = TypeVar("T")
+
+
+def _is_digest_in_image(
+    digest: str, image: ImageInspectResult
+) -> bool:
+    """Whether the digest is one of the image's repo digests"""
+    return any(
+        rd.split("@")[-1] == digest for rd in image.repo_digests or []
+    )
+
 
 def _get_shrinked_containers(
     containers: list[ContainerInspectResult],
@@ -65,52 +98,135 @@ def _get_shrinked_containers(
     return [ShrinkedContainer.from_c(c) for c in containers]
 
 
+async def _memoized(
+    memo: RunMemo | None,
+    key: Hashable,
+    func: Callable[[], Awaitable[T]],
+) -> T:
+    """Run func through the memo, if any"""
+    if memo:
+        return await memo.get_or_run(key, func)
+    return await func()
+
+
+async def pull_image(
+    client: AgentClient,
+    image_spec: str,
+    progress: PullProgress | None = None,
+) -> ImageInspectResult:
+    """
+    Pull the image, reporting its progress.
+    :param client: docker client
+    :param image_spec: image to pull
+    :param progress: progress of the run to report to
+    """
+
+    def on_progress(data: dict):
+        if progress:
+            progress.update(
+                image_spec,
+                PullImageProgressEventSchema.model_validate(data),
+            )
+
+    image = await client.image.pull(
+        PullImageRequestBodySchema(image=image_spec), on_progress
+    )
+    logging.info(f"Pulled '{image_spec}'")
+    return image
+
+
 async def check_container_update_available(
     client: AgentClient,
     container: ContainerInspectResult,
+    memo: RunMemo | None = None,
 ) -> CheckContainerUpdateAvailableResult:
     """
     Check if there is new image for the container.
+    With memo, each distinct image is checked only once.
     This func should not raise exceptions.
     """
     logging.info(
         f"Checking container '{container.name}' update availability."
     )
-    result = CheckContainerUpdateAvailableResult()
+    image_spec = get_container_image_spec(container)
+    if not image_spec:
+        logging.warning(f"Cannot proceed, no image spec.")
+        return CheckContainerUpdateAvailableResult()
+    image_id = get_container_image_id(container)
+    return await _memoized(
+        memo,
+        ("check", client.id, image_spec, image_id),
+        lambda: _check_image_update_available(
+            client, image_spec, image_id, memo
+        ),
+    )
+
+
+async def _check_image_update_available(
+    client: AgentClient,
+    image_spec: str,
+    image_id: str | None,
+    memo: RunMemo | None = None,
+) -> CheckContainerUpdateAvailableResult:
+    """
+    Check if there is new image for the image spec.
+    This func should not raise exceptions.
+    """
+    logging.info(f"Checking image '{image_spec}'.")
+    result = CheckContainerUpdateAvailableResult(
+        image_spec=image_spec
+    )
     try:
-        image_spec = get_container_image_spec(container)
-        if not image_spec:
-            logging.warning(f"Cannot proceed, no image spec.")
-            return result
-        result.image_spec = image_spec
-        image_id = get_container_image_id(container)
-        old_image: ImageInspectResult
-        if image_id:
-            old_image = await client.image.inspect(
-                InspectImageRequestBodySchema(spec_or_id=image_id)
-            )
-        else:
-            old_image = await client.image.inspect(
-                InspectImageRequestBodySchema(spec_or_id=image_spec)
-            )
+        spec_or_id = image_id or image_spec
+        # Usually prefetched by prefetch_images
+        old_image: ImageInspectResult = await _memoized(
+            memo,
+            ("image_inspect", client.id, spec_or_id),
+            lambda: client.image.inspect(
+                InspectImageRequestBodySchema(spec_or_id=spec_or_id)
+            ),
+        )
         result.old_image = old_image
         if not old_image.repo_digests:
             logging.warning(
                 f"Image missing repo digests. Presumably a local image."
             )
             return result
-        new_image = await client.image.pull(
-            PullImageRequestBodySchema(image=image_spec)
-        )
-        if not isinstance(new_image, ImageInspectResult):
-            logging.warning(f"Failed to pull new image.'")
-            return result
-        result.new_image = new_image
-        available: bool = bool(
-            old_image
-            and new_image
-            and old_image.repo_digests != new_image.repo_digests
-        )
+        try:
+            # Registry is requested by the host's agent,
+            # with its own credentials and insecure registries
+            new_digest = await _memoized(
+                memo,
+                ("remote_digest", client.id, image_spec),
+                lambda: client.image.remote_digest(
+                    GetImageRemoteDigestRequestBodySchema(
+                        image=image_spec
+                    )
+                ),
+            )
+        except Exception as e:
+            logging.warning(
+                f"Failed to get remote digest, falling back to pull. {e}"
+            )
+            new_digest = None
+        if new_digest:
+            result.new_digest = new_digest
+            available = not _is_digest_in_image(new_digest, old_image)
+        else:
+            new_image = await _memoized(
+                memo,
+                ("pull", client.id, image_spec),
+                lambda: pull_image(client, image_spec),
+            )
+            if not isinstance(new_image, ImageInspectResult):
+                logging.warning(f"Failed to pull new image.'")
+                return result
+            result.new_image = new_image
+            available = bool(
+                old_image
+                and new_image
+                and old_image.repo_digests != new_image.repo_digests
+            )
         result.available = available
         if available:
             logging.info(f"New image found!")
@@ -122,11 +238,163 @@ async def check_container_update_available(
     return result
 
 
+async def prefetch_images(
+    client: AgentClient,
+    groups: list[ContainerGroup],
+    memo: RunMemo,
+) -> None:
+    """
+    Inspect current images of the containers to be checked
+    in one request, results are set to the memo.
+    This func should not raise exceptions.
+    """
+    specs_or_ids: set[str] = set()
+    for group in groups:
+        for item in group.containers:
+            if item.action not in ["check", "update"]:
+                continue
+            image_spec = get_container_image_spec(item.container)
+            if not image_spec:
+                continue
+            specs_or_ids.add(
+                get_container_image_id(item.container) or image_spec
+            )
+    if not specs_or_ids:
+        return
+    try:
+        images = await client.image.inspect_many(
+            InspectImagesRequestBodySchema(
+                specs_or_ids=list(specs_or_ids)
+            )
+        )
+    except Exception as e:
+        logging.warning(
+            f"Failed to prefetch images, inspecting one by one. {e}"
+        )
+        return
+    for spec_or_id in specs_or_ids:
+        image = next(
+            (
+                i
+                for i in images
+                if i.id == f"sha256:{spec_or_id}"
+                or spec_or_id in (i.repo_tags or [])
+            ),
+            None,
+        )
+        if image:
+            memo.set(("image_inspect", client.id, spec_or_id), image)
+
+
+async def pull_container_new_image(
+    client: AgentClient,
+    gc: ContainerGroupItem,
+    memo: RunMemo | None = None,
+    progress: PullProgress | None = None,
+) -> None:
+    """
+    Pull new image for the container, if it has not been pulled during the check.
+    On failure or if pulled image is the same, the container is marked as not available.
+    This func should not raise exceptions.
+    """
+    if gc.new_image or not gc.image_spec:
+        return
+    logging.info(f"Pulling new image for container '{gc.name}'...")
+    try:
+        image_spec = gc.image_spec
+        new_image = await _memoized(
+            memo,
+            ("pull", client.id, image_spec),
+            lambda: pull_image(client, image_spec, progress),
+        )
+        gc.new_image = new_image
+        if gc.old_image and (
+            gc.old_image.repo_digests == new_image.repo_digests
+        ):
+            logging.info(f"Pulled image is the same as current.")
+            gc.available = False
+    except Exception as e:
+        logging.exception(e)
+        logging.error(f"Failed to pull new image for '{gc.name}'.")
+        gc.available = False
+
+
+async def check_group_containers(
+    client: AgentClient,
+    host: HostsModel,
+    group: ContainerGroup,
+    memo: RunMemo | None = None,
+) -> None:
+    """
+    Check containers of the group for new images, without pulling.
+    Results are written to the group items.
+    :param client: docker client
+    :param host: docker host
+    :param group: group to be checked
+    :param memo: memo of the run, to check each image once
+    """
+    for_check = [
+        item
+        for item in group.containers
+        if item.action in ["check", "update"]
+    ]
+
+    async def check_item(gc: ContainerGroupItem):
+        res = await check_container_update_available(
+            client, gc.container, memo
+        )
+        gc.available = res.available
+        gc.image_spec = res.image_spec
+        gc.old_image = res.old_image
+        gc.new_image = res.new_image
+        gc.new_digest = res.new_digest
+
+    await gather_with_concurrency(
+        host.check_concurrency, *[check_item(gc) for gc in for_check]
+    )
+
+
+async def pull_groups_images(
+    client: AgentClient,
+    host: HostsModel,
+    groups: list[ContainerGroup],
+    memo: RunMemo | None = None,
+    cache: ProcessCache | None = None,
+) -> None:
+    """
+    Pull new images of the groups' containers that are going to be updated.
+    Pulls are concurrent, but not more than host's pull concurrency at once.
+    Self container group is skipped, as it is never updated.
+    :param client: docker client
+    :param host: docker host
+    :param groups: checked groups
+    :param memo: memo of the run, to pull each image once
+    :param cache: progress cache to report bytes of the pulls to
+    """
+    for_pull = [
+        item
+        for group in groups
+        if not group.is_self
+        for item in group.containers
+        if item.available and item.action == "update"
+    ]
+    progress = PullProgress(cache) if cache else None
+    await gather_with_concurrency(
+        host.pull_concurrency,
+        *[
+            pull_container_new_image(client, gc, memo, progress)
+            for gc in for_pull
+        ],
+    )
+
+
 async def check_group(
     client: AgentClient,
     host: HostsModel,
     group: ContainerGroup,
     update: bool,
+    memo: RunMemo | None = None,
+    checked: bool = False,
 ) -> GroupCheckResult | None:
     """
     Check (and update) group of containers.
@@ -134,6 +402,9 @@ async def check_group(
     :param host: docker host
     :param group: group to be checked/updated
     :param update: update flag (only check if False)
+    :param memo: memo of the run, to check each image once
+    :param checked: whether the group is already checked
+        and its new images are pulled (e.g. by check_host)
     """
     logging.info(
         f"""
@@ -150,20 +421,14 @@ Starting check of group: '{group.name}', containers count: {len(group.containers
         )
         return None
     CACHE.set({"status": ECheckStatus.PREPARING})
-    for_check = [
-        item
-        for item in group.containers
-        if item.action in ["check", "update"]
-    ]
-    CACHE.update({"status": ECheckStatus.CHECKING})
-    for gc in for_check:
-        res = await check_container_update_available(
-            client, gc.container
-        )
-        gc.available = res.available
-        gc.image_spec = res.image_spec
-        gc.old_image = res.old_image
-        gc.new_image = res.new_image
+    if not checked:
+        CACHE.update({"status": ECheckStatus.CHECKING})
+        await check_group_containers(client, host, group, memo)
+        if update:
+            CACHE.update({"status": ECheckStatus.PULLING})
+            await pull_groups_images(
+                client, host, [group], memo, CACHE
+            )
     result.not_available = _get_shrinked_containers(
         [
             item.container
@@ -185,7 +450,7 @@ Starting check of group: '{group.name}', containers count: {len(group.containers
 
     async def on_stop_fail():
         """If failed to stop containers before updating"""
-        for gc in group.containers:
+        for gc in to_restart:
             await client.container.start(gc.name)
         result.available = _get_shrinked_containers(
             [
@@ -214,6 +479,145 @@ Starting check of group: '{group.name}', containers count: {len(group.containers
                 logging.exception(e)
                 logging.error(f"Error while running command {c}")
 
+    async def wait_healthy(
+        gc: ContainerGroupItem, container: ContainerInspectResult
+    ) -> bool:
+        """Wait for container health and record the time spent"""
+        logging.info("Waiting for healthchecks...")
+        start = time.monotonic()
+        healthy = await wait_for_container_healthy(client, container)
+        gc.health_wait = round(time.monotonic() - start, 2)
+        logging.info(f"Waited for healthchecks {gc.health_wait}s.")
+        return healthy
+
+    async def complete_update(ok: bool) -> GroupCheckResult:
+        """Save results of the group update"""
+        result.available = _get_shrinked_containers(
+            [
+                item.container
+                for item in group.containers
+                if item.available
+            ]
+        )
+        await update_containers_data_after_check(result)
+        logging.info(
+            f"""Group update completed.
+================================================================="""
+        )
+        CACHE.update(
+            {
+                "status": (
+                    ECheckStatus.DONE if ok else ECheckStatus.ERROR
+                )
+            }
+        )
+        return result
+
+    def get_plan_item(
+        gc: ContainerGroupItem,
+    ) -> GroupUpdateItemSchema:
+        """Get item of the group update plan"""
+        item = GroupUpdateItemSchema(
+            name=gc.name,
+            config=gc.config,
+            commands=gc.commands,
+            health_timeout=get_container_health_wait_timing(
+                gc.container
+            ).deadline,
+        )
+        if not will_update(gc) or not gc.config:
+            return item
+        try:
+            item.new_config = merge_container_config_with_image(
+                gc.config, cast(ImageInspectResult, gc.new_image)
+            )
+            item.old_image_id = str(
+                cast(ImageInspectResult, gc.old_image).id
+            )
+            item.image_spec = gc.image_spec
+            item.update = True
+        except Exception as e:
+            logging.exception(e)
+            logging.error(
+                f"Failed to merge configs of {gc.name}, it will be only restarted."
+            )
+        return item
+
+    async def update_on_agent(
+        layers: list[list[ContainerGroupItem]],
+    ) -> GroupUpdateEventSchema | None:
+        """
+        Run the update by the agent in one request.
+        :returns: 'done' event, None if the agent does not support it
+        """
+        plan = GroupUpdatePlanSchema(
+            layers=[
+                [get_plan_item(gc) for gc in layer]
+                for layer in layers
+            ]
+        )
+        items = {gc.name: gc for layer in layers for gc in layer}
+        reported: set[str] = set()
+        try:
+            async for event in client.container.update_group(plan):
+                if event.step == "done":
+                    if not event.ok:
+                        logging.error(
+                            f"Group update failed: {event.message}"
+                        )
+                    return event
+                log = logging.info if event.ok else logging.warning
+                log(
+                    f"Group update step '{event.step}' of '{event.container}': {'ok' if event.ok else event.message}"
+                )
+                gc = items.get(event.container or "")
+                if event.step != "result" or not gc:
+                    continue
+                reported.add(gc.name)
+                if event.inspect:
+                    gc.container = event.inspect
+                gc.health_wait = event.health_wait
+                gc.recover_time = event.recover_time
+                if event.outcome == "updated":
+                    gc.available = False
+                    result.updated.append(
+                        ShrinkedContainer.from_c(
+                            gc.container, gc.health_wait
+                        )
+                    )
+                elif event.outcome == "rolled_back":
+                    result.rolled_back.append(
+                        ShrinkedContainer.from_c(
+                            gc.container,
+                            gc.health_wait,
+                            gc.recover_time,
+                        )
+                    )
+                elif event.outcome == "failed":
+                    result.failed.append(
+                        ShrinkedContainer.from_c(gc.container)
+                    )
+            message = "Stream ended without completion"
+        except ClientResponseError as e:
+            # Not the 404 of a missing container or image
+            if is_endpoint_missing(e):
+                return None
+            logging.exception(e)
+            message = str(e)
+        except Exception as e:
+            logging.exception(e)
+            message = str(e)
+        # State of not reported containers is unknown
+        logging.error(f"Group update is interrupted: {message}")
+        for gc in items.values():
+            if will_update(gc) and gc.name not in reported:
+                result.failed.append(
+                    ShrinkedContainer.from_c(gc.container)
+                )
+        return GroupUpdateEventSchema(
+            step="done", ok=False, message=message
+        )
+
     # endregion
 
     any_for_update: bool = bool(
@@ -239,9 +643,25 @@ Starting check of group: '{group.name}', containers count: {len(group.containers
     logging.info("Starting to update a group...")
     CACHE.update({"status": ECheckStatus.UPDATING})
 
-    # Starting from most dependent
-    for gc in group.containers[::-1]:
-        # Getting configs for all containers
+    # Containers to be stopped and started again
+    to_restart: list[ContainerGroupItem] = group.containers
+    if host.partial_restart:
+        to_restart = get_affected_containers(
+            group,
+            [item for item in group.containers if will_update(item)],
+        )
+        logging.info(
+            f"Partial restart of {len(to_restart)} of {len(group.containers)} containers."
+        )
+    restart_names = {item.name for item in to_restart}
+    layers = [
+        [item for item in layer if item.name in restart_names]
+        for layer in group.layers
+    ]
+    layers = [layer for layer in layers if layer]
+
+    # Getting configs for all containers
+    for gc in to_restart:
         try:
             logging.info(
                 f"Getting config for container {gc.container.name}..."
@@ -257,70 +677,121 @@ Starting check of group: '{group.name}', containers count: {len(group.containers
 ================================================================="""
                 )
                 return await on_stop_fail()
-        # Stopping all containers
-        try:
-            logging.info(f"Stopping container {gc.container.name}...")
-            await client.container.stop(gc.name)
-        except Exception as e:
-            logging.exception(e)
+
+    done = await update_on_agent(layers)
+    if done:
+        return await complete_update(done.ok)
+    logging.info(
+        "Agent does not support group update, updating step by step..."
+    )
+
+    async def stop_container(gc: ContainerGroupItem):
+        logging.info(f"Stopping container {gc.container.name}...")
+        await client.container.stop(gc.name)
+
+    # Starting from most dependent layer
+    for layer in layers[::-1]:
+        # Stopping all containers of the layer at once
+        stop_results = await asyncio.gather(
+            *[stop_container(gc) for gc in layer],
+            return_exceptions=True,
+        )
+        errors = [r for r in stop_results if isinstance(r, Exception)]
+        if errors:
+            for e in errors:
+                logging.exception(e)
             logging.error(
                 """Failed to stop container. Exiting group update.
 ================================================================="""
             )
             return await on_stop_fail()
 
-    # Starting from most dependable.
+    # Starting from most dependable layer.
     # At that moment all containers should be stopped.
-    # Will update/start them in dependency order
+    # Will update/start them layer by layer in dependency order,
+    # containers of a layer are processed concurrently.
 
     # Indicates was there an exception during the update
     # If True, the following updates will not be processed.
     any_failed: bool = False
-    for gc in group.containers:
+
+    async def update_container(gc: ContainerGroupItem):
+        """
+        Update container, roll back on failure.
+        The old container is renamed aside and removed only after
+        the new one is healthy, so roll back is just rename and start.
+        """
+        nonlocal any_failed
         c_name = gc.name
-        # Updating container
-        if will_update(gc) and not any_failed:
-            image_spec = cast(str, gc.image_spec)
-            old_image = cast(ImageInspectResult, gc.old_image)
-            new_image = cast(ImageInspectResult, gc.new_image)
-            config = cast(CreateContainerRequestBodySchema, gc.config)
-            logging.info(f"Starting update of container {c_name}...")
+        aside = f"{c_name}{ASIDE_SUFFIX}"
+        image_spec = cast(str, gc.image_spec)
+        old_image = cast(ImageInspectResult, gc.old_image)
+        new_image = cast(ImageInspectResult, gc.new_image)
+        config = cast(CreateContainerRequestBodySchema, gc.config)
+        # Whether the name is taken by the new container
+        replaced = False
+        logging.info(f"Starting update of container {c_name}...")
+        try:
+            if await client.container.exists(aside):
+                logging.warning(
+                    f"Removing leftover container {aside}..."
+                )
+                await client.container.stop(aside)
+                await client.container.remove(aside)
+            logging.info("Renaming container aside...")
             try:
+                await client.container.rename(
+                    c_name,
+                    RenameContainerRequestBodySchema(new_name=aside),
+                )
+            except ClientResponseError as e:
+                if not is_endpoint_missing(e):
+                    raise
+                # Agent without rename, the old container
+                # is recreated from config on roll back
                 logging.info("Removing container...")
                 await client.container.remove(c_name)
-                logging.info("Merging configs...")
-                merged_config = merge_container_config_with_image(
-                    config, new_image
-                )
-                logging.info("Recreating container...")
-                new_c = await client.container.create(merged_config)
-                logging.info("Starting container...")
-                await client.container.start(c_name)
-                await run_commands(gc.commands)
-                logging.info("Waiting for healthchecks...")
-                if await wait_for_container_healthy(client, new_c):
-                    logging.info("Container is healthy!")
-                    gc.container = new_c
-                    gc.available = False
-                    result.updated.append(
-                        ShrinkedContainer.from_c(new_c)
+            replaced = True
+            logging.info("Merging configs...")
+            merged_config = merge_container_config_with_image(
+                config, new_image
+            )
+            logging.info("Recreating container...")
+            new_c = await client.container.create(merged_config)
+            logging.info("Starting container...")
+            await client.container.start(c_name)
+            await run_commands(gc.commands)
+            if await wait_healthy(gc, new_c):
+                logging.info("Container is healthy!")
+                try:
+                    if await client.container.exists(aside):
+                        logging.info("Removing old container...")
+                        await client.container.remove(aside)
+                except Exception as e:
+                    logging.exception(e)
+                    logging.error(
+                        f"Failed to remove old container {aside}"
                     )
-                    continue
-                # Failed healthchecks
-                logging.warning(
-                    "Container is unhealthy, rolling back..."
+                gc.container = new_c
+                gc.available = False
+                result.updated.append(
+                    ShrinkedContainer.from_c(new_c, gc.health_wait)
                 )
+                return
+            logging.warning("Container is unhealthy, rolling back...")
+        except Exception as e:
+            logging.exception(e)
+            logging.error("Update failed, rolling back...")
+        failed_at = time.monotonic()
+        # Rolling back
+        try:
+            # Remove possibly existing new container
+            if replaced and await client.container.exists(c_name):
+                logging.warning("Removing failed container...")
                 await client.container.stop(c_name)
                 await client.container.remove(c_name)
-            except Exception as e:
-                logging.exception(e)
-                logging.error("Update failed, rolling back...")
-                # Try to remove possibly existing container
-                if client.container.exists(c_name):
-                    logging.warning("Removing failed container...")
-                    await client.container.stop(c_name)
-                    await client.container.remove(c_name)
-            # Rolling back
+            # Old container uses the image by id,
+            # so the tag is restored only for consistency
             try:
                 logging.warning("Tagging previous image...")
                 await client.image.tag(
@@ -329,67 +800,90 @@ Starting check of group: '{group.name}', containers count: {len(group.containers
                         tag=image_spec,
                     )
                 )
+            except Exception as e:
+                logging.exception(e)
+                logging.error("Failed to tag previous image")
+            if await client.container.exists(aside):
+                logging.warning("Renaming old container back...")
+                await client.container.rename(
+                    aside,
+                    RenameContainerRequestBodySchema(new_name=c_name),
+                )
+            elif not await client.container.exists(c_name):
                 logging.warning(
                     "Creating container with previous image..."
                 )
-                rolled_back = await client.container.create(config)
-                logging.warning("Starting container...")
-                await client.container.start(str(rolled_back.id))
-                await run_commands(gc.commands)
-                gc.container = rolled_back
-                result.rolled_back.append(
-                    ShrinkedContainer.from_c(rolled_back)
+                await client.container.create(config)
+            logging.warning("Starting container...")
+            await client.container.start(c_name)
+            await run_commands(gc.commands)
+            rolled_back = await client.container.inspect(c_name)
+            gc.container = rolled_back
+            healthy = await wait_healthy(gc, rolled_back)
+            gc.recover_time = round(time.monotonic() - failed_at, 2)
+            logging.warning(f"Recovered in {gc.recover_time}s.")
+            result.rolled_back.append(
+                ShrinkedContainer.from_c(
+                    rolled_back, gc.health_wait, gc.recover_time
+                )
+            )
+            if healthy:
+                logging.warning("Container is healthy!")
+                return
+            logging.warning("Container is unhealthy!")
+        # Failed to roll back
+        except Exception as e:
+            logging.exception(e)
+            logging.error("Failed to roll back container!")
+            result.failed.append(
+                ShrinkedContainer.from_c(gc.container)
+            )
+            any_failed = True
+
+    async def start_container(gc: ContainerGroupItem):
+        """Start not updatable container"""
+        try:
+            logging.info(
+                f"Starting non-updatable container {gc.container.name}"
+            )
+            await client.container.start(gc.name)
+            await run_commands(gc.commands)
+            if await wait_healthy(gc, gc.container):
+                logging.info("Container is healthy!")
+                return
+            logging.warning("Container is unhealthy! Continue...")
+        except Exception as e:
+            logging.exception(e)
+            logging.warning(
+                "Failed to start non-updatable container. Continue..."
+            )
+
+    # Whether an error escaped the update of a container
+    any_error: bool = False
+    for layer in layers:
+        layer_results = await asyncio.gather(
+            *[
+                (
+                    update_container(gc)
+                    if will_update(gc) and not any_failed
+                    else start_container(gc)
+                )
+                for gc in layer
+            ],
+            return_exceptions=True,
+        )
+        for gc, r in zip(layer, layer_results):
+            if isinstance(r, Exception):
+                logging.exception(r)
+                logging.error(
+                    f"Failed to process container {gc.name}!"
                 )
-                logging.warning("Waiting for healthchecks...")
-                if await wait_for_container_healthy(
-                    client, rolled_back
-                ):
-                    logging.warning("Container is healthy!")
-                    continue
-                logging.warning("Container is unhealthy!")
-            # Failed to roll back
-            except Exception as e:
-                logging.exception(e)
-                logging.error("Failed to roll back container!")
                 result.failed.append(
                     ShrinkedContainer.from_c(gc.container)
                 )
                 any_failed = True
-        # Start not updatable container
-        else:
-            try:
-                logging.info(
-                    f"Starting non-updatable container {gc.container.name}"
-                )
-                await client.container.start(gc.name)
-                await run_commands(gc.commands)
-                logging.info("Waiting for healthchecks...")
-                if await wait_for_container_healthy(
-                    client, gc.container
-                ):
-                    logging.info("Container is healthy!")
-                    continue
-                logging.warning("Container is unhealthy! Continue...")
-                continue
-            except Exception as e:
-                logging.exception(e)
-                logging.warning(
-                    "Failed to start non-updatable container. Continue..."
-                )
-    result.available = _get_shrinked_containers(
-        [
-            item.container
-            for item in group.containers
-            if item.available
-        ]
-    )
-    await update_containers_data_after_check(result)
-    logging.info(
-        f"""Group update completed.
-================================================================="""
-    )
-    CACHE.update({"status": ECheckStatus.DONE})
-    return result
+                any_error = True
+    return await complete_update(not any_error)
 
 
 async def check_host(
@@ -397,6 +891,7 @@ async def check_host(
     client: AgentClient,
     update: bool,
     containers_db: list[ContainersModel],
+    memo: RunMemo | None = None,
 ) -> HostCheckResult | None:
     """
     Check (and update) containers of specified host.
@@ -404,6 +899,7 @@ async def check_host(
     :param client: host's docker client
     :param update: update flag (only check if False)
     :param containers_db: containers db data
+    :param memo: memo of the run, shared between hosts
     """
     result = HostCheckResult(host_id=host.id, host_name=host.name)
     STATUS_KEY = get_host_cache_key(host)
@@ -420,6 +916,8 @@ async def check_host(
             {"status": ECheckStatus.PREPARING},
         )
         logging.info(f"Starting check for host '{host.name}'")
+        if not memo:
+            memo = RunMemo()
 
         containers: list[ContainerInspectResult] = (
             await client.container.list(
@@ -427,18 +925,50 @@ async def check_host(
             )
         )
         groups = get_containers_groups(containers, containers_db)
-        CACHE.update(
-            {
-                "status": (
-                    ECheckStatus.UPDATING
-                    if update
-                    else ECheckStatus.CHECKING
+        CACHE.update({"status": ECheckStatus.CHECKING})
+        await prefetch_images(client, list(groups.values()), memo)
+        await gather_with_concurrency(
+            host.group_concurrency,
+            *[
+                check_group_containers(client, host, group, memo)
+                for group in groups.values()
+            ],
+        )
+        if update:
+            # All new images are pulled before any container is stopped
+            CACHE.update({"status": ECheckStatus.PULLING})
+            await pull_groups_images(
+                client, host, list(groups.values()), memo, CACHE
+            )
+            CACHE.update({"status": ECheckStatus.UPDATING})
+
+        async def process_group(
+            group: ContainerGroup,
+        ) -> GroupCheckResult | None:
+            try:
+                return await check_group(
+                    client, host, group, update, memo, checked=True
                 )
-            },
+            except Exception as e:
+                logging.exception(e)
+                logging.error(f"Failed to check group {group.name}")
+                return None
+
+        # Independent groups are processed concurrently
+        results = await gather_with_concurrency(
+            host.group_concurrency,
+            *[
+                process_group(group)
+                for group in groups.values()
+                if not group.is_self
+            ],
         )
+        # Self container group is processed alone, after all the others
+        for group in groups.values():
+            if group.is_self:
+                results.append(await process_group(group))
 
-        for _, group in groups.items():
-            res = await check_group(client, host, group, update)
+        for res in results:
             if res:
                 result.not_available.extend(res.not_available)
                 result.available.extend(res.available)
@@ -515,14 +1045,25 @@ async def check_all(update: bool):
                     result.scalars().all()
                 )
 
+        memo = RunMemo()
         tasks: list[asyncio.Future[HostCheckResult | None]] = []
         for h in hosts:
             cli = HostsManager.get_host_client(h)
+            if cli.breaker.is_open:
+                # Do not wait for timeouts of the agent that is down
+                logging.warning(
+                    f"Agent of host '{h.name}' is unavailable, skipping the host"
+                )
+                ProcessCache[HostCheckData](
+                    get_host_cache_key(h)
+                ).set({"status": ECheckStatus.ERROR})
+                continue
             cor = check_host(
                 h,
                 cli,
                 update,
                 host_containers_db.get(h.id, []),
+                memo,
             )
             t = asyncio.create_task(cor)
             tasks.append(t)
@@ -554,6 +1095,8 @@ async def _send_notification(results: list[HostCheckResult | None]):
     """
 
     def get_cont_str(c: ShrinkedContainer) -> str:
+        if c.recover_time is not None:
+            return f"- {c.name} {c.image_spec} (recovered in {c.recover_time}s)\n"
         return f"- {c.name} {c.image_spec}\n"
 
     body: str = ""
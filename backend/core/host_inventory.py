@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import time
+from aiohttp import ClientResponseError
+from python_on_whales.components.container.models import (
+    ContainerInspectResult,
+)
+from python_on_whales.components.image.models import (
+    ImageInspectResult,
+)
+from backend.core.agent_client import AgentClient
+from shared.schemas.container_schemas import (
+    GetContainerListBodySchema,
+    InspectContainersRequestBodySchema,
+)
+from shared.schemas.event_schemas import (
+    EVENTS_STREAM_HEARTBEAT,
+    DockerEventSchema,
+)
+from shared.schemas.image_schemas import GetImageListBodySchema
+
+# Delay of reconnection to the events stream in seconds,
+# it is doubled on every failure
+RECONNECT_DELAY = 1
+MAX_RECONNECT_DELAY = 60
+# Agent without the events stream is asked again after this time
+UNSUPPORTED_RETRY = 600
+
+
+class HostInventory:
+    """
+    In-memory inventory of containers and images of the host,
+    kept up to date by docker events streamed from the agent,
+    with periodic full resync as a safety net.
+    It is used only while the stream is alive,
+    otherwise the lists are requested from the agent.
+    :param client: client of the host's agent
+    :param resync_interval: interval of the full resync in seconds
+    """
+
+    def __init__(self, client: AgentClient, resync_interval: int):
+        self._client = client
+        self._resync_interval = resync_interval
+        self._containers: dict[str, ContainerInspectResult] = {}
+        # All images and ids of the dangling ones,
+        # None if they are changed since the last request
+        self._images: (
+            tuple[list[ImageInspectResult], list[str]] | None
+        ) = None
+        # Incremented on image events, so the images requested
+        # during a change are not kept
+        self._images_version = 0
+        self._synced_at = 0.0
+        self._message_at = 0.0
+        self._connected = False
+        self._reconnect_delay = RECONNECT_DELAY
+        self._task: asyncio.Task | None = None
+
+    @property
+    def is_live(self) -> bool:
+        """Whether the inventory follows the events of the host"""
+        return (
+            self._connected
+            and time.monotonic() - self._message_at
+            < EVENTS_STREAM_HEARTBEAT * 2
+        )
+
+    def start(self) -> None:
+        """Start following the events"""
+        if not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._connected = False
+
+    async def list_containers(
+        self, summary: bool = False
+    ) -> list[ContainerInspectResult]:
+        """
+        Get all the containers, from memory if the inventory is live.
+        :param summary: request only summary fields from the agent
+            if it is not live
+        """
+        if self.is_live:
+            return list(self._containers.values())
+        return await self._client.container.list(
+            GetContainerListBodySchema(all=True, summary=summary)
+        )
+
+    async def find_container(
+        self, id_prefix: str
+    ) -> ContainerInspectResult | None:
+        """Find container by (short) id"""
+        if self.is_live:
+            return next(
+                (
+                    c
+                    for id, c in self._containers.items()
+                    if id.startswith(id_prefix)
+                ),
+                None,
+            )
+        if not await self._client.container.exists(id_prefix):
+            return None
+        return await self._client.container.inspect(id_prefix)
+
+    async def list_images(
+        self,
+    ) -> tuple[list[ImageInspectResult], list[str]]:
+        """
+        Get all the images, from memory if the inventory is live
+        and they are not changed since the last request.
+        :returns: images and ids of the dangling ones
+        """
+        if self.is_live and self._images:
+            return self._images
+        version = self._images_version
+        dangling = [
+            str(i.id)
+            for i in await self._client.image.list(
+                GetImageListBodySchema(filters={"dangling": "true"})
+            )
+        ]
+        images = await self._client.image.list(
+            GetImageListBodySchema(all=True)
+        )
+        if self.is_live and version == self._images_version:
+            self._images = (images, dangling)
+        return images, dangling
+
+    async def _run(self) -> None:
+        host_id = self._client.id
+        while True:
+            try:
+                await self._follow()
+                message = "Stream ended"
+            except asyncio.CancelledError:
+                raise
+            except ClientResponseError as e:
+                if e.status != 404:
+                    message = f"{e.__class__.__name__}: {e}"
+                else:
+                    self._connected = False
+                    logging.info(
+                        f"Agent of host {host_id} has no events stream, lists are requested from it"
+                    )
+                    await asyncio.sleep(UNSUPPORTED_RETRY)
+                    continue
+            except Exception as e:
+                message = f"{e.__class__.__name__}: {e}"
+            self._connected = False
+            delay = self._reconnect_delay
+            self._reconnect_delay = min(
+                delay * 2, MAX_RECONNECT_DELAY
+            )
+            logging.warning(
+                f"Events stream of host {host_id} is lost, reconnecting in {delay}s. {message}"
+            )
+            await asyncio.sleep(delay)
+
+    async def _follow(self) -> None:
+        async for message in self._client.events.stream():
+            self._message_at = time.monotonic()
+            if message.kind == "subscribed" or (
+                time.monotonic() - self._synced_at
+                >= self._resync_interval
+            ):
+                # Events of the resync time are applied after it
+                await self._resync()
+            elif message.event:
+                await self._apply(message.event)
+
+    async def _resync(self) -> None:
+        containers = await self._client.container.list(
+            GetContainerListBodySchema(all=True)
+        )
+        self._containers = {c.id: c for c in containers if c.id}
+        self._images = None
+        self._synced_at = self._message_at = time.monotonic()
+        if not self._connected:
+            logging.info(
+                f"Inventory of host {self._client.id} is live, {len(containers)} containers"
+            )
+        self._connected = True
+        self._reconnect_delay = RECONNECT_DELAY
+
+    async def _apply(self, event: DockerEventSchema) -> None:
+        if event.type == "image":
+            self._images = None
+            self._images_version += 1
+            return
+        if event.action == "destroy":
+            self._containers.pop(event.id, None)
+            return
+        found = await self._client.container.inspect_many(
+            InspectContainersRequestBodySchema(
+                names_or_ids=[event.id]
+            )
+        )
+        if found and found[0].id:
+            self._containers[found[0].id] = found[0]
+        else:
+            # Removed after the event
+            self._containers.pop(event.id, None)
@@ -3,8 +3,10 @@ import logging
 from sqlalchemy import select
 from backend.db.session import async_session_maker
 from backend.db.models import HostsModel
+from backend.config import Config
 from backend.schemas import HostInfo
 from .agent_client import AgentClient
+from .host_inventory import HostInventory
 
 
 async def load_hosts_on_init():
@@ -15,7 +17,7 @@ async def load_hosts_on_init():
         hosts = result.scalars().all()
         for h in hosts:
             try:
-                HostsManager.set_client(h)
+                await HostsManager.set_client(h)
                 logging.info(f"Docker host '{h.name}' loaded.")
             except Exception as e:
                 logging.error(f"Error loading docker host '{h.name}'")
@@ -27,6 +29,7 @@ class HostsManager:
 
     _INSTANCE = None
     _HOST_CLIENTS: dict[int, AgentClient] = {}
+    _HOST_INVENTORIES: dict[int, HostInventory] = {}
 
     def __new__(cls, *args, **kwargs):
         if cls._INSTANCE is None:
@@ -34,16 +37,38 @@ class HostsManager:
         return cls._INSTANCE
 
     @classmethod
-    def set_client(cls, host: HostsModel):
-        cls.remove_client(host.id)
-        cls._HOST_CLIENTS[host.id] = cls._create_client(host)
+    async def set_client(cls, host: HostsModel):
+        await cls.remove_client(host.id)
+        cls._add_client(host)
 
     @classmethod
     def get_host_client(cls, host: HostsModel) -> AgentClient:
         if host.id in cls._HOST_CLIENTS:
             return cls._HOST_CLIENTS[host.id]
+        return cls._add_client(host)
+
+    @classmethod
+    def get_host_inventory(cls, host: HostsModel) -> HostInventory:
+        """Get in-memory inventory of the host's containers and images"""
+        cls.get_host_client(host)
+        return cls._HOST_INVENTORIES[host.id]
+
+    @classmethod
+    def get_inventory(cls, id: int) -> HostInventory | None:
+        """Get inventory of the registered host"""
+        return cls._HOST_INVENTORIES.get(id)
+
+    @classmethod
+    def _add_client(cls, host: HostsModel) -> AgentClient:
+        """Register client and inventory of the host"""
         client = cls._create_client(host)
-        cls._HOST_CLIENTS[host.id] = cls._create_client(host)
+        inventory = HostInventory(
+            client, Config.AGENT_INVENTORY_RESYNC
+        )
+        if host.enabled and Config.AGENT_INVENTORY_RESYNC:
+            inventory.start()
+        cls._HOST_CLIENTS[host.id] = client
+        cls._HOST_INVENTORIES[host.id] = inventory
         return client
 
     @classmethod
@@ -68,5 +93,22 @@ class HostsManager:
         )
 
     @classmethod
-    def remove_client(cls, id: int):
-        cls._HOST_CLIENTS.pop(id, None)
+    async def remove_client(cls, id: int):
+        """
+        Unregister the host's client. Its session is closed
+        after its running requests, so checks and updates
+        in progress on it are not broken.
+        """
+        inventory = cls._HOST_INVENTORIES.pop(id, None)
+        if inventory:
+            await inventory.stop()
+        client = cls._HOST_CLIENTS.pop(id, None)
+        if client:
+            client.retire()
+
+    @classmethod
+    async def close_all(cls):
+        """Close connections of all registered host clients"""
+        for id, client in cls.get_all():
+            await cls.remove_client(id)
+            await client.close()
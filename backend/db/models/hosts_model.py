@@ -30,6 +30,12 @@ class HostsModel(BaseModel):
         default=False,
         server_default=text("FALSE"),
     )
+    partial_restart: Mapped[bool] = mapped_column(
+        Boolean,
+        nullable=False,
+        default=False,
+        server_default=text("FALSE"),
+    )
     url: Mapped[str] = mapped_column(
         String,
         nullable=False,
@@ -40,6 +46,15 @@ class HostsModel(BaseModel):
     timeout: Mapped[int] = mapped_column(
         Integer, nullable=False, default=5, server_default=text("5")
     )
+    check_concurrency: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=4, server_default=text("4")
+    )
+    group_concurrency: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=3, server_default=text("3")
+    )
+    pull_concurrency: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=2, server_default=text("2")
+    )
 
     containers: Mapped[list["ContainersModel"]] = relationship(
         "ContainersModel",
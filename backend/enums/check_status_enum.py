@@ -8,6 +8,7 @@ class ECheckStatus(str, Enum):
 
     PREPARING = "PREPARING"
     CHECKING = "CHECKING"
+    PULLING = "PULLING"
     UPDATING = "UPDATING"
     PRUNING = "PRUNING"
     DONE = "DONE"
@@ -13,3 +13,22 @@ class TugNoAuthProviderException(TugException):
         message: str = "No active authentication providers found.",
     ):
         super().__init__(message)
+
+
+class TugAgentUnavailableException(TugException):
+    """Calls to the agent are skipped, as its circuit is open"""
+
+    def __init__(self, host_id: int, retry_in: float):
+        super().__init__(
+            f"Agent of host {host_id} is unavailable, next try in {round(retry_in)}s"
+        )
+
+
+class TugAgentJobLostException(TugException):
+    """
+    Job of the agent can not be followed to the end,
+    e.g. the agent is restarted. Its outcome is unknown.
+    """
+
+    def __init__(self, kind: str, job_id: str, message: str):
+        super().__init__(f"Lost {kind} job {job_id}: {message}")
@@ -0,0 +1,23 @@
+import asyncio
+from typing import Awaitable, TypeVar
+
+T = TypeVar("T")
+
+
+async def gather_with_concurrency(
+    limit: int, *aws: Awaitable[T]
+) -> list[T]:
+    """
+    Same as asyncio.gather,
+    but awaits not more than limit awaitables at once.
+    :param limit: max count of simultaneously awaited
+    :param aws: awaitables (coroutines are not started until acquired)
+    :returns: list of results in order of aws
+    """
+    semaphore = asyncio.Semaphore(max(limit, 1))
+
+    async def run(aw: Awaitable[T]) -> T:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(run(aw) for aw in aws))
@@ -118,9 +118,12 @@ async def get_self_container(
         return None
     clients = HostsManager.get_all()
     for clid, cli in clients:
+        inventory = HostsManager.get_inventory(clid)
+        if cli.breaker.is_open or not inventory:
+            continue
         try:
-            if await cli.container.exists(self_container_id):
-                cont = await cli.container.inspect(self_container_id)
+            cont = await inventory.find_container(self_container_id)
+            if cont:
                 stmt = (
                     select(ContainersModel)
                     .where(
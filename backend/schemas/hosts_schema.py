@@ -1,14 +1,18 @@
 from typing import Literal, Optional
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class HostBase(BaseModel):
     name: str
     enabled: bool
     prune: bool
+    partial_restart: bool = False
     url: str
     secret: Optional[str] = None
     timeout: int
+    check_concurrency: int = Field(default=4, ge=1)
+    group_concurrency: int = Field(default=3, ge=1)
+    pull_concurrency: int = Field(default=2, ge=1)
 
 
 class HostInfo(HostBase):
@@ -16,7 +20,34 @@ class HostInfo(HostBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class HostCircuitStatus(BaseModel):
+    """
+    State of the circuit breaker of the host's agent.
+    :param state: closed - calls pass, open - calls fail fast,
+        half_open - next call is a probe of the agent
+    :param failures: failed calls in a row
+    :param retry_in: seconds until the probe (open only)
+    """
+
+    state: Literal["closed", "open", "half_open"]
+    failures: int
+    retry_in: float | None = None
+
+
+class HostConcurrencyStatus(BaseModel):
+    """
+    Adaptive concurrency of requests to the host's agent.
+    :param limit: current max number of concurrent requests
+    :param in_flight: number of running requests
+    """
+
+    limit: int
+    in_flight: int
+
+
 class HostStatusResponseBody(BaseModel):
     id: int
     ok: bool | None = None
     err: str | None = None
+    circuit: HostCircuitStatus | None = None
+    concurrency: HostConcurrencyStatus | None = None
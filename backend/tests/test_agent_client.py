@@ -0,0 +1,118 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from backend.core.agent_client import AgentClient
+from backend.core.hosts_manager import HostsManager
+from shared.util.signature import (
+    RAW_SIGNATURE_VERSION,
+    X_SIGNATURE_VERSION,
+    verify_signature_headers,
+)
+
+SECRET = "secret"
+
+
+@pytest_asyncio.fixture
+async def agent():
+    """
+    Stand-in agent.
+    :returns: server and its state, delay of the responses,
+        addresses of the client connections
+        and signature versions of the requests
+    """
+    state = {"delay": 0.0, "peers": set(), "versions": []}
+
+    async def health(request: web.Request) -> web.Response:
+        state["peers"].add(
+            request.transport.get_extra_info("peername")
+        )
+        await asyncio.sleep(state["delay"])
+        return web.json_response("OK")
+
+    async def access(request: web.Request) -> web.Response:
+        headers = dict(request.headers)
+        state["versions"].append(headers.get(X_SIGNATURE_VERSION))
+        verify_signature_headers(
+            SECRET,
+            5,
+            {k.lower(): v for k, v in headers.items()},
+            request.method,
+            request.path,
+            body_bytes=await request.read(),
+        )
+        return web.json_response(
+            "OK",
+            headers={X_SIGNATURE_VERSION: RAW_SIGNATURE_VERSION},
+        )
+
+    app = web.Application()
+    app.router.add_get("/api/public/health", health)
+    app.router.add_get("/api/public/access", access)
+    server = TestServer(app)
+    await server.start_server()
+    yield server, state
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_session_is_reused(agent):
+    server, state = agent
+    client = AgentClient(1, str(server.make_url("/")))
+    try:
+        assert await client.public.health() == "OK"
+        session = client._session
+        for _ in range(10):
+            await client.public.health()
+        assert client._session is session
+        # Sequential requests are made over a single connection
+        assert len(state["peers"]) == 1
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_remove_client_closes_session(agent):
+    server, _ = agent
+    client = AgentClient(1, str(server.make_url("/")))
+    HostsManager._HOST_CLIENTS[1] = client
+    await client.public.health()
+    session = client._session
+    assert session
+    await HostsManager.remove_client(1)
+    assert 1 not in HostsManager._HOST_CLIENTS
+    assert client._close_task
+    await client._close_task
+    assert session.closed
+
+
+@pytest.mark.asyncio
+async def test_remove_client_waits_for_running_requests(agent):
+    server, state = agent
+    state["delay"] = 0.2
+    client = AgentClient(1, str(server.make_url("/")))
+    HostsManager._HOST_CLIENTS[1] = client
+    request = asyncio.create_task(client.public.health())
+    await asyncio.sleep(0.05)
+    session = client._session
+    assert session
+    await HostsManager.remove_client(1)
+    assert not session.closed
+    assert await request == "OK"
+    assert client._close_task
+    await client._close_task
+    assert session.closed
+
+
+@pytest.mark.asyncio
+async def test_raw_signature_negotiation(agent):
+    server, state = agent
+    client = AgentClient(1, str(server.make_url("/")), SECRET)
+    try:
+        await client.public.access()
+        await client.public.access()
+    finally:
+        await client.close()
+    # Version 1 until the agent advertises version 2
+    assert state["versions"] == [None, RAW_SIGNATURE_VERSION]
@@ -0,0 +1,136 @@
+import json
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from backend.core import agent_client
+from backend.core.agent_client import AgentClient
+from backend.exception import TugAgentJobLostException
+from shared.schemas.image_schemas import PullImageRequestBodySchema
+
+JOB_ID = "job1"
+
+
+def _job(status: str, **kwargs) -> dict:
+    return {
+        "id": JOB_ID,
+        "kind": "image_pull",
+        "status": status,
+        "created_at": 0,
+        **kwargs,
+    }
+
+
+@pytest_asyncio.fixture
+async def agent(monkeypatch: pytest.MonkeyPatch):
+    """
+    Stand-in agent with jobs.
+    :returns: client of the agent and its state: whether the agent
+        has jobs, number of submissions and of plain pulls,
+        and states of the job to be streamed by each following,
+        None if the job is not found
+    """
+    monkeypatch.setattr(agent_client, "JOB_FOLLOW_RETRIES", 2)
+
+    async def no_sleep(_):
+        pass
+
+    monkeypatch.setattr(agent_client.asyncio, "sleep", no_sleep)
+    state: dict = {
+        "jobs": True,
+        "submissions": 0,
+        "pulls": 0,
+        "streams": [],
+    }
+
+    async def submit(request: web.Request) -> web.Response:
+        if not state["jobs"]:
+            # Response of FastAPI to a path without endpoint
+            return web.json_response(
+                {"detail": "Not Found"}, status=404
+            )
+        state["submissions"] += 1
+        return web.json_response(_job("running"))
+
+    async def pull(request: web.Request) -> web.Response:
+        state["pulls"] += 1
+        return web.json_response({"Id": "sha256:" + "a" * 64})
+
+    async def stream(request: web.Request) -> web.StreamResponse:
+        jobs = state["streams"].pop(0)
+        if jobs is None:
+            return web.json_response(
+                {"detail": "Job not found"}, status=404
+            )
+        resp = web.StreamResponse()
+        await resp.prepare(request)
+        for job in jobs:
+            await resp.write(json.dumps(job).encode() + b"\n")
+        return resp
+
+    app = web.Application()
+    app.router.add_post("/api/job/submit", submit)
+    app.router.add_get(f"/api/job/{JOB_ID}/stream", stream)
+    app.router.add_post("/api/image/pull", pull)
+    server = TestServer(app)
+    await server.start_server()
+    client = AgentClient(1, str(server.make_url("/")))
+    yield client, state
+    await client.close()
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_job_is_followed_again(agent):
+    client, state = agent
+    state["streams"] = [
+        # Stream is broken before the end of the job
+        [_job("running")],
+        [_job("running"), _job("done", result="ok")],
+    ]
+    body = PullImageRequestBodySchema(image="nginx")
+    assert await client.job.run("image_pull", body) == "ok"
+    assert state["submissions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_lost_job_is_not_submitted_again(agent):
+    client, state = agent
+    # The agent is restarted while the job is followed
+    state["streams"] = [[_job("running")], None]
+    body = PullImageRequestBodySchema(image="nginx")
+    with pytest.raises(TugAgentJobLostException):
+        await client.job.run("image_pull", body)
+    assert state["submissions"] == 1
+    assert not state["streams"]
+
+
+@pytest.mark.asyncio
+async def test_job_not_followed_to_the_end(agent):
+    client, state = agent
+    state["streams"] = [[_job("running")] for _ in range(3)]
+    body = PullImageRequestBodySchema(image="nginx")
+    with pytest.raises(TugAgentJobLostException):
+        await client.job.run("image_pull", body)
+    assert state["submissions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_plain_request_without_jobs(agent):
+    client, state = agent
+    state["jobs"] = False
+    body = PullImageRequestBodySchema(image="nginx")
+    image = await client.image.pull(body)
+    assert image.id == "sha256:" + "a" * 64
+    assert state["pulls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_no_plain_request_for_lost_job(agent):
+    client, state = agent
+    state["streams"] = [None]
+    body = PullImageRequestBodySchema(image="nginx")
+    with pytest.raises(TugAgentJobLostException):
+        await client.image.pull(body)
+    assert state["submissions"] == 1
+    assert state["pulls"] == 0
@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp import ClientResponseError, web
+from aiohttp.test_utils import TestServer
+from backend.config import Config
+from backend.core.agent_client import AgentClient
+from shared.schemas.metrics_schemas import X_ADMISSION_REJECTED
+
+
+@pytest_asyncio.fixture
+async def agent(monkeypatch: pytest.MonkeyPatch):
+    """
+    Stand-in agent, rejecting the access check with 429
+    by the admission control or by another limit.
+    :returns: client of the agent and its state
+    """
+    monkeypatch.setattr(Config, "AGENT_RETRIES", 0)
+    state = {"admission": True, "waiting": asyncio.Event()}
+
+    async def access(request: web.Request) -> web.Response:
+        headers = {"Retry-After": "0"}
+        if state["admission"]:
+            headers[X_ADMISSION_REJECTED] = "1"
+        return web.json_response(
+            {"detail": "Overloaded"}, status=429, headers=headers
+        )
+
+    async def wait_healthy(request: web.Request) -> web.Response:
+        await state["waiting"].wait()
+        return web.json_response({"Id": "a" * 64})
+
+    async def health(request: web.Request) -> web.Response:
+        return web.json_response("OK")
+
+    app = web.Application()
+    app.router.add_get("/api/public/access", access)
+    app.router.add_get("/api/public/health", health)
+    app.router.add_get(
+        "/api/container/wait_healthy/{id}", wait_healthy
+    )
+    server = TestServer(app)
+    await server.start_server()
+    client = AgentClient(1, str(server.make_url("/")))
+    yield client, state
+    await client.close()
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_admission_rejection_reduces_limit(agent):
+    client, state = agent
+    limit = client.limiter.limit
+    with pytest.raises(ClientResponseError):
+        await client.public.access()
+    assert client.limiter.limit == limit // 2
+
+
+@pytest.mark.asyncio
+async def test_other_rejection_keeps_limit(agent):
+    client, state = agent
+    # E.g. limit of jobs, it is not the overload of the agent
+    state["admission"] = False
+    limit = client.limiter.limit
+    with pytest.raises(ClientResponseError):
+        await client.public.access()
+    assert client.limiter.limit == limit
+
+
+@pytest.mark.asyncio
+async def test_waiting_does_not_hold_limit(agent):
+    client, state = agent
+    client.limiter._limit = 1
+    waiting = asyncio.create_task(
+        client.container.wait_healthy("web", 10)
+    )
+    await asyncio.sleep(0.05)
+    assert client.limiter.get_status().in_flight == 0
+    assert await asyncio.wait_for(client.public.health(), 1) == "OK"
+    state["waiting"].set()
+    assert (await waiting).id == "a" * 64
@@ -0,0 +1,125 @@
+import pytest
+import pytest_asyncio
+from aiohttp import ClientResponseError, web
+from aiohttp.test_utils import TestServer
+from python_on_whales.components.container.models import (
+    ContainerInspectResult,
+)
+from backend.core.agent_client import AgentClient
+from backend.core.container.util.wait_for_container_healthy import (
+    wait_for_container_healthy,
+)
+
+ID = "a" * 64
+
+
+def _inspect_data(status: str, health: str | None = None) -> dict:
+    state: dict = {"Status": status}
+    if health:
+        state["Health"] = {"Status": health}
+    return {
+        "Id": ID,
+        "State": state,
+        "Config": {"Healthcheck": {"Test": ["CMD", "true"]}},
+    }
+
+
+@pytest_asyncio.fixture
+async def agent():
+    """
+    Stand-in agent.
+    :returns: client of the agent and its state: inspect data
+        of the container, number of inspect requests
+        and whether the agent has wait_healthy endpoint
+    """
+    state = {
+        "inspect": _inspect_data("running", "starting"),
+        "polls": 0,
+        "wait_healthy": False,
+    }
+
+    async def inspect(request: web.Request) -> web.Response:
+        if request.match_info["id"] != ID:
+            return web.json_response(
+                {"detail": "Container not found"}, status=404
+            )
+        state["polls"] += 1
+        return web.json_response(state["inspect"])
+
+    async def wait_healthy(request: web.Request) -> web.Response:
+        if not state["wait_healthy"]:
+            # Response of FastAPI to a path without endpoint
+            return web.json_response(
+                {"detail": "Not Found"}, status=404
+            )
+        if request.match_info["id"] != ID:
+            return web.json_response(
+                {"detail": "Container not found"}, status=404
+            )
+        return web.json_response(state["inspect"])
+
+    app = web.Application()
+    app.router.add_get("/api/container/inspect/{id}", inspect)
+    app.router.add_get(
+        "/api/container/wait_healthy/{id}", wait_healthy
+    )
+    server = TestServer(app)
+    await server.start_server()
+    client = AgentClient(1, str(server.make_url("/")))
+    yield client, state
+    await client.close()
+    await server.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "status, health, healthy",
+    [
+        ("running", "healthy", True),
+        ("running", "unhealthy", False),
+        ("exited", None, False),
+        ("dead", None, False),
+    ],
+)
+async def test_polling_stops_on_resolved_state(
+    agent, status: str, health: str | None, healthy: bool
+):
+    client, state = agent
+    state["inspect"] = _inspect_data(status, health)
+    container = ContainerInspectResult.model_validate(
+        state["inspect"]
+    )
+    assert (
+        await wait_for_container_healthy(
+            client, container, timeout=30
+        )
+        is healthy
+    )
+    # The state is resolved, no need to poll until the deadline
+    assert state["polls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_waiting_by_agent(agent):
+    client, state = agent
+    state["wait_healthy"] = True
+    state["inspect"] = _inspect_data("running", "healthy")
+    container = ContainerInspectResult.model_validate(
+        state["inspect"]
+    )
+    assert await wait_for_container_healthy(client, container)
+    assert state["polls"] == 0
+
+
+@pytest.mark.asyncio
+async def test_missing_container_is_not_polled(agent):
+    client, state = agent
+    state["wait_healthy"] = True
+    data = _inspect_data("running")
+    data["Id"] = "b" * 64
+    container = ContainerInspectResult.model_validate(data)
+    with pytest.raises(ClientResponseError) as e:
+        await wait_for_container_healthy(client, container)
+    assert e.value.status == 404
+    assert e.value.message == "Container not found"
+    assert state["polls"] == 0
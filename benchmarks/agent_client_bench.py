@@ -0,0 +1,89 @@
+"""
+Requests per second of the agent client against a stand-in agent,
+pooled keep-alive session vs a session per request.
+Run from the root of the workspace:
+python -m benchmarks.agent_client_bench
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable
+import aiohttp
+from aiohttp import web
+from backend.core.agent_client import AgentClient
+from shared.util.signature import get_signature_headers
+
+SECRET = "secret"
+HEALTH_PATH = "/api/public/health"
+
+
+async def health(request: web.Request) -> web.Response:
+    return web.json_response("OK")
+
+
+async def start_agent(port: int) -> web.AppRunner:
+    """Start the stand-in agent"""
+    app = web.Application()
+    app.router.add_get(HEALTH_PATH, health)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+async def request_with_new_session(url: str) -> None:
+    """Request as it was made before the pooled session"""
+    headers = get_signature_headers(SECRET, "GET", HEALTH_PATH)
+    async with aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=5)
+    ) as session:
+        async with session.get(
+            url + HEALTH_PATH, headers=headers
+        ) as resp:
+            resp.raise_for_status()
+            await resp.json()
+
+
+async def measure(
+    request: Callable[[], Awaitable], count: int, concurrency: int
+) -> float:
+    """:returns: requests per second"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _one():
+        async with semaphore:
+            await request()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[_one() for _ in range(count)])
+    return count / (time.perf_counter() - start)
+
+
+async def main(count: int, concurrency: list[int], port: int):
+    runner = await start_agent(port)
+    url = f"http://127.0.0.1:{port}"
+    client = AgentClient(1, url, SECRET)
+    try:
+        for c in concurrency:
+            new = await measure(
+                lambda: request_with_new_session(url), count, c
+            )
+            pooled = await measure(client.public.health, count, c)
+            print(
+                f"concurrency={c}: session per request {new:.0f} req/s, pooled {pooled:.0f} req/s"
+            )
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 10]
+    )
+    parser.add_argument("--port", type=int, default=18001)
+    args = parser.parse_args()
+    asyncio.run(main(args.count, args.concurrency, args.port))
@@ -0,0 +1,82 @@
+"""
+Latency of the agent's docker engines.
+The api engine is measured against the stand-in docker daemon,
+the cli engine needs a real docker and a name of its container.
+Run from the root of the workspace:
+python -m benchmarks.docker_engine_bench [--cli-container NAME]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Awaitable, Callable
+from python_on_whales import DockerClient
+from agent.engine.api_engine import ApiDockerEngine
+from agent.engine.cli_engine import CliDockerEngine
+from benchmarks.fake_docker_daemon import (
+    FakeDockerDaemon,
+    get_container_id,
+)
+
+
+async def measure(
+    name: str, op: str, func: Callable[[], Awaitable], count: int
+) -> None:
+    start = time.perf_counter()
+    for _ in range(count):
+        await func()
+    ms = (time.perf_counter() - start) / count * 1000
+    print(f"{name:4} {op:16} {ms:8.2f} ms/op")
+
+
+async def main(
+    count: int, containers: int, cli_container: str | None
+):
+    docker = DockerClient()
+    with tempfile.TemporaryDirectory() as dir:
+        path = os.path.join(dir, "docker.sock")
+        daemon = FakeDockerDaemon(path, containers)
+        daemon.start()
+        api = ApiDockerEngine(docker, f"unix://{path}")
+        id = get_container_id(0)
+        try:
+            await measure("api", "ping", api.ping, count)
+            await measure(
+                "api",
+                "inspect",
+                lambda: api.container_inspect(id),
+                count,
+            )
+            await measure(
+                "api",
+                f"list({containers})",
+                api.container_list,
+                count,
+            )
+        finally:
+            daemon.stop()
+    if cli_container:
+        cli = CliDockerEngine(docker)
+        await measure(
+            "cli",
+            "inspect",
+            lambda: cli.container_inspect(cli_container),
+            count,
+        )
+        await measure(
+            "cli", "list", cli.container_list, max(1, count // 10)
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--containers", type=int, default=30)
+    parser.add_argument(
+        "--cli-container",
+        help="container of the real docker to compare with the cli engine",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.count, args.containers, args.cli_container))
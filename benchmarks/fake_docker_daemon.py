@@ -0,0 +1,141 @@
+"""
+Stand-in of the docker daemon on a unix socket,
+with the endpoints used by the agent's api engine:
+ping, list and inspect of containers, pull of images.
+Run it separately:
+python -m benchmarks.fake_docker_daemon /tmp/fake-docker.sock
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler
+from socketserver import ThreadingUnixStreamServer
+from urllib.parse import parse_qs, urlsplit
+
+_VERSION_RE = re.compile(r"^/v[\d.]+")
+_INSPECT_PATH_RE = re.compile(r"^/containers/([^/]+)/json$")
+
+
+def get_container_id(index: int) -> str:
+    return f"{index:064x}"
+
+
+def get_container_inspect(index: int) -> dict:
+    return {
+        "Id": get_container_id(index),
+        "Name": f"/c{index}",
+        "Image": "sha256:" + "a" * 64,
+        "State": {"Status": "running", "Running": True},
+        "Config": {"Image": "nginx:latest", "Labels": {}},
+    }
+
+
+class FakeDockerDaemon(ThreadingUnixStreamServer):
+    """
+    :param path: path of the unix socket
+    :param containers: number of containers
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: str, containers: int):
+        if os.path.exists(path):
+            os.remove(path)
+        self.containers = containers
+        super().__init__(path, _Handler)
+
+    def start(self) -> None:
+        """Serve in a background thread"""
+        threading.Thread(
+            target=self.serve_forever, daemon=True
+        ).start()
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        os.remove(self.server_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeDockerDaemon
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, data, status: int = 200):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = _VERSION_RE.sub("", url.path)
+        if path == "/_ping":
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"OK")
+        elif path == "/containers/json":
+            self._send_json(
+                [
+                    {"Id": get_container_id(i)}
+                    for i in range(self.server.containers)
+                ]
+            )
+        elif match := _INSPECT_PATH_RE.match(path):
+            try:
+                index = int(match.group(1), 16)
+            except ValueError:
+                index = -1
+            if not 0 <= index < self.server.containers:
+                self._send_json(
+                    {
+                        "message": f"No such container: {match.group(1)}"
+                    },
+                    404,
+                )
+                return
+            self._send_json(get_container_inspect(index))
+        else:
+            self._send_json({"message": "page not found"}, 404)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        path = _VERSION_RE.sub("", url.path)
+        if path != "/images/create":
+            self._send_json({"message": "page not found"}, 404)
+            return
+        # Errors of the pull come after 200 status
+        image = parse_qs(url.query).get("fromImage", [""])[0]
+        lines = [{"status": f"Pulling from {image}"}]
+        if image.startswith("missing"):
+            lines.append({"error": f"manifest for {image} not found"})
+        else:
+            lines.append({"status": "Download complete"})
+        body = b"".join(
+            json.dumps(l).encode() + b"\r\n" for l in lines
+        )
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", help="path of the unix socket")
+    parser.add_argument("--containers", type=int, default=30)
+    args = parser.parse_args()
+    daemon = FakeDockerDaemon(args.path, args.containers)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        daemon.server_close()
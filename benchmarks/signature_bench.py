@@ -0,0 +1,73 @@
+"""
+Time of signing and verification of a large request body,
+signature v1 (json of the parsed body) vs v2 (raw bytes of the body).
+Run from the root of the workspace:
+python -m benchmarks.signature_bench
+"""
+
+import argparse
+import json
+import timeit
+from shared.schemas.container_schemas import (
+    CreateContainerRequestBodySchema,
+)
+from shared.util.signature import (
+    get_signature_headers,
+    verify_signature_headers,
+)
+
+SECRET = "secret"
+PATH = "/api/container/create"
+
+BODY = CreateContainerRequestBodySchema(
+    image="registry.example.com/team/app:1.2.3",
+    name="app",
+    envs={f"VAR_{i}": f"value-{i}-" + "x" * 40 for i in range(300)},
+    labels={
+        f"com.example.label.{i}": f"label value {i} " + "y" * 40
+        for i in range(300)
+    },
+    volumes=[(f"/srv/data{i}", f"/data{i}", "rw") for i in range(50)],
+    publish=[(8000 + i, 80 + i) for i in range(50)],
+    command=["run", "--flag"] * 20,
+)
+
+
+def sign_and_verify_v1() -> bytes:
+    # The client dumps the body, serializes it for the signature
+    # and again to be sent
+    body = BODY.model_dump(exclude_unset=True)
+    headers = get_signature_headers(SECRET, "POST", PATH, body=body)
+    data = json.dumps(body).encode()
+    # The agent parses the body and serializes it to verify
+    verify_signature_headers(
+        SECRET, 5, headers, "POST", PATH, body=json.loads(data)
+    )
+    return data
+
+
+def sign_and_verify_v2() -> bytes:
+    data = BODY.model_dump_json(exclude_unset=True).encode()
+    headers = get_signature_headers(
+        SECRET, "POST", PATH, body_bytes=data
+    )
+    verify_signature_headers(
+        SECRET, 5, headers, "POST", PATH, body_bytes=data
+    )
+    # The agent still parses the body once for the endpoint
+    json.loads(data)
+    return data
+
+
+def main(count: int):
+    print(f"body {len(sign_and_verify_v2()) / 1024:.0f} KB")
+    for func in (sign_and_verify_v1, sign_and_verify_v2):
+        total = min(timeit.repeat(func, number=count, repeat=3))
+        print(f"{func.__name__:18} {total / count * 1e6:7.0f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=300)
+    args = parser.parse_args()
+    main(args.count)
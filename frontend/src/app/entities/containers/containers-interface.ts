@@ -46,6 +46,7 @@ export enum EContainerStatus {
 export enum ECheckStatus {
   PREPARING = 'PREPARING',
   CHECKING = 'CHECKING',
+  PULLING = 'PULLING',
   UPDATING = 'UPDATING',
   DONE = 'DONE',
   ERROR = 'ERROR',
@@ -53,6 +54,10 @@ export enum ECheckStatus {
 
 export interface IContainerCheckData {
   status: ECheckStatus;
+  pull_downloaded?: number;
+  pull_extracted?: number;
+  pull_total?: number;
+  pull_throughput?: number;
 }
 export interface IHostCheckData extends IContainerCheckData {
   available: number;
@@ -2,15 +2,30 @@ export interface ICreateHost {
   name: string;
   enabled: boolean;
   prune: boolean;
+  partial_restart: boolean;
   url: string;
   secret: string;
   timeout: number;
+  check_concurrency: number;
+  group_concurrency: number;
+  pull_concurrency: number;
 }
 export interface IHostInfo extends ICreateHost {
   id: number;
 }
+export interface IHostCircuit {
+  state: 'closed' | 'open' | 'half_open';
+  failures: number;
+  retry_in?: number;
+}
+export interface IHostConcurrency {
+  limit: number;
+  in_flight: number;
+}
 export interface IHostStatus {
   id: number;
   ok: boolean;
   err: string;
+  circuit?: IHostCircuit;
+  concurrency?: IHostConcurrency;
 }
@@ -86,7 +86,11 @@ export class HostsPageCard implements OnInit {
     return {
       enabled: true,
       prune: false,
+      partial_restart: false,
       timeout: 5,
+      check_concurrency: 4,
+      group_concurrency: 3,
+      pull_concurrency: 2,
     };
   }
 
@@ -94,9 +98,22 @@ export class HostsPageCard implements OnInit {
     name: new FormControl<string>(null, [Validators.required]),
     enabled: new FormControl<boolean>(null, [Validators.required]),
     prune: new FormControl<boolean>(null, [Validators.required]),
+    partial_restart: new FormControl<boolean>(null, [Validators.required]),
     url: new FormControl<string>(null, [Validators.required]),
     secret: new FormControl<string>(null),
     timeout: new FormControl<number>(null, [Validators.required]),
+    check_concurrency: new FormControl<number>(null, [
+      Validators.required,
+      Validators.min(1),
+    ]),
+    group_concurrency: new FormControl<number>(null, [
+      Validators.required,
+      Validators.min(1),
+    ]),
+    pull_concurrency: new FormControl<number>(null, [
+      Validators.required,
+      Validators.min(1),
+    ]),
   });
 
   ngOnInit(): void {
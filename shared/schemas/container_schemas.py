@@ -8,7 +8,35 @@ from python_on_whales.utils import ValidPath, ValidPortMapping
 
 
 class GetContainerListBodySchema(BaseModel):
+    """
+    Get container list request body.
+    :param all: include not running containers
+    :param summary: return only CONTAINER_SUMMARY_FIELDS
+        of the inspect data, enough for listing and grouping
+    """
+
     all: Optional[bool] = True
+    summary: Optional[bool] = False
+
+
+# Fields of ContainerInspectResult returned in summary mode
+# (include argument of model_dump).
+CONTAINER_SUMMARY_FIELDS = {
+    "id": True,
+    "name": True,
+    "image": True,
+    "state": {
+        "status": True,
+        "exit_code": True,
+        "health": {"status": True},
+    },
+    "config": {"image": True, "labels": True, "hostname": True},
+    "host_config": {"port_bindings": True},
+}
+
+
+class InspectContainersRequestBodySchema(BaseModel):
+    names_or_ids: list[str]
 
 
 class CreateContainerRequestBodySchema(BaseModel):
@@ -123,3 +151,7 @@ class CreateContainerRequestBodySchema(BaseModel):
     volume_driver: Optional[str] = None
     volumes_from: Optional[list[str]] = None
     workdir: Optional[ValidPath] = None
+
+
+class RenameContainerRequestBodySchema(BaseModel):
+    new_name: str
@@ -0,0 +1,40 @@
+from typing import Literal, Optional
+from pydantic import BaseModel
+
+# The events stream sends a heartbeat at least this often (seconds),
+# so silent connection can be told from a quiet docker.
+EVENTS_STREAM_HEARTBEAT = 15
+
+DockerEventType = Literal["container", "image"]
+
+
+class DockerEventSchema(BaseModel):
+    """
+    Lifecycle change of a container or an image.
+    :param type: type of the object
+    :param action: action of the docker e.g. start, die, destroy,
+        pull, untag, "health_status: healthy"
+    :param id: id of the container or image,
+        reference for some image events e.g. pull
+    :param name: name of the container or image, if any
+    :param time: unix timestamp of the event in seconds
+    """
+
+    type: DockerEventType
+    action: str
+    id: str
+    name: Optional[str] = None
+    time: float
+
+
+class EventsStreamMessageSchema(BaseModel):
+    """
+    Message of the docker events stream.
+    :param kind: subscribed - the first message, all the events
+        after it are streamed; event - a docker event;
+        heartbeat - nothing happened for a while
+    :param event: the docker event (event only)
+    """
+
+    kind: Literal["subscribed", "event", "heartbeat"]
+    event: Optional[DockerEventSchema] = None
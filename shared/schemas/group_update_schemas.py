@@ -0,0 +1,91 @@
+from typing import Literal, Optional
+from pydantic import BaseModel
+from python_on_whales.components.container.models import (
+    ContainerInspectResult,
+)
+from shared.schemas.container_schemas import (
+    CreateContainerRequestBodySchema,
+)
+
+# Suffix of the old container name during the update
+ASIDE_SUFFIX = "-tugtainer-old"
+
+
+class GroupUpdateItemSchema(BaseModel):
+    """
+    Container of the group update plan.
+    :param name: name of the container
+    :param update: whether to recreate the container with new config,
+        otherwise it is only stopped and started again
+    :param config: current config, used to roll back
+        if the old container is lost
+    :param new_config: config merged with new image
+    :param old_image_id: id of the current image, to roll back
+    :param image_spec: image spec e.g. quenary/tugtainer:latest
+    :param commands: commands to run after the container started
+    :param health_timeout: health wait timeout in seconds
+    """
+
+    name: str
+    update: bool = False
+    config: Optional[CreateContainerRequestBodySchema] = None
+    new_config: Optional[CreateContainerRequestBodySchema] = None
+    old_image_id: Optional[str] = None
+    image_spec: Optional[str] = None
+    commands: list[list[str]] = []
+    health_timeout: int = 60
+
+
+class GroupUpdatePlanSchema(BaseModel):
+    """
+    Plan of the group update.
+    Containers are stopped from the last layer to the first,
+    then updated/started layer by layer,
+    containers of a layer are processed concurrently.
+    """
+
+    layers: list[list[GroupUpdateItemSchema]]
+
+
+GroupUpdateStep = Literal[
+    "stop",
+    "remove",
+    "rename",
+    "create",
+    "start",
+    "command",
+    "health",
+    "rollback",
+    "result",
+    "done",
+]
+GroupUpdateOutcome = Literal[
+    "updated",
+    "rolled_back",
+    "failed",
+    "started",
+]
+
+
+class GroupUpdateEventSchema(BaseModel):
+    """
+    Progress event of the group update (line of the stream).
+    :param step: step of the update
+    :param container: name of the container (None for the group)
+    :param ok: whether the step succeeded
+    :param message: error or info message
+    :param outcome: outcome of the container ('result' step)
+    :param health_wait: time spent waiting for health in seconds
+    :param recover_time: time from the failure of the update
+        to the end of rolled back container's health wait in seconds
+    :param inspect: inspect data of the container ('result' step)
+    """
+
+    step: GroupUpdateStep
+    container: Optional[str] = None
+    ok: bool = True
+    message: Optional[str] = None
+    outcome: Optional[GroupUpdateOutcome] = None
+    health_wait: Optional[float] = None
+    recover_time: Optional[float] = None
+    inspect: Optional[ContainerInspectResult] = None
@@ -3,12 +3,19 @@ from pydantic import BaseModel
 from python_on_whales.components.image.cli_wrapper import (
     ImageListFilter,
 )
+from python_on_whales.components.image.models import (
+    ImageInspectResult,
+)
 
 
 class InspectImageRequestBodySchema(BaseModel):
     spec_or_id: str
 
 
+class InspectImagesRequestBodySchema(BaseModel):
+    specs_or_ids: list[str]
+
+
 class GetImageListBodySchema(BaseModel):
     repository_or_tag: Optional[str] = None
     filters: Optional[dict[str, Any]] = {}
@@ -24,6 +31,64 @@ class PullImageRequestBodySchema(BaseModel):
     image: str
 
 
+class PullImageStreamRequestBodySchema(BaseModel):
+    """
+    :param image: image spec e.g. quenary/tugtainer:latest
+    :param stall_timeout: the pull is aborted if there is no progress
+        for this time in seconds (default is PULL_STALL_TIMEOUT of the agent)
+    """
+
+    image: str
+    stall_timeout: Optional[int] = None
+
+
+class PullLayerProgressSchema(BaseModel):
+    """
+    Pull progress of the image layer.
+    Bytes are reported only by the docker engine api.
+    :param id: short id of the layer
+    :param status: last status e.g. Downloading, Pull complete
+    :param downloaded: downloaded bytes
+    :param extracted: extracted bytes
+    :param total: size of the layer, if known
+    """
+
+    id: str
+    status: str
+    downloaded: int = 0
+    extracted: int = 0
+    total: Optional[int] = None
+
+
+class PullImageProgressEventSchema(BaseModel):
+    """
+    Progress event of the image pull (line of the stream).
+    :param layers: layers changed since the previous event
+    :param downloaded: downloaded bytes of all layers
+    :param extracted: extracted bytes of all layers
+    :param total: size of the layers with known size
+    :param elapsed: time since the pull started in seconds
+    :param done: whether it is the last event
+    :param ok: whether the pull succeeded
+    :param message: error message
+    :param image: inspect data of the pulled image (last event)
+    """
+
+    layers: list[PullLayerProgressSchema] = []
+    downloaded: int = 0
+    extracted: int = 0
+    total: int = 0
+    elapsed: float = 0
+    done: bool = False
+    ok: bool = True
+    message: Optional[str] = None
+    image: Optional[ImageInspectResult] = None
+
+
+class GetImageRemoteDigestRequestBodySchema(BaseModel):
+    image: str
+
+
 class TagImageRequestBodySchema(BaseModel):
     spec_or_id: str
     tag: str
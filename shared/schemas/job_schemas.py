@@ -0,0 +1,53 @@
+from typing import Any, Literal, Optional
+from pydantic import BaseModel
+
+# The job stream sends the state of the job at least this often
+# (seconds), so silent connection can be told from a long job.
+JOB_STREAM_HEARTBEAT = 10
+
+JobKind = Literal[
+    "image_pull",
+    "image_prune",
+    "container_create",
+    "command_run",
+]
+JobStatus = Literal["running", "done", "failed", "cancelled"]
+
+
+class SubmitJobRequestBodySchema(BaseModel):
+    """
+    :param kind: operation of the job
+    :param body: body of the operation, the same as of its endpoint
+    :param key: idempotency key. Job of the same kind and key
+        is returned instead of a new one, unless it failed.
+    """
+
+    kind: JobKind
+    body: dict[str, Any]
+    key: Optional[str] = None
+
+
+class JobSchema(BaseModel):
+    """
+    State of the agent job.
+    :param id: id of the job
+    :param kind: operation of the job
+    :param key: idempotency key of the job
+    :param status: status of the job
+    :param created_at: unix timestamp of the submission
+    :param finished_at: unix timestamp of the end
+    :param progress: last progress of the operation, if it reports any
+        e.g. PullImageProgressEventSchema for the image pull
+    :param result: result of the operation, the same as of its endpoint
+    :param error: error message of the failed job
+    """
+
+    id: str
+    kind: JobKind
+    key: Optional[str] = None
+    status: JobStatus
+    created_at: float
+    finished_at: Optional[float] = None
+    progress: Optional[dict[str, Any]] = None
+    result: Any = None
+    error: Optional[str] = None
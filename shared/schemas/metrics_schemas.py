@@ -0,0 +1,118 @@
+from pydantic import BaseModel
+
+# Header of responses to requests rejected by the admission control,
+# so the client can tell them from other 429 and 503
+X_ADMISSION_REJECTED = "x-tugtainer-admission-rejected"
+
+
+class ExecutorPoolMetricsSchema(BaseModel):
+    """
+    Metrics of the agent's executor pool.
+    :param name: name of the pool
+    :param workers: max number of threads
+    :param active: number of running tasks
+    :param queued: number of tasks waiting for a thread
+    :param completed: number of completed tasks
+    :param zombies: number of tasks still running
+        after they were cancelled or timed out
+    :param wait_avg: average queue wait of the last tasks in seconds
+    :param wait_max: max queue wait of the last tasks in seconds
+    """
+
+    name: str
+    workers: int
+    active: int
+    queued: int
+    completed: int
+    zombies: int
+    wait_avg: float
+    wait_max: float
+
+
+class ReadsMetricsSchema(BaseModel):
+    """
+    Metrics of the agent's read calls coalescing.
+    :param cache_ttl: ttl of the read cache in seconds
+    :param calls: number of read calls
+    :param executed: number of calls executed on the docker
+    :param coalesced: number of calls joined to the running ones
+    :param cache_hits: number of calls served from the cache
+    """
+
+    cache_ttl: float
+    calls: int
+    executed: int
+    coalesced: int
+    cache_hits: int
+
+
+class CompressionMetricsSchema(BaseModel):
+    """
+    Metrics of the agent's http compression in bytes.
+    :param response_raw: responses before compression
+    :param response_sent: responses sent
+    :param request_raw: requests after decompression
+    :param request_received: requests received
+    :param saved: bytes saved in both directions
+    """
+
+    response_raw: int
+    response_sent: int
+    request_raw: int
+    request_received: int
+    saved: int
+
+
+class JobsMetricsSchema(BaseModel):
+    """
+    Metrics of the agent's jobs.
+    :param max_count: max number of kept jobs
+    :param running: number of running jobs
+    :param kept: number of running and finished jobs in memory
+    :param results_size: size of kept results in bytes
+    :param submitted: number of started jobs
+    :param reused: number of submissions that got an existing job
+        by idempotency key
+    :param rejected: number of submissions rejected by the limit
+    """
+
+    max_count: int
+    running: int
+    kept: int
+    results_size: int
+    submitted: int
+    reused: int
+    rejected: int
+
+
+class AdmissionMetricsSchema(BaseModel):
+    """
+    Metrics of the agent's admission control of a requests class.
+    :param name: name of the class
+    :param limit: max number of concurrent requests
+    :param queue: max number of waiting requests
+    :param active: number of running requests
+    :param queued: number of waiting requests
+    :param admitted: number of admitted requests
+    :param rejected: number of requests rejected by the full queue
+    :param timed_out: number of requests rejected by the queue timeout
+    :param duration_avg: average duration of the last requests in seconds
+    """
+
+    name: str
+    limit: int
+    queue: int
+    active: int
+    queued: int
+    admitted: int
+    rejected: int
+    timed_out: int
+    duration_avg: float
+
+
+class AgentMetricsSchema(BaseModel):
+    executors: list[ExecutorPoolMetricsSchema]
+    reads: ReadsMetricsSchema
+    compression: CompressionMetricsSchema
+    jobs: JobsMetricsSchema
+    admission: list[AdmissionMetricsSchema]
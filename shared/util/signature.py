@@ -2,28 +2,40 @@ import hmac
 import hashlib
 import base64
 import json
-from typing import Any, Literal
+from typing import Any, Literal, Mapping
 import time
+from urllib.parse import parse_qsl, urlencode
 from fastapi import HTTPException, status
 import logging
 
 
 X_TIMESTAMP = "x-tugtainer-timestamp"
 X_SIGNATURE = "x-tugtainer-signature"
+# Version of the signature of the request,
+# or the latest version supported by the agent in responses.
+# 1 (default) - signature of compact json of the parsed body,
+# 2 - signature of the exact bytes of the body and the query.
+X_SIGNATURE_VERSION = "x-tugtainer-signature-version"
+RAW_SIGNATURE_VERSION = "2"
 
 
 def get_signature_headers(
     secret_key: str | None,
     method: str,
     path: str,
-    body: Any,
+    body: Any = None,
+    body_bytes: bytes | None = None,
+    query: str | Mapping[str, Any] | None = None,
 ) -> dict[str, str]:
     """
     Get signature headers
     :param secret_key: AGENT_SECRET
     :param method: method of the req
     :param path: path of the req e.g. /api/containers/list
-    :param body: body of the req
+    :param body: body of the req (signature version 1)
+    :param body_bytes: exact bytes of the body to be sent,
+        if provided, signature version 2 is used
+    :param query: query params of the req (signature version 2)
     """
     logging.debug(
         f"Getting signature headers for: \n{method} \n{path} \n{body}"
@@ -33,8 +45,13 @@ def get_signature_headers(
     if not secret_key:
         return headers
 
+    if body_bytes is not None:
+        headers[X_SIGNATURE_VERSION] = RAW_SIGNATURE_VERSION
+        path = _get_signed_path(path, query)
+    else:
+        body_bytes = _get_body_bytes(body)
     signature = _get_req_signature(
-        secret_key, timestamp, method, path, body
+        secret_key, timestamp, method, path, body_bytes
     )
     headers[X_SIGNATURE] = signature
     logging.debug(f"Signature headers: {headers}")
@@ -47,7 +64,9 @@ def verify_signature_headers(
     headers: dict[str, str],
     method: str,
     path: str,
-    body: Any,
+    body: Any = None,
+    body_bytes: bytes | None = None,
+    query: str | Mapping[str, Any] | None = None,
 ) -> Literal[True]:
     """
     Verify signature headers
@@ -56,7 +75,9 @@ def verify_signature_headers(
     :param headers:  headers of the request
     :param method: method of the req
     :param path: path of the req e.g. /api/containers/list
-    :param body: body of the req
+    :param body: parsed body of the req (signature version 1)
+    :param body_bytes: raw body of the req (signature version 2)
+    :param query: query string of the req (signature version 2)
     """
     timestamp = int(headers.get(X_TIMESTAMP, "0"))
     signature = headers.get(X_SIGNATURE, "")
@@ -75,8 +96,14 @@ def verify_signature_headers(
         )
     if not secret_key:
         return True
+    signed_path = path
+    if is_raw_signature(headers):
+        body_bytes = body_bytes or b""
+        signed_path = _get_signed_path(path, query)
+    else:
+        body_bytes = _get_body_bytes(body)
     expected = _get_req_signature(
-        secret_key, timestamp, method, path, body
+        secret_key, timestamp, method, signed_path, body_bytes
     )
     if not hmac.compare_digest(expected, signature):
         message = f"Invalid signature for: {method} {path} {body}"
@@ -85,19 +112,49 @@ def verify_signature_headers(
     return True
 
 
+def is_raw_signature(headers: dict[str, str]) -> bool:
+    """Whether the request is signed with the bytes of the body"""
+    return headers.get(X_SIGNATURE_VERSION) == RAW_SIGNATURE_VERSION
+
+
+def get_canonical_query(
+    query: str | Mapping[str, Any] | None,
+) -> str:
+    """
+    Get query string with sorted params, as it is signed,
+    so the order and encoding of the params do not matter.
+    :param query: query string or params
+    """
+    if not query:
+        return ""
+    if isinstance(query, str):
+        params = parse_qsl(query, keep_blank_values=True)
+    else:
+        params = [(str(k), str(v)) for k, v in query.items()]
+    return urlencode(sorted(params))
+
+
+def _get_signed_path(
+    path: str, query: str | Mapping[str, Any] | None
+) -> str:
+    """Path with the canonical query, if any"""
+    canonical = get_canonical_query(query)
+    return f"{path}?{canonical}" if canonical else path
+
+
 def _get_req_signature(
     secret_key: str,
     timestamp: int,
     method: str,
     path: str,
-    body: Any,
+    body_bytes: bytes,
 ) -> str:
     if not secret_key:
         return ""
     sig_bytes = (
         method.upper().encode()
         + path.encode()
-        + _get_body_bytes(body)
+        + body_bytes
         + str(timestamp).encode()
     )
     return _get_sig_encoded(secret_key, sig_bytes)